@@ -0,0 +1,64 @@
+"""对比逐个对象与整列转换 Calculate 识别结果的耗时
+
+运行: python bench/bench_calculate.py
+"""
+
+import os
+import sys
+import timeit
+
+import numpy as np
+import pyarrow as pa
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from untils.untils import Calculate
+
+
+def legacy_to_pa_array(calc_list):
+    data = [(c.x, c.y, c.ratio) for c in calc_list]
+    return pa.array(data, type=pa.struct(list(Calculate.SCHEMA)))
+
+
+def legacy_from_pa_array(pa_array):
+    return [
+        Calculate(item["x"].as_py(), item["y"].as_py(), item["ratio"].as_py())
+        for item in pa_array
+    ]
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'targets':>8}{'path':>10}{'encode us':>12}{'decode us':>12}")
+    for count in (1, 8, 64, 1024):
+        records = np.empty(count, Calculate.DTYPE)
+        records["x"] = rng.integers(0, 640, count)
+        records["y"] = rng.integers(0, 480, count)
+        records["ratio"] = rng.random(count)
+        objects = Calculate.from_numpy(records)
+        array = Calculate.to_pa_array(records)
+        number = max(10, 20000 // count)
+        cases = [
+            (
+                "legacy",
+                lambda: legacy_to_pa_array(objects),
+                lambda: legacy_from_pa_array(array),
+            ),
+            (
+                "objects",
+                lambda: Calculate.to_pa_array(objects),
+                lambda: Calculate.from_pa_array(array),
+            ),
+            (
+                "columnar",
+                lambda: Calculate.to_pa_array(records),
+                lambda: Calculate.from_record_batch(array),
+            ),
+        ]
+        for label, encode, decode in cases:
+            encode_us = timeit.timeit(encode, number=number) / number * 1e6
+            decode_us = timeit.timeit(decode, number=number) / number * 1e6
+            print(f"{count:>8}{label:>10}{encode_us:>12.1f}{decode_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""上游比下游快时，逐个处理与只处理最新输入的延迟对比
+
+生产者以 RATE Hz 发送 data，消费者每个事件耗时 WORK 秒。
+运行: python bench/bench_coalescing.py
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.events import CoalescingEvents
+
+RATE = 100
+WORK = 0.02
+DURATION = 2.0
+
+
+class QueueNode:
+    """用 queue.Queue 模拟 dora Node 的事件队列
+
+    与 dora 一样：队列为空时 next(timeout) 返回超时的 ERROR 事件，
+    生产者放入 None 表示事件流结束。
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+
+    def next(self, timeout=None):
+        try:
+            return self.queue.get(block=timeout != 0, timeout=timeout or None)
+        except queue.Empty:
+            return {"type": "ERROR", "error": "Timeout"}
+
+    def __iter__(self):
+        while (event := self.next()) is not None:
+            yield event
+
+
+def produce(node):
+    end = time.monotonic() + DURATION
+    while time.monotonic() < end:
+        node.queue.put({"type": "INPUT", "id": "data", "value": time.monotonic()})
+        time.sleep(1 / RATE)
+    node.queue.put(None)
+
+
+def consume(events):
+    ages = []
+    for event in events:
+        ages.append(time.monotonic() - event["value"])
+        time.sleep(WORK)
+    return ages
+
+
+def run(coalesce):
+    node = QueueNode()
+    producer = threading.Thread(target=produce, args=(node,))
+    producer.start()
+    events = CoalescingEvents(node, ("data",)) if coalesce else node
+    ages = consume(events)
+    producer.join()
+    return ages, events
+
+
+def main():
+    print(f"producer {RATE} Hz, consumer {1 / WORK:.0f} Hz, {DURATION} s")
+    for label, coalesce in (("every event", False), ("latest only", True)):
+        ages, events = run(coalesce)
+        extra = f", dropped {events.dropped['data']}" if coalesce else ""
+        print(
+            f"{label:<12} handled {len(ages):>4}, "
+            f"age avg {sum(ages) / len(ages) * 1e3:7.1f} ms, "
+            f"max {max(ages) * 1e3:7.1f} ms{extra}"
+        )
+
+
+if __name__ == "__main__":
+    main()
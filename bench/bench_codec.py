@@ -0,0 +1,72 @@
+"""对比旧的图像编解码路径与 untils.codec 的复制字节数和耗时
+
+旧路径：pa.array(frame.ravel()) 发送，to_numpy() + reshape 接收；JPEG 先 tobytes() 再解码。
+运行: python bench/bench_codec.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+import pyarrow as pa
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from untils.codec import decode_image, encode_image, stats
+
+
+def legacy_roundtrip(frame, encoding):
+    if encoding == "jpeg":
+        array = pa.array(frame)
+        byte_data = array.to_numpy().tobytes()
+        return cv2.imdecode(np.frombuffer(byte_data, np.uint8), cv2.IMREAD_COLOR)
+    height, width = frame.shape[:2]
+    array = pa.array(frame.ravel())
+    return array.to_numpy().reshape((height, width, 3))
+
+
+def codec_roundtrip(frame, encoding):
+    return decode_image(*encode_image(frame, encoding))
+
+
+def measure(roundtrip, frame, encoding, repeat=200):
+    """返回 (每帧耗时 us, 每帧新分配字节数)，解码得到的图像本身不计入"""
+    roundtrip(frame, encoding)
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        image = roundtrip(frame, encoding)
+        del image
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / repeat * 1e6, peak
+
+
+def main():
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    _, jpeg = cv2.imencode(".jpg", frame)
+    # 非连续视图（例如 ROI 或翻转）需要复制一次，旧路径的 ravel 同样会复制
+    cases = [
+        ("bgr8", frame, "bgr8"),
+        ("bgr8 view", frame[:, ::-1], "bgr8"),
+        ("jpeg", jpeg, "jpeg"),
+    ]
+    print(f"{'case':<12}{'path':<8}{'us/frame':>10}{'peak bytes':>14}")
+    for name, image, encoding in cases:
+        for label, roundtrip in (
+            ("legacy", legacy_roundtrip),
+            ("codec", codec_roundtrip),
+        ):
+            us, peak = measure(roundtrip, image, encoding)
+            print(f"{name:<12}{label:<8}{us:>10.1f}{peak:>14}")
+    stats.reset()
+    codec_roundtrip(frame, "bgr8")
+    print(f"codec bytes copied per bgr8 frame: {stats.bytes_copied}")
+
+
+if __name__ == "__main__":
+    main()
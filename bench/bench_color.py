@@ -0,0 +1,93 @@
+"""ColorDetector 各滤波链的分阶段耗时与检测精度
+
+运行: python bench/bench_color.py
+"""
+
+import os
+import sys
+import time
+import timeit
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench.synthetic import make_frames, score
+from mycv.color import ColorDetector
+
+CONFIGS = [
+    (
+        "gaussian+median, mask blur, alloc",
+        dict(blur="gaussian+median", mask_blur=True, reuse_buffers=False),
+    ),
+    ("gaussian+median, mask blur", dict(blur="gaussian+median", mask_blur=True)),
+    ("median, mask blur", dict(mask_blur=True)),
+    ("median (default)", dict()),
+    ("gaussian", dict(blur="gaussian")),
+    ("none", dict(blur="none")),
+    ("components", dict(method="components")),
+    ("components, no overlay", dict(method="components", draw=False)),
+]
+
+
+def run(frames, **kwargs):
+    detector = ColorDetector(
+        [30, 70, 80], [50, 255, 255], min_area=300, profile=True, **kwargs
+    )
+    totals = {}
+    start = time.perf_counter()
+    for frame, _ in frames:
+        detector.process(frame)
+        for stage, ms in detector.timings.items():
+            totals[stage] = totals.get(stage, 0.0) + ms
+    elapsed = (time.perf_counter() - start) * 1000 / len(frames)
+    stages = {stage: total / len(frames) for stage, total in totals.items()}
+    quality = score(frames, lambda f: detector.process(f)[2])
+    return elapsed, stages, quality
+
+
+def main():
+    for title, frames in (
+        ("clean", make_frames(60)),
+        ("cluttered", make_frames(60, clutter=300)),
+    ):
+        print(f"== {title}")
+        report(frames)
+    print("== find_candidates on a mask with many blobs (ms)")
+    blob_sweep()
+
+
+def blob_sweep():
+    rng = np.random.default_rng(0)
+    detectors = {
+        method: ColorDetector([30, 70, 80], [50, 255, 255], method=method)
+        for method in ("contours", "components")
+    }
+    for count in (10, 100, 300, 1000):
+        mask = np.zeros((480, 640), np.uint8)
+        cv2.circle(mask, (300, 200), 30, 255, -1)
+        for x, y in rng.integers(0, (630, 470), (count, 2)):
+            cv2.circle(mask, (int(x), int(y)), 3, 255, -1)
+        times = {
+            method: timeit.timeit(lambda: d.find_candidates(mask), number=50) * 20
+            for method, d in detectors.items()
+        }
+        print(
+            f"{count:5d} blobs  " + "  ".join(f"{k}={v:.2f}" for k, v in times.items())
+        )
+
+
+def report(frames):
+    for name, kwargs in CONFIGS:
+        elapsed, stages, quality = run(frames, **kwargs)
+        stage_text = " ".join(f"{k}={v:.2f}" for k, v in stages.items())
+        print(
+            f"{name:<36} {elapsed:6.2f} ms/frame  "
+            f"hit={quality['hit_rate']:.2f} fp={quality['false_positives']} "
+            f"err={quality['center_error']:.1f}px"
+        )
+        print(f"    {stage_text}")
+
+
+if __name__ == "__main__":
+    main()
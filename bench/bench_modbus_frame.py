@@ -0,0 +1,94 @@
+"""对比旧的十六进制字符串 Modbus 指令生成与查表 CRC + 帧缓存
+
+运行: python bench/bench_modbus_frame.py
+"""
+
+import os
+import struct
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from motor.modbus_frame import FrameCache, build_frame
+
+
+def legacy_crc(data):
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            if crc & 0x0001:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc = crc >> 1
+    return crc
+
+
+def legacy_command(action, left_speed, right_speed):
+    """原 ModbusMotor.get_modbus_command 的字符串实现（去掉 print）"""
+
+    def speed_to_hex(speed):
+        if speed < 0:
+            data = (0xFFFF - abs(speed) + 1) & 0xFFFF
+        else:
+            data = speed
+        return f"{(data >> 8) & 0xFF:02X} {data & 0xFF:02X}"
+
+    base_commands = {
+        "enable": "05 44 21 00 31 00 00 01 00 01",
+        "disable": "05 44 21 00 31 00 00 00 00 00",
+        "stop": "05 44 23 18 33 18 00 00 00 00 00",
+    }
+    movement_commands = {
+        "advance": f"05 44 23 18 33 18 {speed_to_hex(right_speed)} {speed_to_hex(left_speed)}",
+        "back": f"05 44 23 18 33 18 {speed_to_hex(-right_speed)} {speed_to_hex(-left_speed)}",
+        "turn_left": f"05 44 23 18 33 18 {speed_to_hex(right_speed)} {speed_to_hex(left_speed)}",
+        "turn_right": f"05 44 23 18 33 18 {speed_to_hex(right_speed)} {speed_to_hex(left_speed)}",
+    }
+    commands = {**base_commands, **movement_commands}
+    command = commands.get(action, "")
+    if command:
+        crc_bytes = struct.pack("<H", legacy_crc(bytes.fromhex(command)))
+        command = f"{command} {crc_bytes[0]:02X} {crc_bytes[1]:02X}"
+    return bytes.fromhex(command)
+
+
+# 模拟 CarCV 的指令分布：少量方向、速度在 6~25 之间
+WORKLOAD = [
+    (action, speed, speed)
+    for action in ("advance", "back", "turn_left", "turn_right", "stop")
+    for speed in range(6, 26)
+] * 20
+
+
+def run_legacy():
+    for action, left, right in WORKLOAD:
+        legacy_command(action, left, right)
+
+
+def run_uncached():
+    for action, left, right in WORKLOAD:
+        build_frame(action, left, right)
+
+
+def run_cached(cache=FrameCache()):
+    for action, left, right in WORKLOAD:
+        cache.get(action, left, right)
+
+
+def main():
+    for action, left, right in WORKLOAD[:100]:
+        assert legacy_command(action, left, right) == build_frame(action, left, right)
+
+    repeat = 20
+    for name, func in (
+        ("legacy string", run_legacy),
+        ("table crc", run_uncached),
+        ("table crc + lru", run_cached),
+    ):
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"{name:<16} {best / len(WORKLOAD) * 1e6:8.2f} us/frame")
+
+
+if __name__ == "__main__":
+    main()
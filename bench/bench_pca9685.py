@@ -0,0 +1,68 @@
+"""对比 PCA9685 逐字节写寄存器与寄存器镜像 + 块写入的 I2C 事务数和总线耗时
+
+运行: python bench/bench_pca9685.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from motor.Motor import PCA9685Motor
+from motor.pca9685_bus import LED0_ON_L, FakeSMBus
+
+
+class LegacyPCA9685Motor(PCA9685Motor):
+    """原实现：每条指令都写总线，每个通道 4 次 write_byte_data"""
+
+    def _write_channels(self, channels):
+        for channel, (on, off) in channels.items():
+            base = LED0_ON_L + 4 * channel
+            self.bus.write_byte_data(self.PCA9685_ADDRESS, base, on & 0xFF)
+            self.bus.write_byte_data(self.PCA9685_ADDRESS, base + 1, on >> 8)
+            self.bus.write_byte_data(self.PCA9685_ADDRESS, base + 2, off & 0xFF)
+            self.bus.write_byte_data(self.PCA9685_ADDRESS, base + 3, off >> 8)
+
+    def __init__(self, *args, **kwargs):
+        # keepalive=0 关闭去重，保持原来的写入路径
+        kwargs["keepalive"] = 0
+        super().__init__(*args, **kwargs)
+        self.mirror.write = self._write_channels
+
+
+def run(motor_cls, commands, realtime):
+    bus = FakeSMBus(realtime=realtime)
+    motor = motor_cls(1500, 1500, 1500, 1500, bus=bus)
+    bus.reset_stats()
+    start = time.perf_counter()
+    for command in commands:
+        motor.Car_run = command
+    elapsed = time.perf_counter() - start
+    return bus, elapsed
+
+
+def main():
+    random.seed(0)
+    # 方向变化与保持混合：大部分时间保持同一方向
+    commands = []
+    for _ in range(200):
+        commands += [random.choice(range(13))] * random.randint(1, 5)
+
+    for name, motor_cls in (("legacy", LegacyPCA9685Motor), ("mirror", PCA9685Motor)):
+        bus, elapsed = run(motor_cls, commands, realtime=False)
+        print(
+            f"{name:<7} {bus.transactions:6d} transactions "
+            f"{bus.bytes_written:6d} bytes "
+            f"{bus.bus_time / len(commands) * 1e3:7.3f} ms/command (modelled bus) "
+            f"{elapsed / len(commands) * 1e6:7.1f} us/command (python)"
+        )
+
+    # 按模型 sleep，测量真实调用延迟
+    for name, motor_cls in (("legacy", LegacyPCA9685Motor), ("mirror", PCA9685Motor)):
+        _, elapsed = run(motor_cls, commands[:100], realtime=True)
+        print(f"{name:<7} {elapsed / 100 * 1e3:7.3f} ms/command (realtime)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""control.py 识别线程的帧率与 CPU 占用：每帧新建检测器并翻转整幅图像，与 VisionPipeline 对比
+
+运行: python bench/bench_pipeline.py [录制的视频]
+不提供视频时先把合成图像写成一段 MJPG 视频再读取。
+各配置轮流运行 REPEAT 次，输出帧率的最小值、中位数和最大值。flip_y 只是省去整帧的翻转拷贝，
+与显式翻转相比帧率的差别在运行之间的波动范围内，不能说明更快。
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import cv2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench.synthetic import make_frames
+from mycv.color import ColorDetector
+from mycv.pipeline import TENNIS_LOWER, TENNIS_UPPER, VisionPipeline
+
+REPEAT = 9
+
+
+def record_clip(path, count=300):
+    """把合成图像写成视频，模拟录制的摄像头画面（上下颠倒）"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (640, 480))
+    for frame, _ in make_frames(count):
+        writer.write(cv2.flip(frame, 0))
+    writer.release()
+
+
+def load_clip(path):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def measure(step, frames):
+    """返回 (帧率, CPU 占用百分比)，CPU 占用 = 进程 CPU 时间 / 墙钟时间"""
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    for frame in frames:
+        step(frame)
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    return len(frames) / wall, 100.0 * cpu / wall
+
+
+def per_frame_detector(frame):
+    # 原来的写法：每帧创建检测器，再翻转整幅图像
+    detector = ColorDetector(TENNIS_LOWER, TENNIS_UPPER, min_area=50)
+    return detector.process(cv2.flip(frame, 0))
+
+
+def main():
+    if len(sys.argv) > 1:
+        frames = load_clip(sys.argv[1])
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "clip.avi")
+            record_clip(path)
+            frames = load_clip(path)
+    print(f"{len(frames)} frames")
+
+    hoisted = ColorDetector(TENNIS_LOWER, TENNIS_UPPER, min_area=50)
+    folded = ColorDetector(TENNIS_LOWER, TENNIS_UPPER, min_area=50, flip_y=True)
+    pipeline = VisionPipeline()
+    headless = VisionPipeline()
+    headless.draw = False
+    configs = [
+        ("per-frame detector + flip", per_frame_detector),
+        ("hoisted detector + flip", lambda f: hoisted.process(cv2.flip(f, 0))),
+        ("hoisted detector, flip_y", folded.process),
+        ("pipeline, flip folded", pipeline.process),
+        ("pipeline, no overlay", headless.process),
+    ]
+    # 轮流运行多次，报告帧率的分布，机器负载的波动同样影响每个配置
+    runs = {name: [] for name, _ in configs}
+    for _ in range(REPEAT):
+        for name, step in configs:
+            runs[name].append(measure(step, frames))
+    print(f"{'':<28} {'min':>7} {'median':>7} {'max':>7}  frames/s")
+    for name, results in runs.items():
+        fps = [r[0] for r in results]
+        cpu = statistics.median(r[1] for r in results)
+        print(
+            f"{name:<28} {min(fps):7.1f} {statistics.median(fps):7.1f} "
+            f"{max(fps):7.1f}  cpu={cpu:5.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
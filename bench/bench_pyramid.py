@@ -0,0 +1,68 @@
+"""对比不同缩放倍数下的检测耗时与精度
+
+运行: python bench/bench_pyramid.py [录像文件]
+
+给出录像文件时，以全分辨率检测结果作为参考计算一致性；否则使用合成图像。
+"""
+
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench.synthetic import make_frames, score
+from mycv.color import ColorDetector
+
+
+def load_video(path, limit=300):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def with_reference(frames):
+    """用全分辨率检测结果作为真值"""
+    detector = ColorDetector([30, 70, 80], [50, 255, 255], min_area=300)
+    labelled = []
+    for frame in frames:
+        data = detector.process(frame)[2]
+        if data:
+            r = int((data[0].ratio * frame.shape[0] * frame.shape[1]) ** 0.5 / 2)
+            labelled.append((frame, (data[0].x, data[0].y, r)))
+        else:
+            labelled.append((frame, (0, 0, 0)))
+    return labelled
+
+
+def main():
+    if len(sys.argv) > 1:
+        frames = with_reference(load_video(sys.argv[1]))
+    else:
+        frames = make_frames(120)
+
+    for scale in (1, 2, 4):
+        detector = ColorDetector(
+            [30, 70, 80], [50, 255, 255], min_area=300, scale=scale
+        )
+        start = time.perf_counter()
+        for frame, _ in frames:
+            detector.process(frame)
+        elapsed = (time.perf_counter() - start) * 1000 / len(frames)
+        quality = score(frames, lambda f: detector.process(f)[2])
+        print(
+            f"scale 1/{scale}  {elapsed:6.2f} ms/frame  "
+            f"hit={quality['hit_rate']:.2f} fp={quality['false_positives']} "
+            f"err={quality['center_error']:.1f}px"
+        )
+
+
+if __name__ == "__main__":
+    main()
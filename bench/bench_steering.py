@@ -0,0 +1,83 @@
+"""离散指令（转向/前进/后退）与差速指令的接近目标耗时对比
+
+运行: python bench/bench_steering.py
+CarCV 驱动 SimMotor 闭环仿真，网球固定在地面上，按小车位姿换算成画面中的位置和面积比。
+控制频率 50 Hz，记录到达目标 ARRIVE 米以内所需的时间和指令方向码切换的次数。
+"""
+
+import math
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from car_cv import CarCV
+from motor.sim import SimMotor
+from untils import Calculate
+
+RATE = 50
+TIMEOUT = 60.0
+# 摄像头水平视场角（弧度）和停车距离（米，此时面积比为 1）
+FOV = 1.0
+STOP_DISTANCE = 0.3
+# 垂直偏移死区（10 像素）对应约 0.05 米，到达判定留出余量
+ARRIVE = 0.4
+TARGETS = [(1.5, 0.0), (1.5, 0.5), (1.0, -0.8), (0.8, 0.8)]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def observe(car_cv, motor, target):
+    """目标在画面中的位置，看不到时返回空列表"""
+    x, y, theta = motor.pose()
+    dx, dy = target[0] - x, target[1] - y
+    distance = math.hypot(dx, dy)
+    bearing = (math.atan2(dy, dx) - theta + math.pi) % (2 * math.pi) - math.pi
+    if abs(bearing) > FOV / 2:
+        return [], distance
+    # 目标在左侧（逆时针方向）时位于画面中心左边；越远越靠近画面上方、面积越小
+    px = car_cv.center_x - bearing / FOV * car_cv.width
+    py = car_cv.center_y - (distance - STOP_DISTANCE) * 200
+    ratio = car_cv.ratio_num * (STOP_DISTANCE / distance) ** 2
+    return [Calculate(px, max(0.0, py), ratio)], distance
+
+
+def run(diff_drive, target):
+    clock = FakeClock()
+    motor = SimMotor(clock=clock)
+    car_cv = CarCV()
+    car_cv.diff_drive = diff_drive
+    car_cv.last_speed_update_time = 0.0
+    switches = 0
+    last_direction = None
+    while clock.now < TIMEOUT:
+        data, distance = observe(car_cv, motor, target)
+        if data and distance < ARRIVE:
+            break
+        car_cv.observe(data, clock.now)
+        move_data = car_cv.act(None, clock.now)
+        motor.Control(move_data)
+        if move_data.direction != last_direction:
+            switches += 1
+            last_direction = move_data.direction
+        clock.now += 1 / RATE
+    return clock.now, switches, distance
+
+
+def main():
+    for target in TARGETS:
+        for title, diff_drive in (("discrete", False), ("differential", True)):
+            elapsed, switches, distance = run(diff_drive, target)
+            print(
+                f"target=({target[0]:+.1f}, {target[1]:+.1f}) {title:<13} "
+                f"time={elapsed:6.2f} s  switches={switches:4d}  distance={distance:.3f} m"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""对比全图检测与 ROI 跟踪模式的每帧耗时和检测精度
+
+运行: python bench/bench_tracking.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench.synthetic import make_frames, score
+from mycv.color import ColorDetector
+from mycv.tracker import BallTracker
+
+
+def main():
+    frames = make_frames(300)
+
+    detector = ColorDetector([30, 70, 80], [50, 255, 255], min_area=300)
+    start = time.process_time()
+    full = score(frames, lambda f: detector.process(f)[2])
+    full_cpu = (time.process_time() - start) * 1000 / len(frames)
+
+    tracker = BallTracker()
+    roi_frames = 0
+
+    def detect(frame):
+        nonlocal roi_frames
+        roi = tracker.window()
+        roi_frames += roi is not None
+        data = detector.process(frame, roi)[2]
+        tracker.update(data)
+        return data
+
+    start = time.process_time()
+    tracked = score(frames, detect)
+    tracked_cpu = (time.process_time() - start) * 1000 / len(frames)
+
+    for name, cpu, quality in (
+        ("full frame", full_cpu, full),
+        ("roi", tracked_cpu, tracked),
+    ):
+        print(
+            f"{name:<10} {cpu:6.2f} ms cpu/frame  hit={quality['hit_rate']:.2f} "
+            f"fp={quality['false_positives']} err={quality['center_error']:.1f}px"
+        )
+    print(
+        f"roi used on {roi_frames}/{len(frames)} frames, speedup {full_cpu / tracked_cpu:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
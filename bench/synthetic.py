@@ -0,0 +1,85 @@
+"""生成带网球的合成图像，用于没有摄像头时的性能与精度测试"""
+
+import cv2
+import numpy as np
+
+# HSV(40, 200, 220) 落在 ColorDetector 默认阈值 [30,70,80]~[50,255,255] 内
+BALL_BGR = tuple(
+    int(c) for c in cv2.cvtColor(np.uint8([[[40, 200, 220]]]), cv2.COLOR_HSV2BGR)[0, 0]
+)
+
+
+def make_frames(count=60, width=640, height=480, radius=(12, 50), seed=0, clutter=0):
+    """生成一段网球缓慢移动的图像序列
+
+    Args:
+        clutter: 每帧额外加入的同色小斑点数量，用于模拟杂乱场景
+
+    Returns:
+        list: [(frame, (center_x, center_y, radius))]，radius 为 0 表示该帧没有球
+    """
+    rng = np.random.default_rng(seed)
+    background = rng.integers(40, 120, (height, width, 3), dtype=np.uint8)
+    background = cv2.GaussianBlur(background, (0, 0), 3)
+    # 一些不满足阈值的干扰色块
+    for _ in range(8):
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        cv2.rectangle(background, (x, y), (x + 40, y + 30), color, -1)
+
+    frames = []
+    x, y = width / 3, height / 2
+    vx, vy = 4.0, 2.5
+    r = radius[0]
+    for i in range(count):
+        frame = background.copy()
+        noise = rng.integers(-12, 12, frame.shape, dtype=np.int16)
+        frame = np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+        x += vx
+        y += vy
+        if not radius[0] <= x <= width - radius[1]:
+            vx = -vx
+        if not radius[0] <= y <= height - radius[1]:
+            vy = -vy
+        r = min(radius[1], r + 0.5)
+        for _ in range(clutter):
+            px, py = int(rng.integers(0, width)), int(rng.integers(0, height))
+            cv2.rectangle(
+                frame, (px, py), (px + int(rng.integers(4, 14)), py + 3), BALL_BGR, -1
+            )
+        # 每 15 帧有 2 帧球被遮挡
+        if i % 15 in (13, 14):
+            frames.append((frame, (0, 0, 0)))
+            continue
+        center = (int(x), int(y))
+        cv2.circle(frame, center, int(r), BALL_BGR, -1)
+        frames.append((frame, (center[0], center[1], int(r))))
+    return frames
+
+
+def score(frames, detect):
+    """统计检测率、误检数和中心点平均误差
+
+    Args:
+        frames: make_frames 的返回值
+        detect: 输入一帧，返回 Calculate 列表
+    """
+    hits = misses = false_positives = 0
+    error = 0.0
+    for frame, (cx, cy, r) in frames:
+        data = detect(frame)
+        if r == 0:
+            false_positives += len(data)
+            continue
+        if not data:
+            misses += 1
+            continue
+        best = min(data, key=lambda c: (c.x - cx) ** 2 + (c.y - cy) ** 2)
+        error += ((best.x - cx) ** 2 + (best.y - cy) ** 2) ** 0.5
+        hits += 1
+        false_positives += len(data) - 1
+    return {
+        "hit_rate": hits / max(1, hits + misses),
+        "false_positives": false_positives,
+        "center_error": error / max(1, hits),
+    }
@@ -0,0 +1,82 @@
+"""视觉部分的离线基准测试（pytest-benchmark），输入是回放的录制图像
+
+仓库中不提交基线：结果取决于硬件和检测器配置，别的机器上录制的基线没有可比性。
+在目标板上从干净的工作区（git status 没有改动）录制基线:
+    pip install pytest-benchmark
+    python -m pytest bench/test_benchmarks.py --benchmark-storage=bench/baselines --benchmark-save=baseline
+之后在同一块板上与该基线对比，均值变慢超过 20% 时失败:
+    python -m pytest bench/test_benchmarks.py --benchmark-storage=bench/baselines \
+        --benchmark-compare=0001 --benchmark-compare-fail=mean:20%
+基线按机器（系统、解释器版本）分目录保存，commit_info 中 dirty 为 true 的基线应重新录制；
+修改检测器的默认配置（例如滤波链）后也要重新录制。
+BENCH_CLIP 指定录制的视频或 .npy 文件，不指定时使用合成图像。
+没有安装 pytest-benchmark 时整个文件跳过。
+"""
+
+import itertools
+import os
+import sys
+
+import cv2
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench.synthetic import make_frames
+from car_cv import CarCV
+from mycv.color import ColorDetector
+from mycv.replay import ReplaySource, save_frames
+from untils import Calculate, encode_image
+from untils.untils import translate_image
+
+
+@pytest.fixture(scope="module")
+def frames(tmp_path_factory):
+    path = os.getenv("BENCH_CLIP")
+    if not path:
+        path = str(tmp_path_factory.mktemp("clip") / "clip.npy")
+        save_frames(path, (frame for frame, _ in make_frames(60)))
+    source = ReplaySource(path)
+    frames = [frame for frame in itertools.islice(source, 120)]
+    source.release()
+    assert frames, f"无法读取 {path}"
+    return frames
+
+
+def cycle(frames):
+    """每次调用返回下一帧，避免总是测同一帧"""
+    it = itertools.cycle(frames)
+    return lambda: next(it)
+
+
+@pytest.mark.parametrize("draw", [True, False], ids=["overlay", "no_overlay"])
+def test_color_detector_process(benchmark, frames, draw):
+    detector = ColorDetector([30, 70, 80], [50, 255, 255], min_area=50, draw=draw)
+    next_frame = cycle(frames)
+    benchmark(lambda: detector.process(next_frame()))
+
+
+@pytest.mark.parametrize("encoding", ["bgr8", "jpeg"])
+def test_translate_image(benchmark, frames, encoding):
+    frame = frames[0]
+    if encoding == "jpeg":
+        frame = cv2.imencode(".jpg", frame)[1]
+    data, metadata = encode_image(frame, encoding)
+    image = benchmark(translate_image, data, metadata)
+    assert image.shape == frames[0].shape
+
+
+def test_car_cv_process_data(benchmark, frames):
+    detector = ColorDetector([30, 70, 80], [50, 255, 255], min_area=50, draw=False)
+    # 先把识别结果算好，只测控制逻辑
+    detections = [detector.process(frame)[2] for frame in frames]
+    car_cv = CarCV()
+    next_data = cycle(detections)
+    benchmark(lambda: car_cv.process_data(next_data()))
+
+
+def test_calculate_to_pa_array(benchmark, frames):
+    detector = ColorDetector([30, 70, 80], [50, 255, 255], min_area=50, draw=False)
+    detector.process(frames[0])
+    benchmark(Calculate.to_pa_array, detector.detections)
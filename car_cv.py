@@ -2,8 +2,14 @@ from dora import Node
 import cv2
 from traitlets import List
 from common.move_data import MoveData
+from common import tracing
+from common.events import CoalescingEvents
+from common.logger import RateLimitedLogger
+from common.scheduler import FixedRateScheduler
+from common.tracing import RateMeter, Tracer
 from move import Move
-from mycv import ColorDetector
+from mycv import BallTracker, ColorDetector
+import os
 import time
 from untils import Calculate
 from simple_pid import PID
@@ -21,10 +27,11 @@ def send(node: Node, direction, speed) -> MoveData:
     Raises:
         ZeroDivisionError: 如果除数为零，则抛出异常。
     """
-    data = MoveData(direction, speed).to_arrow_array()
+    # 时间戳为发送时间，另外带上当前帧的采集时间，电机节点据此统计端到端延迟
+    move_data = MoveData(direction, speed).stamp(capture_ns=tracing.current_capture())
     if node != None:
-        node.send_output("move", data)
-    return MoveData(direction, speed)
+        node.send_output("move", move_data.to_arrow_array())
+    return move_data
 
 
 def stop(node: Node) -> MoveData:
@@ -47,9 +54,31 @@ def turn_right(node: Node, speed=20) -> MoveData:
     return send(node, 6, speed)
 
 
+def drive(node: Node, linear, angular, max_speed=None) -> MoveData:
+    """
+    发送差速指令，一帧同时给出前进和转向
+    Args:
+        linear: 线速度，正为前进
+        angular: 角速度（两轮速度差的一半），正为逆时针，右轮快于左轮
+        max_speed: 单个轮子的速度上限
+    """
+    move_data = MoveData.drive(linear, angular, max_speed)
+    if move_data.left_speed == 0 and move_data.right_speed == 0:
+        return stop(node)
+    move_data.stamp(capture_ns=tracing.current_capture())
+    if node != None:
+        node.send_output("move", move_data.to_arrow_array())
+    return move_data
+
+
 class CarCV:
 
-    def __init__(self):
+    def __init__(self, tracker: BallTracker = None):
+        """
+        Args:
+            tracker (BallTracker, optional): 与识别端共享的跟踪器，识别端用它裁剪 ROI，
+                这里根据控制逻辑的目标丢失/找到状态更新它。
+        """
         self.lower_tennis = [30, 70, 80]
         self.upper_tennis = [50, 255, 255]
         self.detector = ColorDetector(
@@ -61,15 +90,25 @@ class CarCV:
         self.max_lost_frames = 20
         self.search_direction = 1
         self.search_start_time = 0
-        self.last_command_time = time.time()
+        self.last_command_time = time.monotonic()
         self.target_found = False
         self.last_valid_position = None
-        self.debug_mode = False
+        # 最近一帧识别到的目标 (x, y, ratio)，丢失时为 None
+        self.target = None
+        # 结构化日志，同一事件每秒最多输出一次
+        self.log = RateLimitedLogger("car_cv")
+        # 识别结果到达的频率和抖动
+        self.loop = RateMeter()
+        # 控制循环的统计，频率由数据流中的 tick 定时器决定，CONTROL_RATE 应与之一致
+        self.scheduler = FixedRateScheduler(float(os.getenv("CONTROL_RATE", "50")))
         self.recet_pos = (210, 354, 100, 100)
         self.center_x = 278
         self.center_y = 298
         self.width = 640
         self.height = 480
+        self.tracker = tracker or BallTracker(self.width, self.height)
+        # TRACE_DIR 设置时把各阶段耗时写到 TRACE_DIR/car_cv.json
+        self.tracer = Tracer.from_env("car_cv")
         self.arm_state_Ready = True
         self.ratio_abs = 0.01
         self.ratio_num = 0.02056640625
@@ -87,62 +126,90 @@ class CarCV:
         # 添加速度平滑参数
         self.current_speed = 0.0
         self.max_acceleration = 0.5  # 最大加速度
-        self.last_speed_update_time = time.time()
+        self.last_speed_update_time = time.monotonic()
         # TODO 速度超过 30 便会出现方向相反，
         self.max_speed = 25
         self.min_speed = 6
 
+        # 差速控制：转向和前进合成一条指令，DIFF_DRIVE=0 时回到 转向/前进/后退 的离散指令
+        self.diff_drive = os.getenv("DIFF_DRIVE", "1") == "1"
+        # 水平偏移每像素对应的角速度，偏移 50 像素时与离散模式的转向速度 8 相同
+        self.turn_gain = 8 / 50
+        self.max_turn_speed = 12
+        # 垂直偏移达到 approach_range 像素时以全速前进/后退，dead_zone 以内不前后移动
+        self.dead_zone = 10
+        self.approach_range = 50
+
     def process_data(self, data: List[Calculate], node=None) -> MoveData:
         """
         处理目标检测数据并生成相应的运动指令
-        
+
+        等价于 observe(data) 之后立即 act(node)，用于没有固定频率控制循环的场景。
+
         Args:
             data (List[Calculate]): 包含目标检测结果的列表，每个元素包含目标的位置和比例信息
             node (Node, optional): 用于发送运动指令的节点对象. Defaults to None.
-            
+
         Returns:
             MoveData: 返回运动指令数据，包含运动方向和速度
-            
+
         Note:
             - 当检测列表为空时，会触发目标丢失处理逻辑
             - 当检测到目标时，会根据目标位置和比例计算相应的运动指令
             - 只有在机械臂就绪状态(arm_state_Ready)下才会执行运动控制
         """
-
-        current_time = time.time()
-
+        current_time = time.monotonic()
         if self.arm_state_Ready:
-            if len(data) == 0:
-                return self.handle_target_lost(current_time, node)
-            else:
-                return self.handle_target_found(
-                    data[0].x, data[0].y, data[0].ratio, current_time, node
+            self.observe(data, current_time)
+        return self.act(node, current_time)
+
+    def observe(self, data: List[Calculate], current_time=None):
+        """记录一帧识别结果：更新目标丢失/找到的计数和跟踪器，不产生指令"""
+        current_time = time.monotonic() if current_time is None else current_time
+        if len(data) == 0:
+            self.target = None
+            self.lost_count += 1
+            self.target_found = False
+            self.tracker.on_lost()
+            if self.lost_count >= self.max_lost_frames:
+                # 原地旋转搜索时画面整体移动，预测失效，回到全图搜索
+                self.tracker.reset()
+                self.search_start_time = current_time
+                self.search_direction = (
+                    1
+                    if self.last_valid_position
+                    and self.last_valid_position[0] > self.width / 2
+                    else -1
+                )
+                self.log.info(
+                    "search",
+                    direction="right" if self.search_direction > 0 else "left",
                 )
         else:
+            # 与识别端共用跟踪器，选离预测位置最近的候选
+            target = self.tracker.select(data)
+            x, y, ratio = target.x, target.y, target.ratio
+            self.target = (x, y, ratio)
+            self.lost_count = 0
+            self.target_found = True
+            self.tracker.on_found(x, y, ratio)
+            self.last_valid_position = (x, y)
+
+    def act(self, node=None, current_time=None) -> MoveData:
+        """根据最近一次 observe 的结果产生一条运动指令"""
+        current_time = time.monotonic() if current_time is None else current_time
+        if not self.arm_state_Ready:
             return stop(node)
+        if self.target is None:
+            return self.handle_target_lost(current_time, node)
+        return self.handle_target_found(*self.target, current_time, node)
 
     def handle_target_lost(self, current_time, node) -> MoveData:
-        self.lost_count += 1
-        self.target_found = False
         if self.lost_count >= self.max_lost_frames:
-            self.search_start_time = current_time
-            self.search_direction = (
-                1
-                if self.last_valid_position
-                and self.last_valid_position[0] > self.width / 2
-                else -1
-            )
-            print(
-                "进入搜索模式，方向：", "右" if self.search_direction > 0 else "左"
-            )
-
-            search_time = current_time - self.search_start_time
-
+            self.last_command_time = current_time
             if self.search_direction > 0:
-                self.last_command_time = current_time
                 return turn_left(node)
             else:
-                self.last_command_time = current_time
                 return turn_right(node)
         else:
             return stop(node)
@@ -152,9 +219,6 @@ class CarCV:
         return self.alpha * new_value + (1 - self.alpha) * last_value
 
     def handle_target_found(self, x, y, ratio, current_time, node) -> MoveData:
-        self.lost_count = 0
-        self.target_found = True
-        self.last_valid_position = (x, y)
         self.last_command_time = current_time
 
         # 计算原始偏移
@@ -199,14 +263,20 @@ class CarCV:
 
         # 确保速度在合理范围内
         speed = max(self.min_speed, min(speed, self.max_speed))
-        # 打印调试信息
-        if self.debug_mode:
-            print(
-                f"目标位置：({x}, {y}), 偏移：({x_offset}, {y_offset}), "
-                f"目标比率：{self.ratio_num:.4f}, 当前比率：{ratio:.4f}, "
-                f"比率比值：{ratio_proportion:.4f}, 速度：{speed:.2f}"
-            )
-        print(ratio_proportion)
+        # 调试信息，LOG_LEVEL=DEBUG 时按限速输出
+        self.log.debug(
+            "target",
+            x=x,
+            y=y,
+            x_offset=x_offset,
+            y_offset=y_offset,
+            ratio=ratio,
+            ratio_proportion=ratio_proportion,
+            speed=speed,
+        )
+        if self.diff_drive:
+            linear, angular = self.steer(x_offset, y_offset, ratio_proportion, speed)
+            return drive(node, linear, angular, self.max_speed)
         # 根据偏移控制移动
         # TODO: 左右右转默认速度
         if abs(x_offset) > 50:  # 如果水平偏移较大
@@ -223,12 +293,61 @@ class CarCV:
         else:
             return stop(node)
 
+    def steer(self, x_offset, y_offset, ratio_proportion, speed):
+        """差速模式下由目标偏移计算 (线速度, 角速度)
+
+        角速度与水平偏移成正比，目标在右侧（x_offset > 0）时左轮快于右轮，
+        与离散模式的 turn_left 转向一致；线速度随垂直偏移增大到 speed，
+        水平偏移越大线速度越小，先对准再靠近。
+        """
+        angular = -self.turn_gain * x_offset
+        angular = max(-self.max_turn_speed, min(self.max_turn_speed, angular))
+        if ratio_proportion > 0.95 or abs(y_offset) <= self.dead_zone:
+            # 已经非常接近目标或在死区内，只转向
+            return 0.0, angular
+        approach = min(1.0, abs(y_offset) / self.approach_range)
+        align = max(0.0, 1 - abs(x_offset) / (self.width / 2))
+        # 目标在下方时后退，在上方时前进
+        linear = (-1 if y_offset > 0 else 1) * speed * approach * align
+        return linear, angular
+
+    def on_tick(self, node):
+        """固定频率控制循环的一次 tick：基于最新的识别结果发送一条指令"""
+        current_time = time.monotonic()
+        self.scheduler.begin(current_time)
+        with self.tracer.stage("control"):
+            self.act(node, current_time)
+        self.scheduler.end()
+        self.log.info("control", **self.scheduler.as_dict())
+
     def run(self, node):
-        for event in node:
+        """事件循环
+
+        数据流中为本节点配置了 tick 输入时，data 只更新识别结果，指令在每个 tick 发送一次；
+        没有 tick 时每收到一帧 data 立即发送指令。
+        """
+        # 识别结果积压时只处理最新的一帧
+        events = CoalescingEvents(node, ("data", "tick"))
+        tick_driven = False
+        for event in events:
             if event["type"] == "INPUT":
                 event_id = event["id"]
-                if event_id == "data":
-                    self.process_image(Calculate.from_pa_array(event["value"]))
+                if event_id == "tick":
+                    tick_driven = True
+                    self.on_tick(node)
+                    self.tracer.maybe_dump()
+                elif event_id == "data":
+                    self.loop.tick()
+                    tracing.set_capture(tracing.capture_ns(event["metadata"]))
+                    data = Calculate.from_pa_array(event["value"])
+                    if tick_driven:
+                        if self.arm_state_Ready:
+                            self.observe(data)
+                    else:
+                        with self.tracer.stage("control"):
+                            self.process_data(data, node)
+                        self.tracer.maybe_dump()
+                    self.log.info("loop", **self.loop.as_dict())
                 elif event_id == "state":
                     state = event["value"][0].as_py()
                     match state:
@@ -238,6 +357,10 @@ class CarCV:
                             self.arm_state_Ready = False
                         case "ESTOP":
                             self.arm_state_Ready = False
+        self.tracer.dump()
+        self.log.info("exit", **self.loop.as_dict(), **events.as_dict())
+        if tick_driven:
+            self.log.info("exit_control", **self.scheduler.as_dict())
 
 
 if __name__ == "__main__":
@@ -1,5 +1,5 @@
 from .move_data import MoveData
 from .calculate import Calculate
-from.view_data import ViewData
+from .view import ViewData
 
 __all__ = ["MoveData", "ViewData","Calculate"]
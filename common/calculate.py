@@ -1,18 +1,36 @@
+import numpy as np
+import pyarrow as pa
 
 
 class Calculate:
     """
     用于存储和处理目标检测结果的数据类
-    
+
+    单个对象用于控制逻辑；多个目标、回放等批量场景用 DTYPE 结构化数组
+    或 Arrow RecordBatch 表示，整列转换，不逐个创建 Python 对象。
+
     属性:
         x (int): 目标在图像中的 x 坐标
         y (int): 目标在图像中的 y 坐标
         ratio (float): 目标在图像中所占的比例
     """
+
+    __slots__ = ("x", "y", "ratio")
+
+    # 结构化数组的字段，与 Arrow 中 struct 的字段一一对应
+    DTYPE = np.dtype([("x", np.int64), ("y", np.int64), ("ratio", np.float64)])
+    SCHEMA = pa.schema(
+        [
+            pa.field("x", pa.int64()),
+            pa.field("y", pa.int64()),
+            pa.field("ratio", pa.float64()),
+        ]
+    )
+
     def __init__(self, x, y, ratio):
         """
         初始化 Calculate 对象
-        
+
         参数:
             x (int): 目标在图像中的 x 坐标
             y (int): 目标在图像中的 y 坐标
@@ -22,25 +40,69 @@ class Calculate:
         self.y = y
         self.ratio = ratio
 
+    def __repr__(self):
+        return f"Calculate(x={self.x}, y={self.y}, ratio={self.ratio})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Calculate):
+            return NotImplemented
+        return (self.x, self.y, self.ratio) == (other.x, other.y, other.ratio)
+
+    @staticmethod
+    def to_numpy(calc_list):
+        """将 Calculate 对象列表转换为 DTYPE 结构化数组，已是数组时原样返回"""
+        if isinstance(calc_list, np.ndarray):
+            return calc_list
+        records = np.empty(len(calc_list), Calculate.DTYPE)
+        for i, c in enumerate(calc_list):
+            records[i] = (c.x, c.y, c.ratio)
+        return records
+
+    @staticmethod
+    def from_numpy(records):
+        """将结构化数组转换为 Calculate 对象列表"""
+        return [
+            Calculate(x, y, ratio)
+            for x, y, ratio in zip(
+                records["x"].tolist(), records["y"].tolist(), records["ratio"].tolist()
+            )
+        ]
+
+    @staticmethod
+    def to_record_batch(records):
+        """将结构化数组（或 Calculate 列表）转换为 Arrow RecordBatch"""
+        records = Calculate.to_numpy(records)
+        return pa.RecordBatch.from_arrays(
+            [pa.array(records[name]) for name in Calculate.DTYPE.names],
+            schema=Calculate.SCHEMA,
+        )
+
+    @staticmethod
+    def from_record_batch(batch):
+        """将 RecordBatch（或 struct 数组）转换为结构化数组"""
+        records = np.empty(len(batch), Calculate.DTYPE)
+        for name in Calculate.DTYPE.names:
+            column = (
+                batch.column(name)
+                if isinstance(batch, pa.RecordBatch)
+                else batch.field(name)
+            )
+            records[name] = column.to_numpy(zero_copy_only=False)
+        return records
+
     @staticmethod
     def to_pa_array(calc_list):
-        """将 Calculate 对象列表转换为 pyarrow 数组"""
+        """将 Calculate 对象列表（或结构化数组）转换为 pyarrow struct 数组"""
+        if isinstance(calc_list, np.ndarray):
+            return pa.StructArray.from_arrays(
+                [pa.array(calc_list[name]) for name in Calculate.DTYPE.names],
+                fields=list(Calculate.SCHEMA),
+            )
         data = [(c.x, c.y, c.ratio) for c in calc_list]
-        return pa.array(
-            data,
-            type=pa.struct(
-                [
-                    pa.field("x", pa.int64()),
-                    pa.field("y", pa.int64()),
-                    pa.field("ratio", pa.float64()),
-                ]
-            ),
-        )
+        return pa.array(data, type=pa.struct(list(Calculate.SCHEMA)))
 
     @staticmethod
     def from_pa_array(pa_array):
         """将 pyarrow 数组转换回 Calculate 对象列表"""
-        return [
-            Calculate(item["x"].as_py(), item["y"].as_py(), item["ratio"].as_py())
-            for item in pa_array
-        ]
+        columns = [pa_array.field(name).to_pylist() for name in Calculate.DTYPE.names]
+        return [Calculate(x, y, ratio) for x, y, ratio in zip(*columns)]
@@ -0,0 +1,81 @@
+from collections import Counter
+
+
+class CoalescingEvents:
+    """只处理最新输入的 dora 事件迭代器
+
+    每次阻塞等到一个事件后，不阻塞地取出队列中已经积压的事件；
+    coalesce 中列出的输入只保留最新的一个，其余事件（STOP、其他输入）按原顺序保留。
+    上游发送速度超过本节点处理速度时，控制始终基于最新的数据，队列也不会越积越长。
+
+    用法:
+        events = CoalescingEvents(node, ("data",))
+        for event in events:
+            ...
+        print(events.as_dict())
+    """
+
+    def __init__(self, node, coalesce=("data",), max_batch=64):
+        """
+        参数:
+            node: dora Node
+            coalesce: 只保留最新值的输入 id
+            max_batch: 一次最多取出的积压事件数
+        """
+        self.node = node
+        self.coalesce = set(coalesce)
+        self.max_batch = max_batch
+        self.received = 0
+        self.dropped = Counter()
+        self._ended = False
+
+    def __iter__(self):
+        self._ended = False
+        while not self._ended:
+            event = self.node.next()
+            if event is None:
+                return
+            pending = [event]
+            while len(pending) < self.max_batch:
+                event = self._poll()
+                if event is None:
+                    break
+                pending.append(event)
+            self.received += len(pending)
+            yield from self._latest(pending)
+
+    def _poll(self):
+        """不阻塞地取一个事件，队列为空或事件流结束时返回 None
+
+        dora 在队列为空时返回超时的 ERROR 事件，所有发送端关闭后返回 None；
+        后者说明事件流已经结束，处理完已取出的事件后退出，不能再阻塞等待。
+        """
+        event = self.node.next(timeout=0)
+        if event is None:
+            self._ended = True
+            return None
+        if (
+            event["type"] == "ERROR"
+            and "timeout" in str(event.get("error", "")).lower()
+        ):
+            return None
+        return event
+
+    def _latest(self, events):
+        """去掉被同一输入的更新值覆盖的事件"""
+        last = {}
+        for i, event in enumerate(events):
+            if event["type"] == "INPUT" and event["id"] in self.coalesce:
+                last[event["id"]] = i
+        for i, event in enumerate(events):
+            if (
+                event["type"] == "INPUT"
+                and event["id"] in self.coalesce
+                and last[event["id"]] != i
+            ):
+                self.dropped[event["id"]] += 1
+                continue
+            yield event
+
+    def as_dict(self):
+        return {"received": self.received, "dropped": dict(self.dropped)}
@@ -0,0 +1,72 @@
+import logging
+import os
+import time
+
+
+def get_logger(name):
+    """节点使用的 logger，级别由环境变量 LOG_LEVEL 控制（默认 INFO）"""
+    logger = logging.getLogger(name)
+    if not logging.getLogger().handlers and not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s")
+        )
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    return logger
+
+
+class RateLimitedLogger:
+    """按事件限速的结构化日志
+
+    同一个事件在 interval 秒内只输出一次，其间被抑制的次数附在下一条日志中。
+    字段以 key=value 形式输出，便于 grep 和解析。
+
+    用法:
+        log = RateLimitedLogger("car_cv")
+        log.info("target", x=320, ratio=0.5)
+    """
+
+    def __init__(self, name, interval=1.0):
+        """
+        参数:
+            name: logger 名称
+            interval: 同一事件两次输出之间的最小间隔（秒）
+        """
+        self.logger = get_logger(name)
+        self.interval = interval
+        self._last = {}
+        self._suppressed = {}
+
+    def log(self, level, event, **fields):
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        last = self._last.get(event)
+        if last is not None and now - last < self.interval:
+            self._suppressed[event] = self._suppressed.get(event, 0) + 1
+            return
+        self._last[event] = now
+        suppressed = self._suppressed.pop(event, 0)
+        if suppressed:
+            fields["suppressed"] = suppressed
+        message = " ".join(
+            [event] + [f"{key}={_format(value)}" for key, value in fields.items()]
+        )
+        self.logger.log(level, message)
+
+    def debug(self, event, **fields):
+        self.log(logging.DEBUG, event, **fields)
+
+    def info(self, event, **fields):
+        self.log(logging.INFO, event, **fields)
+
+    def warning(self, event, **fields):
+        self.log(logging.WARNING, event, **fields)
+
+
+def _format(value):
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return value
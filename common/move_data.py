@@ -1,24 +1,149 @@
-import pyarrow as pa
+import itertools
+import time
 from typing import List
 
+import numpy as np
+import pyarrow as pa
+
+# 固定布局的运动指令记录（小端序，36 字节），以 uint8 数组传输
+MOVE_DTYPE = np.dtype(
+    [
+        ("direction", "<i4"),
+        # 指令速度；DRIVE 指令中为线速度，与左右轮速度无关
+        ("speed", "<i4"),
+        ("left_speed", "<i4"),
+        ("right_speed", "<i4"),
+        ("seq", "<u4"),
+        # 发送时间 time.monotonic_ns()，同一台机器上的节点共用这个时钟
+        ("timestamp_ns", "<i8"),
+        # 指令依据的图像的采集时间，只用于统计端到端延迟，0 表示未知
+        ("capture_ns", "<i8"),
+    ]
+)
+
+# 本进程发出的指令序号
+_sequence = itertools.count(1)
+
+# 差速指令的方向码：left_speed/right_speed 直接给出左右轮速度，一帧同时控制转向和前进
+DRIVE = 13
+
 
 class MoveData:
-    def __init__(self, direction: int, speed: int):
+    def __init__(
+        self,
+        direction: int,
+        speed: int,
+        left_speed: int = None,
+        right_speed: int = None,
+        seq: int = 0,
+        timestamp_ns: int = 0,
+        capture_ns: int = 0,
+    ):
+        """
+        参数:
+            direction: 运动方向
+            speed: 速度，左右轮速度未指定时都取该值
+            left_speed, right_speed: 左右轮速度
+            seq: 指令序号，0 表示未编号（旧格式）
+            timestamp_ns: 指令发送时的 time.monotonic_ns()，0 表示未知
+            capture_ns: 指令依据的图像的采集时间，0 表示未知
+        """
         self.direction = direction
         self.speed = speed
+        self.left_speed = speed if left_speed is None else left_speed
+        self.right_speed = speed if right_speed is None else right_speed
+        self.seq = seq
+        self.timestamp_ns = timestamp_ns
+        self.capture_ns = capture_ns
+
+    @classmethod
+    def drive(cls, linear, angular, max_speed=None) -> "MoveData":
+        """由线速度和角速度生成差速指令
+
+        Args:
+            linear: 线速度（电机速度单位），正为前进
+            angular: 角速度，以两轮速度差的一半表示（电机速度单位），正为逆时针
+            max_speed: 单个轮子的速度上限，超出时两轮按比例缩小，转弯半径不变
+        """
+        left = linear - angular
+        right = linear + angular
+        peak = max(abs(left), abs(right))
+        if max_speed and peak > max_speed:
+            left *= max_speed / peak
+            right *= max_speed / peak
+        return cls(DRIVE, int(round(linear)), int(round(left)), int(round(right)))
+
+    def stamp(self, timestamp_ns: int = None, capture_ns: int = None) -> "MoveData":
+        """分配序号并记录时间戳
+
+        电机节点按 timestamp_ns 判断指令是否过期，因此它必须是发送时间；
+        图像采集时间放在 capture_ns 中，识别停滞时指令不会因此被当作过期丢弃。
+
+        Args:
+            timestamp_ns: 发送时间，默认当前时间
+            capture_ns: 指令依据的图像的采集时间，None 表示未知
+        """
+        self.seq = next(_sequence) & 0xFFFFFFFF
+        self.timestamp_ns = (
+            time.monotonic_ns() if timestamp_ns is None else timestamp_ns
+        )
+        self.capture_ns = capture_ns or 0
+        return self
+
+    def age_ns(self, now_ns: int = None) -> int:
+        """指令产生到现在经过的时间，时间戳未知时返回 None"""
+        if not self.timestamp_ns:
+            return None
+        return (time.monotonic_ns() if now_ns is None else now_ns) - self.timestamp_ns
 
     @classmethod
     def from_arrow_array(cls, array: pa.Array) -> "MoveData":
+        """从 pyarrow Array 解析指令，兼容旧的 [direction, speed] 格式"""
+        if array.type == pa.uint8() and len(array) == MOVE_DTYPE.itemsize:
+            # 直接把 Arrow 缓冲区视为结构化记录，不复制
+            record = np.frombuffer(
+                array.buffers()[1], MOVE_DTYPE, count=1, offset=array.offset
+            )[0]
+            return cls(
+                int(record["direction"]),
+                int(record["speed"]),
+                int(record["left_speed"]),
+                int(record["right_speed"]),
+                int(record["seq"]),
+                int(record["timestamp_ns"]),
+                int(record["capture_ns"]),
+            )
         data_list = array.to_pylist()
-        return cls(direct=data_list[0], speed=data_list[1])
+        return cls(direction=data_list[0], speed=data_list[1])
+
+    def to_record(self) -> np.ndarray:
+        """转换为 MOVE_DTYPE 结构化数组（长度为 1）"""
+        return np.array(
+            [
+                (
+                    self.direction,
+                    self.speed,
+                    self.left_speed,
+                    self.right_speed,
+                    self.seq,
+                    self.timestamp_ns,
+                    self.capture_ns,
+                )
+            ],
+            dtype=MOVE_DTYPE,
+        )
 
     def to_arrow_array(self) -> pa.Array:
         """将 MoveData 对象转换为 pyarrow Array
 
+        未编号的指令会先调用 stamp()。
+
         Returns:
-            pa.Array: 包含 [move_type, move_data] 的 pyarrow Array
+            pa.Array: MOVE_DTYPE 记录的字节，uint8 类型
         """
-        return pa.array([self.direction, self.speed])
+        if not self.seq:
+            self.stamp()
+        return pa.array(self.to_record().view(np.uint8))
 
     @classmethod
     def from_arrow_arrays(cls, arrays: List[pa.Array]) -> List["MoveData"]:
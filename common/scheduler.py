@@ -0,0 +1,60 @@
+import time
+
+from common.tracing import RateMeter
+
+
+class FixedRateScheduler:
+    """固定频率控制循环的统计
+
+    本身不负责调度：频率由数据流中的定时输入（例如 dora/timer/millis/20）决定，
+    每次 tick 调用 begin()/end()，rate 只用作判断迟到和超时的期望周期。
+    统计迟到的 tick、错过的周期以及单次计算超过一个周期的次数。
+    """
+
+    def __init__(self, rate=50.0, late_factor=1.5):
+        """
+        参数:
+            rate: 控制频率（Hz）
+            late_factor: 两次 tick 的间隔超过 late_factor 个周期时记为迟到
+        """
+        self.period = 1.0 / rate
+        self.late_factor = late_factor
+        self.meter = RateMeter()
+        self.late = 0
+        self.missed = 0
+        self.overruns = 0
+        self.max_step = 0.0
+        self._last_tick = None
+        self._step_start = None
+
+    def begin(self, now=None) -> float:
+        """一次 tick 开始，返回距上一次 tick 的时间（秒），第一次返回一个周期"""
+        now = time.monotonic() if now is None else now
+        self.meter.tick(now)
+        dt = self.period if self._last_tick is None else now - self._last_tick
+        if dt > self.period * self.late_factor:
+            self.late += 1
+            self.missed += max(0, round(dt / self.period) - 1)
+        self._last_tick = now
+        self._step_start = now
+        return dt
+
+    def end(self, now=None):
+        """一次 tick 的计算结束"""
+        if self._step_start is None:
+            return
+        now = time.monotonic() if now is None else now
+        step = now - self._step_start
+        self.max_step = max(self.max_step, step)
+        if step > self.period:
+            self.overruns += 1
+        self._step_start = None
+
+    def as_dict(self):
+        return {
+            **self.meter.as_dict(),
+            "late": self.late,
+            "missed": self.missed,
+            "overruns": self.overruns,
+            "max_step": self.max_step,
+        }
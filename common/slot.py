@@ -0,0 +1,73 @@
+import threading
+
+
+class LatestSlot:
+    """只保存最新值的单槽队列
+
+    生产者 put() 总是覆盖旧值，从不阻塞；消费者取到的永远是最新的值，
+    来不及消费的旧值直接丢弃并计数。用于连接速度不同的流水线阶段。
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._value = None
+        self._version = 0
+        self._taken = 0
+        self._closed = False
+        self.puts = 0
+        self.overwritten = 0
+
+    def put(self, value):
+        with self._cond:
+            if self._version != self._taken:
+                self.overwritten += 1
+            self._value = value
+            self._version += 1
+            self.puts += 1
+            self._cond.notify_all()
+
+    def take(self):
+        """不阻塞地取出新值，没有新值时返回 None"""
+        with self._cond:
+            if self._version == self._taken:
+                return None
+            self._taken = self._version
+            return self._value
+
+    def get(self, timeout=None):
+        """阻塞直到有新值，超时或关闭时返回 None"""
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._version != self._taken or self._closed, timeout
+            ):
+                return None
+            if self._version == self._taken:
+                return None
+            self._taken = self._version
+            return self._value
+
+    def peek(self):
+        """最新的值（无论是否已被取出）"""
+        with self._cond:
+            return self._value
+
+    def latest(self):
+        """返回 (版本号, 最新值)，不改变取出状态
+
+        多个消费者各自记录上次处理的版本号，版本号变化时再处理，互不影响。
+        """
+        with self._cond:
+            return self._version, self._value
+
+    def close(self):
+        """唤醒所有等待的消费者"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def as_dict(self):
+        return {"puts": self.puts, "overwritten": self.overwritten}
@@ -0,0 +1,108 @@
+import threading
+import time
+
+from common.tracing import RateMeter
+
+
+class Stage:
+    """流水线中的一个阶段，在独立的线程中运行
+
+    有 source 时每次从 source 取最新的值调用 step(value)，没有 source 时循环调用 step()
+    产生值（例如读取摄像头）。step 返回值不为 None 时放入 sink。没有 source 的阶段
+    step 返回 None 表示失败（例如摄像头断开），失败后按指数退避等待再重试，
+    连续失败 max_failures 次后结束阶段并关闭 sink，下游随之结束。阶段之间只通过
+    LatestSlot 交换数据，下游处理不过来时旧值被覆盖，任何一个阶段阻塞都不会拖慢上游。
+    OpenCV 和串口、I2C 读写期间会释放 GIL，各阶段可以真正并行。
+    """
+
+    def __init__(
+        self,
+        name,
+        step,
+        source=None,
+        sink=None,
+        timeout=0.5,
+        retry_interval=0.01,
+        max_failures=None,
+    ):
+        """
+        参数:
+            name: 阶段名称，也是线程名
+            step: 处理函数
+            source: 输入的 LatestSlot，为 None 时 step 不带参数
+            sink: 输出的 LatestSlot，阶段结束时关闭
+            timeout: 等待输入的超时时间（秒），用于检查停止标志，也是失败重试的最长间隔
+            retry_interval: 没有 source 的阶段第一次失败后的重试间隔（秒），之后每次加倍
+            max_failures: 连续失败多少次后结束阶段，None 表示一直重试
+        """
+        self.name = name
+        self.step = step
+        self.source = source
+        self.sink = sink
+        self.timeout = timeout
+        self.meter = RateMeter()
+        self.retry_interval = retry_interval
+        self.max_failures = max_failures
+        self.processed = 0
+        self.failures = 0
+        self.busy = 0.0
+        self._started = None
+        self._thread = None
+
+    def run(self, stop_event):
+        self._started = time.monotonic()
+        consecutive = 0
+        try:
+            while not stop_event.is_set():
+                if self.source is None:
+                    start = time.perf_counter()
+                    result = self.step()
+                    if result is None:
+                        self.busy += time.perf_counter() - start
+                        self.failures += 1
+                        consecutive += 1
+                        if self.max_failures and consecutive >= self.max_failures:
+                            break
+                        # 失败时不空转，等待时间逐次加倍，最长 timeout
+                        delay = self.retry_interval * 2 ** min(consecutive - 1, 16)
+                        stop_event.wait(min(delay, self.timeout))
+                        continue
+                    consecutive = 0
+                else:
+                    value = self.source.get(self.timeout)
+                    if value is None:
+                        if self.source.closed:
+                            break
+                        continue
+                    start = time.perf_counter()
+                    result = self.step(value)
+                self.busy += time.perf_counter() - start
+                self.processed += 1
+                self.meter.tick()
+                if result is not None and self.sink is not None:
+                    self.sink.put(result)
+        finally:
+            if self.sink is not None:
+                self.sink.close()
+
+    def start(self, stop_event) -> threading.Thread:
+        self._thread = threading.Thread(
+            target=self.run, args=(stop_event,), name=self.name, daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def as_dict(self):
+        """吞吐量（hz）、忙碌时间占比（busy）、输入被覆盖的次数（dropped）和失败次数"""
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        return {
+            "processed": self.processed,
+            "hz": self.meter.hz,
+            "busy": self.busy / elapsed if elapsed > 0 else 0.0,
+            "dropped": self.source.overwritten if self.source is not None else 0,
+            "failures": self.failures,
+        }
@@ -0,0 +1,147 @@
+import time
+from collections import deque
+
+import cv2
+
+
+class AdaptiveStream:
+    """单个客户端的视频推送控制
+
+    根据客户端尚未确认的帧数（积压）调整帧率、分辨率和 JPEG 质量：
+    积压达到 max_in_flight 时乘性降低（先质量，再分辨率，同时降低帧率），
+    确认及时到达时加性恢复（先帧率，再分辨率，再质量）。
+    """
+
+    SCALES = (1.0, 0.75, 0.5, 0.25)
+
+    def __init__(
+        self,
+        max_fps=20,
+        min_fps=2,
+        max_in_flight=2,
+        quality=70,
+        min_quality=30,
+        max_quality=85,
+    ):
+        """
+        参数:
+            max_fps, min_fps: 帧率范围
+            max_in_flight: 最多允许多少帧未确认
+            quality: 初始 JPEG 质量
+            min_quality, max_quality: JPEG 质量范围
+        """
+        self.min_interval = 1.0 / max_fps
+        self.max_interval = 1.0 / min_fps
+        self.max_in_flight = max_in_flight
+        self.min_quality = min_quality
+        self.max_quality = max_quality
+        self.quality = quality
+        self.scale_index = 0
+        self.interval = self.min_interval
+        self.in_flight = 0
+        self.sent = 0
+        self.acked = 0
+        self.skipped = 0
+        self.rtt = 0.0
+        self._last_sent = None
+        self._sent_times = deque()
+
+    @property
+    def scale(self):
+        return self.SCALES[self.scale_index]
+
+    @property
+    def jpeg_quality(self):
+        """取 5 的倍数，便于多个客户端共用同一份编码结果"""
+        return int(round(self.quality / 5) * 5)
+
+    def ready(self, now=None) -> bool:
+        """有新帧时调用，返回是否应该向该客户端发送"""
+        now = time.monotonic() if now is None else now
+        if self.in_flight >= self.max_in_flight:
+            self.skipped += 1
+            self._backoff()
+            return False
+        return self._last_sent is None or now - self._last_sent >= self.interval
+
+    def on_sent(self, now=None):
+        now = time.monotonic() if now is None else now
+        self.in_flight += 1
+        self.sent += 1
+        self._last_sent = now
+        self._sent_times.append(now)
+
+    def on_ack(self, now=None):
+        """客户端确认收到一帧"""
+        now = time.monotonic() if now is None else now
+        if not self._sent_times:
+            return
+        self.rtt = now - self._sent_times.popleft()
+        self.in_flight -= 1
+        self.acked += 1
+        if self.rtt > 2 * self.interval:
+            self._backoff()
+        elif self.in_flight == 0 and self.rtt < self.interval:
+            self._improve()
+
+    def _backoff(self):
+        self.interval = min(self.max_interval, self.interval * 1.5)
+        if self.quality > self.min_quality:
+            self.quality = max(self.min_quality, self.quality * 0.8)
+        elif self.scale_index < len(self.SCALES) - 1:
+            self.scale_index += 1
+
+    def _improve(self):
+        if self.interval > self.min_interval:
+            self.interval = max(self.min_interval, self.interval * 0.9)
+        elif self.scale_index > 0:
+            self.scale_index -= 1
+        else:
+            self.quality = min(self.max_quality, self.quality + 5)
+
+    def as_dict(self):
+        return {
+            "fps": 1.0 / self.interval,
+            "scale": self.scale,
+            "quality": self.jpeg_quality,
+            "in_flight": self.in_flight,
+            "sent": self.sent,
+            "acked": self.acked,
+            "skipped": self.skipped,
+            "rtt": self.rtt,
+        }
+
+
+class FrameEncoder:
+    """把同一帧按 (质量, 缩放) 编码为 JPEG，多个客户端共用编码结果"""
+
+    def __init__(self):
+        self.encoded = 0
+        self._key = None
+        self._cache = {}
+
+    def encode(self, frame, frame_id, quality, scale=1.0) -> bytes:
+        """
+        Args:
+            frame: BGR 图像
+            frame_id: 帧的标识，变化时丢弃缓存
+            quality: JPEG 质量
+            scale: 缩放比例
+        """
+        if frame_id != self._key:
+            self._key = frame_id
+            self._cache = {}
+        key = (quality, scale)
+        jpeg = self._cache.get(key)
+        if jpeg is None:
+            if scale != 1.0:
+                frame = cv2.resize(
+                    frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+                )
+            ret, buffer = cv2.imencode(
+                ".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality]
+            )
+            jpeg = buffer.tobytes() if ret else b""
+            self._cache[key] = jpeg
+            self.encoded += 1
+        return jpeg
@@ -0,0 +1,88 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.events import CoalescingEvents
+
+
+TIMEOUT = {"type": "ERROR", "error": "Timeout"}
+
+
+class FakeNode:
+    """按批次返回事件的 dora Node 替身
+
+    每批之间 next(timeout=0) 与 dora 一样返回超时的 ERROR 事件，全部取完后返回 None。
+    """
+
+    def __init__(self, batches):
+        self.batches = [list(batch) for batch in batches]
+        self.ended = False
+
+    def next(self, timeout=None):
+        if self.ended:
+            raise AssertionError("事件流结束后又调用了 next()")
+        while self.batches and not self.batches[0]:
+            self.batches.pop(0)
+            if timeout is not None and self.batches:
+                return TIMEOUT
+        if not self.batches:
+            self.ended = True
+            return None
+        return self.batches[0].pop(0)
+
+
+def input_event(event_id, value):
+    return {"type": "INPUT", "id": event_id, "value": value}
+
+
+class TestCoalescingEvents(unittest.TestCase):
+    def test_keeps_latest(self):
+        node = FakeNode(
+            [
+                [input_event("data", 1), input_event("data", 2)],
+                [input_event("data", 3)],
+            ]
+        )
+        events = CoalescingEvents(node, ("data",))
+        self.assertEqual([e["value"] for e in events], [2, 3])
+        self.assertEqual(events.dropped["data"], 1)
+        self.assertEqual(events.received, 3)
+
+    def test_other_events_kept_in_order(self):
+        node = FakeNode(
+            [
+                [
+                    input_event("data", 1),
+                    input_event("state", "IDLE"),
+                    input_event("data", 2),
+                    {"type": "STOP"},
+                ]
+            ]
+        )
+        events = CoalescingEvents(node, ("data",))
+        result = [(e["type"], e.get("value")) for e in events]
+        self.assertEqual(result, [("INPUT", "IDLE"), ("INPUT", 2), ("STOP", None)])
+
+    def test_stream_ends_while_draining(self):
+        """取积压事件时事件流结束：处理完已取出的事件后退出，不再阻塞等待"""
+        node = FakeNode([[input_event("data", 1), input_event("data", 2)]])
+        events = CoalescingEvents(node, ("data",))
+        self.assertEqual([e["value"] for e in events], [2])
+        self.assertTrue(node.ended)
+
+    def test_timeout_error_is_empty(self):
+        class TimeoutNode(FakeNode):
+            def next(self, timeout=None):
+                if timeout is not None:
+                    return TIMEOUT
+                return super().next()
+
+        node = TimeoutNode([[input_event("move", 1), input_event("move", 2)]])
+        events = CoalescingEvents(node, ("move",))
+        self.assertEqual([e["value"] for e in events], [1, 2])
+        self.assertEqual(events.as_dict()["dropped"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
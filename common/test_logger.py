@@ -0,0 +1,51 @@
+import logging
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.logger import RateLimitedLogger
+from common.tracing import RateMeter
+
+
+class TestRateLimitedLogger(unittest.TestCase):
+    def test_rate_limit(self):
+        log = RateLimitedLogger("test_rate_limit", interval=60)
+        log.logger.setLevel(logging.INFO)
+        with self.assertLogs("test_rate_limit", level="INFO") as captured:
+            log.info("target", x=1, ratio=0.123456)
+            log.info("target", x=2)
+            log.info("search", direction="left")
+            log._last["target"] -= 61
+            log.info("target", x=3)
+        messages = [record.getMessage() for record in captured.records]
+        self.assertEqual(
+            messages,
+            [
+                "target x=1 ratio=0.1235",
+                "search direction=left",
+                "target x=3 suppressed=1",
+            ],
+        )
+
+    def test_disabled_level(self):
+        log = RateLimitedLogger("test_disabled_level")
+        log.logger.setLevel(logging.INFO)
+        log.debug("target", x=1)
+        self.assertEqual(log._last, {})
+
+
+class TestRateMeter(unittest.TestCase):
+    def test_hz_and_jitter(self):
+        meter = RateMeter()
+        for now in (0.0, 0.02, 0.04, 0.06):
+            meter.tick(now)
+        self.assertAlmostEqual(meter.hz, 50)
+        self.assertAlmostEqual(meter.jitter, 0)
+        meter.tick(0.1)
+        self.assertAlmostEqual(meter.as_dict()["max_interval"], 0.04)
+        self.assertGreater(meter.jitter, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
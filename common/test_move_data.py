@@ -1,33 +1,93 @@
+import os
+import sys
+import time
 import unittest
+
 import pyarrow as pa
-from move_data import MoveData
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.move_data import DRIVE, MOVE_DTYPE, MoveData
 
 
 class TestMoveData(unittest.TestCase):
     def setUp(self):
         # 测试数据初始化
-        self.direct = 1
+        self.direction = 1
         self.speed = 100
-        self.move_data = MoveData(self.direct, self.speed)
+        self.move_data = MoveData(self.direction, self.speed)
 
     def test_init(self):
         """测试初始化"""
-        self.assertEqual(self.move_data.direct, self.direct)
+        self.assertEqual(self.move_data.direction, self.direction)
         self.assertEqual(self.move_data.speed, self.speed)
+        self.assertEqual(self.move_data.left_speed, self.speed)
+        self.assertEqual(self.move_data.right_speed, self.speed)
 
     def test_to_arrow_array(self):
         """测试转换为 pyarrow Array"""
         array = self.move_data.to_arrow_array()
         self.assertIsInstance(array, pa.Array)
-        data_list = array.to_pylist()
-        self.assertEqual(data_list, [self.direct, self.speed])
+        self.assertEqual(array.type, pa.uint8())
+        self.assertEqual(len(array), MOVE_DTYPE.itemsize)
+        # 发送时自动编号并记录时间戳
+        self.assertGreater(self.move_data.seq, 0)
+        self.assertGreater(self.move_data.timestamp_ns, 0)
 
     def test_from_arrow_array(self):
         """测试从 pyarrow Array 创建对象"""
-        array = pa.array([self.direct, self.speed])
+        original = MoveData(5, 20, -10, 30).stamp(123456789, capture_ns=100000000)
+        move_data = MoveData.from_arrow_array(original.to_arrow_array())
+        self.assertEqual(move_data.direction, 5)
+        # speed 单独传输，不等于 left_speed
+        self.assertEqual(move_data.speed, 20)
+        self.assertEqual(move_data.left_speed, -10)
+        self.assertEqual(move_data.right_speed, 30)
+        self.assertEqual(move_data.seq, original.seq)
+        self.assertEqual(move_data.timestamp_ns, 123456789)
+        self.assertEqual(move_data.capture_ns, 100000000)
+
+    def test_from_sliced_array(self):
+        """带偏移量的数组"""
+        array = MoveData(6, 25).to_arrow_array()
+        padded = pa.concat_arrays([pa.array([0, 0, 0], pa.uint8()), array])
+        move_data = MoveData.from_arrow_array(padded.slice(3))
+        self.assertEqual(move_data.direction, 6)
+        self.assertEqual(move_data.speed, 25)
+
+    def test_legacy_array(self):
+        """兼容旧的 [direction, speed] 格式"""
+        array = pa.array([self.direction, self.speed])
         move_data = MoveData.from_arrow_array(array)
-        self.assertEqual(move_data.direct, self.direct)
+        self.assertEqual(move_data.direction, self.direction)
         self.assertEqual(move_data.speed, self.speed)
+        self.assertEqual(move_data.seq, 0)
+        self.assertIsNone(move_data.age_ns())
+
+    def test_stamp_send_time(self):
+        """时间戳总是发送时间，采集时间单独记录"""
+        before = time.monotonic_ns()
+        move_data = MoveData(0, 0).stamp(capture_ns=1)
+        self.assertGreaterEqual(move_data.timestamp_ns, before)
+        self.assertEqual(move_data.capture_ns, 1)
+
+    def test_sequence_increases(self):
+        first = MoveData(1, 10).stamp()
+        second = MoveData(1, 10).stamp()
+        self.assertEqual(second.seq, first.seq + 1)
+        self.assertGreaterEqual(second.timestamp_ns, first.timestamp_ns)
+
+    def test_drive(self):
+        """线速度和角速度换算为左右轮速度"""
+        move_data = MoveData.drive(10, 4)
+        self.assertEqual(move_data.direction, DRIVE)
+        self.assertEqual((move_data.left_speed, move_data.right_speed), (6, 14))
+        # 超过上限时按比例缩小，两轮速度比不变
+        move_data = MoveData.drive(20, 10, max_speed=15)
+        self.assertEqual((move_data.left_speed, move_data.right_speed), (5, 15))
+        decoded = MoveData.from_arrow_array(move_data.to_arrow_array())
+        self.assertEqual((decoded.left_speed, decoded.right_speed), (5, 15))
+        # 线速度随指令传输
+        self.assertEqual(decoded.speed, 20)
 
     def test_multiple_arrays(self):
         """测试批量转换"""
@@ -44,8 +104,9 @@ class TestMoveData(unittest.TestCase):
         new_move_data_list = MoveData.from_arrow_arrays(arrays)
         self.assertEqual(len(new_move_data_list), 3)
         for original, new in zip(move_data_list, new_move_data_list):
-            self.assertEqual(original.direct, new.direct)
+            self.assertEqual(original.direction, new.direction)
             self.assertEqual(original.speed, new.speed)
+            self.assertEqual(original.seq, new.seq)
 
 
 if __name__ == "__main__":
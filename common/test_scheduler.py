@@ -0,0 +1,31 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.scheduler import FixedRateScheduler
+
+
+class TestFixedRateScheduler(unittest.TestCase):
+    def test_on_time(self):
+        scheduler = FixedRateScheduler(rate=50)
+        for i in range(5):
+            dt = scheduler.begin(i * 0.02)
+            self.assertAlmostEqual(dt, 0.02)
+            scheduler.end(i * 0.02 + 0.001)
+        stats = scheduler.as_dict()
+        self.assertEqual((stats["late"], stats["missed"], stats["overruns"]), (0, 0, 0))
+        self.assertAlmostEqual(stats["hz"], 50)
+
+    def test_late_and_overrun(self):
+        scheduler = FixedRateScheduler(rate=50)
+        scheduler.begin(0.0)
+        scheduler.end(0.03)
+        scheduler.begin(0.08)
+        self.assertEqual(scheduler.overruns, 1)
+        self.assertEqual(scheduler.late, 1)
+        self.assertEqual(scheduler.missed, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import sys
+import threading
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.slot import LatestSlot
+
+
+class TestLatestSlot(unittest.TestCase):
+    def test_latest_wins(self):
+        slot = LatestSlot()
+        self.assertIsNone(slot.take())
+        slot.put(1)
+        slot.put(2)
+        self.assertEqual(slot.take(), 2)
+        self.assertIsNone(slot.take())
+        self.assertEqual(slot.peek(), 2)
+        self.assertEqual(slot.as_dict(), {"puts": 2, "overwritten": 1})
+        self.assertEqual(slot.latest(), (2, 2))
+
+    def test_get_blocks_until_put(self):
+        slot = LatestSlot()
+        timer = threading.Timer(0.02, slot.put, args=("frame",))
+        timer.start()
+        self.assertEqual(slot.get(timeout=1.0), "frame")
+        self.assertIsNone(slot.get(timeout=0.01))
+
+    def test_close_wakes_consumer(self):
+        slot = LatestSlot()
+        threading.Timer(0.02, slot.close).start()
+        self.assertIsNone(slot.get(timeout=1.0))
+        self.assertTrue(slot.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
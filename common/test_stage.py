@@ -0,0 +1,99 @@
+import itertools
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.slot import LatestSlot
+from common.stage import Stage
+
+
+class TestStage(unittest.TestCase):
+    def test_slow_stage_does_not_block_upstream(self):
+        frames = LatestSlot()
+        results = LatestSlot()
+        counter = itertools.count()
+        received = []
+
+        def capture():
+            time.sleep(0.001)
+            return next(counter)
+
+        def detect(frame):
+            time.sleep(0.01)
+            return frame
+
+        stop = threading.Event()
+        stages = [
+            Stage("capture", capture, sink=frames),
+            Stage("detect", detect, source=frames, sink=results),
+            Stage("act", received.append, source=results),
+        ]
+        for stage in stages:
+            stage.start(stop)
+        time.sleep(0.3)
+        stop.set()
+        for stage in stages:
+            stage.join(1.0)
+
+        capture_stats, detect_stats, act_stats = (s.as_dict() for s in stages)
+        # 采集速度不受识别阶段影响，识别跟不上的帧被覆盖
+        self.assertGreater(capture_stats["processed"], 3 * detect_stats["processed"])
+        self.assertGreater(detect_stats["dropped"], 0)
+        self.assertGreater(detect_stats["busy"], 0.5)
+        self.assertEqual(act_stats["processed"], len(received))
+        # 执行阶段拿到的都是当时最新的帧，序号递增
+        self.assertEqual(received, sorted(received))
+
+    def test_closed_source_stops_stage(self):
+        source = LatestSlot()
+        sink = LatestSlot()
+        stage = Stage("double", lambda x: 2 * x, source=source, sink=sink)
+        thread = stage.start(threading.Event())
+        source.put(21)
+        self.assertEqual(sink.get(1.0), 42)
+        source.close()
+        thread.join(1.0)
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(sink.closed)
+
+    def test_failed_source_backs_off(self):
+        """读取失败时退避重试，不计入 processed"""
+        calls = []
+
+        def capture():
+            calls.append(time.monotonic())
+            return None
+
+        stop = threading.Event()
+        stage = Stage("capture", capture, timeout=0.05, retry_interval=0.01)
+        stage.start(stop)
+        time.sleep(0.3)
+        stop.set()
+        stage.join(1.0)
+        # 等待 0.01、0.02、0.04，之后每次 0.05 秒：0.3 秒内不超过 10 次
+        self.assertLess(len(calls), 10)
+        self.assertEqual(stage.as_dict()["processed"], 0)
+        self.assertEqual(stage.failures, len(calls))
+
+    def test_max_failures_closes_sink(self):
+        frames = iter([1, None, None, None])
+        sink = LatestSlot()
+        stage = Stage(
+            "capture",
+            lambda: next(frames),
+            sink=sink,
+            retry_interval=0.001,
+            max_failures=3,
+        )
+        thread = stage.start(threading.Event())
+        thread.join(1.0)
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(sink.closed)
+        self.assertEqual((stage.processed, stage.failures), (1, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import unittest
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.stream import AdaptiveStream, FrameEncoder
+
+
+class TestAdaptiveStream(unittest.TestCase):
+    def test_backlog_degrades(self):
+        stream = AdaptiveStream(max_fps=20, max_in_flight=2, quality=70)
+        now = 0.0
+        for _ in range(2):
+            self.assertTrue(stream.ready(now))
+            stream.on_sent(now)
+            now += 0.1
+        # 两帧都未确认，之后的帧被跳过，质量和帧率下降
+        for _ in range(10):
+            self.assertFalse(stream.ready(now))
+            now += 0.1
+        self.assertEqual(stream.skipped, 10)
+        self.assertEqual(stream.jpeg_quality, 30)
+        self.assertLess(stream.scale, 1.0)
+        self.assertAlmostEqual(stream.interval, 0.5)
+
+    def test_fast_acks_recover(self):
+        stream = AdaptiveStream(max_fps=20, quality=30)
+        stream.scale_index = 2
+        stream.interval = 0.5
+        now = 0.0
+        for _ in range(100):
+            if stream.ready(now):
+                stream.on_sent(now)
+                stream.on_ack(now + 0.01)
+            now += 0.05
+        self.assertEqual(stream.interval, stream.min_interval)
+        self.assertEqual(stream.scale, 1.0)
+        self.assertGreater(stream.jpeg_quality, 30)
+        self.assertEqual(stream.in_flight, 0)
+
+    def test_rate_limited(self):
+        stream = AdaptiveStream(max_fps=10)
+        self.assertTrue(stream.ready(0.0))
+        stream.on_sent(0.0)
+        stream.on_ack(0.01)
+        self.assertFalse(stream.ready(0.05))
+        self.assertTrue(stream.ready(0.1))
+
+
+class TestFrameEncoder(unittest.TestCase):
+    def test_shared_encoding(self):
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        encoder = FrameEncoder()
+        a = encoder.encode(frame, 1, 70)
+        b = encoder.encode(frame, 1, 70)
+        small = encoder.encode(frame, 1, 70, 0.5)
+        self.assertIs(a, b)
+        self.assertEqual(encoder.encoded, 2)
+        decoded = cv2.imdecode(np.frombuffer(small, np.uint8), cv2.IMREAD_COLOR)
+        self.assertEqual(decoded.shape, (240, 320, 3))
+        encoder.encode(frame, 2, 70)
+        self.assertEqual(encoder.encoded, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.tracing import CAPTURE_KEY, Histogram, Tracer, capture_ns
+
+
+class TestHistogram(unittest.TestCase):
+    def test_percentile(self):
+        histogram = Histogram()
+        for ms in range(1, 101):
+            histogram.add(ms / 1000)
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.mean, 0.0505)
+        # 分桶宽度约 26%，分位数只要求落在同一个桶内
+        self.assertAlmostEqual(histogram.percentile(50), 0.05, delta=0.05 * 0.26)
+        self.assertAlmostEqual(histogram.percentile(100), 0.1)
+        self.assertEqual(Histogram().percentile(50), 0.0)
+
+
+class TestCaptureNs(unittest.TestCase):
+    def test_explicit_capture(self):
+        self.assertEqual(capture_ns({CAPTURE_KEY: 42}), 42)
+
+    def test_dora_timestamp(self):
+        stamp = datetime.now(timezone.utc) - timedelta(milliseconds=30)
+        age = time.monotonic_ns() - capture_ns({"timestamp": stamp})
+        self.assertAlmostEqual(age / 1e6, 30, delta=10)
+
+    def test_missing(self):
+        before = time.monotonic_ns()
+        self.assertGreaterEqual(capture_ns({}), before)
+
+
+class TestTracer(unittest.TestCase):
+    def test_dump(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "node.json")
+            tracer = Tracer("node", path)
+            with tracer.stage("detect"):
+                pass
+            tracer.record_since("end_to_end", time.monotonic_ns() - 5_000_000)
+            tracer.record_since("skipped", None)
+            tracer.dump()
+            with open(path) as f:
+                data = json.load(f)
+        self.assertEqual(set(data["stages"]), {"detect", "end_to_end"})
+        self.assertEqual(data["stages"]["detect"]["count"], 1)
+        self.assertGreaterEqual(data["stages"]["end_to_end"]["min"], 0.005)
+
+    def test_to_arrow(self):
+        tracer = Tracer("node")
+        tracer.record("serial", 0.001)
+        rows = tracer.to_arrow().to_pylist()
+        self.assertEqual(rows[0]["stage"], "serial")
+        self.assertEqual(rows[0]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,236 @@
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pyarrow as pa
+
+# 图像采集时间（time.monotonic_ns()）在 metadata 中的键
+CAPTURE_KEY = "capture_ns"
+
+# 直方图桶上界（秒）：10us ~ 10s，每十倍 10 个桶
+BUCKET_BOUNDS = tuple(10 ** (exp / 10) * 1e-5 for exp in range(61))
+
+# 当前正在处理的帧的采集时间，由接收数据的节点设置，发送指令时读取
+_current_capture = None
+
+
+def capture_ns(metadata) -> int:
+    """从输入的 metadata 中取出图像采集时间
+
+    上游已经记录 capture_ns 时直接使用；否则用 dora 消息自带的 timestamp
+    （墙上时间）换算到 monotonic 时钟；都没有时取当前时间。
+    """
+    value = metadata.get(CAPTURE_KEY) if metadata else None
+    if value is not None:
+        return int(value)
+    stamp = metadata.get("timestamp") if metadata else None
+    now = time.monotonic_ns()
+    if stamp is not None:
+        wall = stamp.timestamp() if hasattr(stamp, "timestamp") else stamp / 1e9
+        return now - max(0, int((time.time() - wall) * 1e9))
+    return now
+
+
+def set_capture(value):
+    """记录当前帧的采集时间，之后发出的指令以此为时间戳"""
+    global _current_capture
+    _current_capture = value
+
+
+def current_capture():
+    """当前帧的采集时间，未设置时返回 None"""
+    return _current_capture
+
+
+class Histogram:
+    """对数分桶的耗时直方图（秒）"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        """近似分位数，返回所在桶的上界（不超过最大值）"""
+        if not self.count:
+            return 0.0
+        target = q / 100 * self.count
+        cumulative = 0
+        for i, n in enumerate(self.buckets):
+            cumulative += n
+            if cumulative >= target and n:
+                bound = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class Tracer:
+    """按阶段记录耗时直方图，定期写入本地文件
+
+    用法:
+        tracer = Tracer.from_env("color")
+        with tracer.stage("detect"):
+            ...
+        tracer.record_since("end_to_end", capture)
+    """
+
+    def __init__(self, name, path=None, interval=5.0):
+        """
+        参数:
+            name: 节点名称
+            path: 输出的 JSON 文件，None 时不写文件
+            interval: 自动写文件的间隔（秒）
+        """
+        self.name = name
+        self.path = path
+        self.interval = interval
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._last_dump = time.monotonic()
+
+    @classmethod
+    def from_env(cls, name):
+        """TRACE_DIR 设置时把直方图写到 TRACE_DIR/<name>.json"""
+        directory = os.getenv("TRACE_DIR")
+        path = os.path.join(directory, f"{name}.json") if directory else None
+        return cls(name, path, float(os.getenv("TRACE_INTERVAL", "5")))
+
+    def record(self, stage, seconds):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.add(seconds)
+
+    def record_since(self, stage, start_ns, now_ns=None):
+        """记录从 start_ns（monotonic）到现在的耗时"""
+        if start_ns is None:
+            return
+        now_ns = time.monotonic_ns() if now_ns is None else now_ns
+        self.record(stage, (now_ns - start_ns) / 1e9)
+
+    @contextmanager
+    def stage(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def summary(self):
+        with self._lock:
+            return {stage: h.summary() for stage, h in self.histograms.items()}
+
+    def to_arrow(self) -> pa.Array:
+        """各阶段统计的 struct 数组，可作为 dora 输出发送"""
+        rows = [{"stage": stage, **values} for stage, values in self.summary().items()]
+        return pa.array(
+            rows,
+            type=pa.struct(
+                [pa.field("stage", pa.string()), pa.field("count", pa.int64())]
+                + [
+                    pa.field(key, pa.float64())
+                    for key in ("mean", "min", "p50", "p90", "p99", "max")
+                ]
+            ),
+        )
+
+    def dump(self, path=None):
+        """把统计和分桶写入 JSON 文件"""
+        path = path or self.path
+        if path is None:
+            return
+        with self._lock:
+            data = {
+                "node": self.name,
+                "bucket_bounds": BUCKET_BOUNDS,
+                "stages": {
+                    stage: {**h.summary(), "buckets": h.buckets}
+                    for stage, h in self.histograms.items()
+                },
+            }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+
+    def maybe_dump(self):
+        """距上次写文件超过 interval 时写一次"""
+        now = time.monotonic()
+        if self.path is not None and now - self._last_dump >= self.interval:
+            self._last_dump = now
+            self.dump()
+
+
+class RateMeter:
+    """统计循环频率和抖动
+
+    每次循环调用 tick()，在最近 window 个间隔上计算频率、间隔标准差（抖动）和最大间隔。
+    """
+
+    def __init__(self, window=100):
+        self.intervals = deque(maxlen=window)
+        self.ticks = 0
+        self._last = None
+
+    def tick(self, now=None):
+        now = time.monotonic() if now is None else now
+        if self._last is not None:
+            self.intervals.append(now - self._last)
+        self._last = now
+        self.ticks += 1
+
+    @property
+    def hz(self):
+        if not self.intervals:
+            return 0.0
+        return len(self.intervals) / sum(self.intervals)
+
+    @property
+    def jitter(self):
+        """间隔的标准差（秒）"""
+        if len(self.intervals) < 2:
+            return 0.0
+        mean = sum(self.intervals) / len(self.intervals)
+        return (
+            sum((x - mean) ** 2 for x in self.intervals) / len(self.intervals)
+        ) ** 0.5
+
+    def as_dict(self):
+        return {
+            "ticks": self.ticks,
+            "hz": self.hz,
+            "jitter": self.jitter,
+            "max_interval": max(self.intervals, default=0.0),
+        }
@@ -1,5 +1,17 @@
-from common.move_data import MoveData
-from untils import translate_direction
+from common.move_data import DRIVE, MoveData
+
+
+# 方向转换
+def translate_direction(direction: int):
+    directions = {
+        0: "Stop",
+        1: "Advance",
+        2: "Back",
+        5: "Trun_Left",
+        6: "Trun_Right",
+        DRIVE: "Drive",
+    }
+    return directions.get(direction)
 
 
 class ViewData:
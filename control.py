@@ -1,27 +1,92 @@
 import cv2
-import serial
-import struct
 import threading
-import time
-import base64
-from flask import Flask, render_template
+from flask import Flask, Response, jsonify, render_template, request
 from flask_socketio import SocketIO, emit
 import requests
 from car_cv import CarCV
+from common.logger import RateLimitedLogger
 from common.move_data import MoveData
+from common.slot import LatestSlot
+from common.stage import Stage
+from common.stream import AdaptiveStream, FrameEncoder
 from common.view import ViewData
 from motor.Motor import ModbusMotor, MotorBase
-from mycv.color import ColorDetector
+from mycv.pipeline import VisionPipeline
+from mycv.replay import open_capture
 
 app = Flask(__name__)
+# 自动选择 eventlet/gevent/threading；摄像头和识别在独立的系统线程中运行，
+# 与服务器之间只通过 LatestSlot 交换数据，处理函数中不做任何阻塞操作
 socketio = SocketIO(app)
 
+# 流水线各阶段之间的单槽队列：采集 -> 识别 -> 执行，识别结果同时推送到前端
+frame_slot = LatestSlot()  # 摄像头的最新一帧
+command_slot = LatestSlot()  # 待发送给电机的最新指令
+move_slot = LatestSlot()  # 最新的运动指令（推送到前端）
+video_slot = LatestSlot()  # 最新的标注图像
+# 采集、识别、执行三个阶段，各自在独立的系统线程中运行
+stages = []
+
+# 自动控制开关，为 True 时由识别结果控制电机，手动控制被禁用
+auto_control = threading.Event()
+# 每个 SocketIO 客户端的推送状态（按 sid），以及 MJPEG 观看者数量；
+# 没有任何观看者时跳过绘制、编码和推送
+clients_lock = threading.Lock()
+streams = {}
+mjpeg_viewers = 0
+# 同一帧按相同的 (质量, 缩放) 只编码一次，供所有 SocketIO 客户端共用
+encoder = FrameEncoder()
+
+MOVE_INTERVAL = 0.1  # 运动数据推送间隔（秒）
+VIDEO_POLL_INTERVAL = 0.01  # 检查新视频帧的间隔（秒）
+STATS_INTERVAL = 5.0  # 各阶段吞吐量写入日志的间隔（秒）
+CAPTURE_MAX_FAILURES = 50  # 连续读取失败的次数（按退避约 20 秒）超过后停止采集
+
+log = RateLimitedLogger("control", interval=STATS_INTERVAL)
+
 
 @app.route("/")
 def index():
     return render_template("index.html")
 
 
+@app.route("/video_feed")
+def video_feed():
+    """MJPEG 视频流，可直接用 <img src="/video_feed"> 显示
+
+    生成器每次被恢复说明上一帧已交给网络层，作为该帧的确认；
+    网络拥塞时恢复变慢，帧率、分辨率和质量随之降低。
+    """
+
+    def generate():
+        global mjpeg_viewers
+        stream = AdaptiveStream()
+        mjpeg_encoder = FrameEncoder()
+        with clients_lock:
+            mjpeg_viewers += 1
+        last_version = None
+        try:
+            while True:
+                version, frame = video_slot.latest()
+                if version == last_version or frame is None or not stream.ready():
+                    socketio.sleep(VIDEO_POLL_INTERVAL)
+                    continue
+                last_version = version
+                jpeg = mjpeg_encoder.encode(
+                    frame, version, stream.jpeg_quality, stream.scale
+                )
+                stream.on_sent()
+                yield (
+                    b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + jpeg + b"\r\n"
+                )
+                stream.on_ack()
+        finally:
+            with clients_lock:
+                mjpeg_viewers -= 1
+
+    return Response(generate(), mimetype="multipart/x-mixed-replace; boundary=frame")
+
+
 def get_command(direction):
     # 控制速度逻辑
     commands = {
@@ -33,30 +98,53 @@ def get_command(direction):
     return commands.get(direction)
 
 
+@socketio.on("connect")
+def handle_connect():
+    with clients_lock:
+        streams[request.sid] = AdaptiveStream()
+
+
+@socketio.on("disconnect")
+def handle_disconnect():
+    with clients_lock:
+        streams.pop(request.sid, None)
+
+
+def has_clients():
+    with clients_lock:
+        return bool(streams) or mjpeg_viewers > 0
+
+
+def on_frame_ack(sid):
+    """前端确认收到一帧"""
+    with clients_lock:
+        stream = streams.get(sid)
+        if stream is not None:
+            stream.on_ack()
+
+
 @socketio.on("control")
 def handle_control(data):
-    global global_flag
+    # Control 只把指令放入串口发送队列，不会阻塞
     direction = data.get("direction")
     if direction in ["up", "down", "left", "right"]:
-        if not global_flag:
+        if not auto_control.is_set():
             car_controller.Control(get_command(direction))
             emit("response", {"status": "Moving " + direction})
         else:
             emit("response", {"status": "Control disabled"})
     else:
-        if  global_flag:
+        if auto_control.is_set():
             move_data = MoveData(0, 0)
             car_controller.Control(move_data)
             emit("response", {"status": "Stopped"})
         else:
             emit("response", {"status": "Control disabled"})
-    time.sleep(0.05)
 
 
 @socketio.on("disable")
 def handle_disable():
-    global global_flag
-    if global_flag:
+    if auto_control.is_set():
         move_data = MoveData(0, 0)
         car_controller.Control(move_data)
         emit("response", {"status": "Disabled"})
@@ -66,8 +154,7 @@ def handle_disable():
 
 @socketio.on("stop")
 def handle_stop():
-    global global_flag
-    if global_flag:
+    if auto_control.is_set():
         move_data = MoveData(0, 0)
         car_controller.Control(move_data)
         emit("response", {"status": "Stopped"})
@@ -77,98 +164,153 @@ def handle_stop():
 
 @socketio.on("toggle_control")
 def handle_toggle_control():
-    global global_flag
-    global_flag = not global_flag
-    status = "enabled" if global_flag else "disabled"
+    if auto_control.is_set():
+        auto_control.clear()
+    else:
+        auto_control.set()
+    status = "enabled" if auto_control.is_set() else "disabled"
     emit("response", {"status": f"Control {status}"})
 
 
-def cv():
-    car_cv = CarCV()
-    cap = cv2.VideoCapture(0)
+def open_camera():
+    # 设置 REPLAY_PATH 时回放录制的图像，便于离线复现
+    cap = open_capture(0)
     cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
     cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-    if not cap.isOpened():
-        print("无法打开摄像头！")
-        return None
-    try:
-        while True:
-            ret, frame = cap.read()
-            # 摄像头采集的是由 x 轴反转的图像，将图像翻转
-            frame = cv2.flip(frame, 0)
-            
-            # 创建颜色检测器实例，设置 HSV 颜色范围（黄色网球）和最小检测面积
-            dector = ColorDetector([30, 70, 80], [50, 255, 255], min_area=50)
-            # 处理当前帧，返回处理后的图像、掩码和目标检测数据（位置和比例信息）
-            frame, mask, data = dector.process(frame)
-            # 根据检测到的目标数据生成相应的运动控制指令
-            move_data = car_cv.process_data(data)
-            # 使用全局变量存储最新的 move_data 和 processed_frame
-            global latest_move_data, processed_frame,global_flag
-            latest_move_data = move_data
-
-            processed_frame = frame  # 存储处理后的图像
-            global car_controller
-            if global_flag==True:
-                # 发送指令到电机
-                car_controller.Control(latest_move_data)
-            time.sleep(0.01)
+    return cap
 
-    finally:
-        cap.release()
 
+def read_frame(cap):
+    """采集阶段：读取一帧，失败时返回 None（不覆盖 frame_slot 中的帧）"""
+    ret, frame = cap.read()
+    return frame if ret else None
 
-# 添加一个新函数，定期发送数据到前端
-def send_move_data():
-    while True:
-        if latest_move_data is not None:
-            # 确保发送的数据包含前端期望的 direction 和 speed 字段
-            move_data_dict = ViewData(latest_move_data).__dict__.copy()
-            socketio.emit("move_data_update", {"move_data": move_data_dict})
-        time.sleep(0.01)  # 每 100 毫秒发送一次数据
 
+def make_detect_step():
+    """识别阶段：只处理最新的一帧，生成运动指令"""
+    car_cv = CarCV()
+    # 检测器只创建一次；跟踪到网球时只处理预测位置附近的区域，跟踪状态由 car_cv 更新
+    pipeline = VisionPipeline(min_area=50, tracker=car_cv.tracker)
+
+    def detect(frame):
+        # 没有客户端时不需要绘制标注图像
+        pipeline.draw = has_clients()
+        # 摄像头采集的是由 x 轴反转的图像，流水线直接在原图上识别并换算坐标，
+        # 只有绘制标注图像时才翻转
+        frame, mask, data = pipeline.process(frame)
+        # 根据检测到的目标数据生成相应的运动控制指令
+        move_data = car_cv.process_data(data)
+        move_slot.put(move_data)
+        if pipeline.draw:
+            video_slot.put(frame)
+        return move_data
+
+    return detect
+
+
+def actuate(move_data):
+    """执行阶段：自动控制开启时把指令发给电机，串口或 I2C 阻塞不影响采集和识别"""
+    if auto_control.is_set():
+        car_controller.Control(move_data)
 
-# 添加一个新函数，定期发送视频帧到前端
-def send_video_frame():
+
+@app.route("/stats")
+def stats():
+    """各阶段的吞吐量（hz）、忙碌时间占比和丢弃的帧数"""
+    return jsonify({stage.name: stage.as_dict() for stage in stages})
+
+
+def report_stats():
+    """后台任务：定期把各阶段的吞吐量写到日志"""
     while True:
-        if processed_frame is not None:
-            # 将 OpenCV 图像转换为 JPEG
-            ret, jpeg = cv2.imencode(".jpg", processed_frame)
-            if ret:
-                # 将 JPEG 转换为 Base64 字符串
-                jpeg_base64 = base64.b64encode(jpeg.tobytes()).decode("utf-8")
-                # 发送到前端
-                socketio.emit("video_frame_update", {"frame": jpeg_base64})
-        time.sleep(0.05)  # 每 100 毫秒发送一次
+        socketio.sleep(STATS_INTERVAL)
+        for stage in stages:
+            log.info(stage.name, **stage.as_dict())
 
 
-if __name__ == "__main__":
-    # 添加全局变量
-    latest_move_data = MoveData(0, 0)
-    global_flag=False
-    processed_frame = None
-    thread = None
+def broadcast_move_data():
+    """后台任务：把最新的运动数据推送到前端"""
+    while True:
+        socketio.sleep(MOVE_INTERVAL)
+        move_data = move_slot.take()
+        if move_data is None or not has_clients():
+            continue
+        # 确保发送的数据包含前端期望的 direction 和 speed 字段
+        move_data_dict = ViewData(move_data).__dict__.copy()
+        socketio.emit("move_data_update", {"move_data": move_data_dict})
 
-    # 创建并启动 CV 线程
-    cv_thread = threading.Thread(target=cv, daemon=True)
-    cv_thread.start()
 
-    # 创建并启动数据发送线程
-    data_thread = threading.Thread(target=send_move_data, daemon=True)
-    data_thread.start()
+def broadcast_video_frame():
+    """后台任务：把最新的标注图像以二进制 JPEG 推送给每个客户端
+
+    每个客户端按自己的积压情况单独决定是否发送这一帧以及使用的质量和分辨率，
+    前端处理完一帧后通过 ack 回调确认，慢的客户端不会拖慢其他客户端。
+    """
+    last_version = None
+    while True:
+        socketio.sleep(VIDEO_POLL_INTERVAL)
+        version, frame = video_slot.latest()
+        if version == last_version or frame is None:
+            continue
+        last_version = version
+        with clients_lock:
+            ready = [
+                (sid, stream.jpeg_quality, stream.scale)
+                for sid, stream in streams.items()
+                if stream.ready()
+            ]
+        for sid, quality, scale in ready:
+            jpeg = encoder.encode(frame, version, quality, scale)
+            with clients_lock:
+                stream = streams.get(sid)
+                if stream is None:
+                    continue
+                stream.on_sent()
+            socketio.emit(
+                "video_frame",
+                jpeg,
+                to=sid,
+                callback=lambda *args, sid=sid: on_frame_ack(sid),
+            )
 
-    # 创建并启动视频帧发送线程
-    video_thread = threading.Thread(target=send_video_frame, daemon=True)
-    video_thread.start()
 
+if __name__ == "__main__":
     port_name = "/dev/ttyUSB0"  # 串口名称，根据实际情况修改
     car_controller: MotorBase = ModbusMotor(port=port_name)
 
+    # 摄像头读取、识别和电机通信都会阻塞，各自放在独立的系统线程中，
+    # 阶段之间只保留最新的值，任何一个阶段变慢都不会拖慢摄像头
+    stop_event = threading.Event()
+    cap = open_camera()
+    if cap.isOpened():
+        stages.append(
+            Stage(
+                "capture",
+                lambda: read_frame(cap),
+                sink=frame_slot,
+                max_failures=CAPTURE_MAX_FAILURES,
+            )
+        )
+    else:
+        print("无法打开摄像头！")
+        frame_slot.close()
+    stages.append(
+        Stage("detect", make_detect_step(), source=frame_slot, sink=command_slot)
+    )
+    stages.append(Stage("act", actuate, source=command_slot))
+    for stage in stages:
+        stage.start(stop_event)
+
+    # 推送任务由 SocketIO 调度，随所选的异步模式运行
+    socketio.start_background_task(broadcast_move_data)
+    socketio.start_background_task(broadcast_video_frame)
+    socketio.start_background_task(report_stats)
+
     # 在启动 Flask 服务器之前，向 HTTP 服务器发送一次数据
     http_server_url = "http://****"  # HTTP 服务器地址，根据实际情况修改
     status_data = {"status": "Ready", "message": "Car control system is ready."}
     try:
-        response = requests.post(http_server_url, json=status_data)
+        response = requests.post(http_server_url, json=status_data, timeout=2)
         if response.status_code == 200:
             print("Data sent successfully to the HTTP server.")
         else:
@@ -178,4 +320,11 @@ if __name__ == "__main__":
     except requests.exceptions.RequestException as e:
         print(f"Error sending data to the HTTP server: {e}")
 
-    socketio.run(app, host="0.0.0.0", port=5000)
+    try:
+        socketio.run(app, host="0.0.0.0", port=5000)
+    finally:
+        stop_event.set()
+        for stage in stages:
+            stage.join(1.0)
+        cap.release()
+        car_controller.close()
@@ -5,11 +5,17 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/../")
 import smbus
 import time
 import traitlets
-import serial
 import struct
+from functools import partial
 from typing import Protocol
 from simple_pid import PID
-from common.move_data import MoveData
+from common.move_data import DRIVE, MoveData
+from motor.dedup import CommandDedup
+from motor.maneuver import ManeuverScheduler
+from motor.modbus_frame import FrameCache, crc16, valid_crc
+from motor.pca9685_bus import MODE1_AI, RegisterMirror
+from motor.sim import SimMotor
+from motor.transport import SerialTransport
 
 
 # 定义电机驱动基类
@@ -21,7 +27,26 @@ class MotorBase(Protocol):
 
 # 定义 PCA9685 电机驱动类
 class PCA9685Motor(traitlets.HasTraits):
-    def __init__(self, d1, d2, d3, d4):
+    def __init__(
+        self,
+        d1,
+        d2,
+        d3,
+        d4,
+        bus=None,
+        keepalive=0.5,
+        clock=time.monotonic,
+        drive_scale=60,
+    ):
+        """
+        参数:
+            d1~d4: 四个电机通道的初始占空比
+            bus: I2C 总线对象，默认打开 smbus 2 号总线，测试时可传入 FakeSMBus
+            keepalive: 相同的电机方向组合的重发间隔（秒），见 CommandDedup
+            clock: 去重使用的时钟
+            drive_scale: DRIVE 指令每单位轮速对应的占空比，默认 car_cv 的最大速度 25
+                对应初始占空比 1500
+        """
         super().__init__()
         # 设置 PCA9685 I2C 地址
         self.PCA9685_ADDRESS = 0x60
@@ -32,9 +57,21 @@ class PCA9685Motor(traitlets.HasTraits):
         self.LED0_ON_L = 0x06
 
         # 初始化 I2C 总线
-        self.bus = smbus.SMBus(2)
+        self.bus = bus if bus is not None else smbus.SMBus(2)
+        # 通道寄存器镜像，只写发生变化的通道
+        self.mirror = RegisterMirror(self.bus, self.PCA9685_ADDRESS)
+        # Car_run 每次赋值都会调用 Status_control，方向不变时跳过
+        self.dedup = CommandDedup(keepalive, clock)
+        # 定时重发时不经过镜像比较，重新写入全部电机通道
+        self.dedup.on_refresh = self.mirror.invalidate
+        # LX_90D/RX_90D 等定时动作在后台线程执行，Control 会中止它们
+        self.maneuvers = ManeuverScheduler()
+        self.drive_scale = drive_scale
+        # 离散方向指令使用的占空比，DRIVE 指令结束后恢复
+        self.duty = (d1, d2, d3, d4)
+        self._driving = False
         self.set_pwm_frequency(50)
-        self.set_pwm(d1, d2, d3, d4)
+        self.set_pwm(*self.duty)
         self.Stop()
 
         self.release_angle1 = 90
@@ -69,6 +106,17 @@ class PCA9685Motor(traitlets.HasTraits):
 
         return value
 
+    def Control(self, data: MoveData):
+        # 新指令优先于正在执行的定时动作；离散方向的速度由 set_pwm 设置，这里只切换方向
+        self.maneuvers.cancel()
+        if data.direction == DRIVE:
+            self.Drive(data.left_speed, data.right_speed)
+            return
+        if self._driving:
+            self._driving = False
+            self.set_pwm(*self.duty)
+        self.Car_run = data.direction
+
     def Stop(self):  # 停止
         self.Status_control(0, 0, 0, 0)
 
@@ -108,19 +156,29 @@ class PCA9685Motor(traitlets.HasTraits):
     def Rotate_Left(self):  # 右旋转
         self.Status_control(-1, 1, -1, 1)
 
-    def LX_90D(self, t_ms):  # 左旋转 90 度
-        self.Rotate_Left()
-        time.sleep(t_ms / 1000.0)
-        self.Stop()
+    def LX_90D(self, t_ms):  # 左旋转 90 度，立即返回，旋转 t_ms 毫秒后停止
+        self.maneuvers.run([(self.Rotate_Left, t_ms / 1000.0), (self.Stop, 0)])
 
-    def RX_90D(self, t_ms):  # 右旋转 90 度
-        self.Rotate_Right()
-        time.sleep(t_ms / 1000.0)
-        self.Stop()
+    def RX_90D(self, t_ms):  # 右旋转 90 度，立即返回，旋转 t_ms 毫秒后停止
+        self.maneuvers.run([(self.Rotate_Right, t_ms / 1000.0), (self.Stop, 0)])
 
     def GS_run(self, L_speed, R_speed):
         self.set_pwm(L_speed, R_speed, L_speed, R_speed)
 
+    def Drive(self, left_speed, right_speed):  # 差速行驶
+        """左右轮速度的符号决定每侧电机的转向，大小乘以 drive_scale 作为占空比
+
+        m4/m2 为左侧电机，m3/m1 为右侧电机，与 Rotate_Left 和 GS_run 的通道分配一致。
+        """
+        self._driving = True
+        self.GS_run(
+            min(abs(left_speed) * self.drive_scale, 4095),
+            min(abs(right_speed) * self.drive_scale, 4095),
+        )
+        left = (left_speed > 0) - (left_speed < 0)
+        right = (right_speed > 0) - (right_speed < 0)
+        self.Status_control(left, right, left, right)
+
     def set_pwm_frequency(self, freq):
         # 计算预分频值
         prescale_val = int(25000000.0 / (4096 * freq) - 1)
@@ -144,7 +202,9 @@ class PCA9685Motor(traitlets.HasTraits):
         # 将 RESTART 位（MODE1 寄存器的第 7 位）设置为 1，重启设备
         self.bus.write_byte_data(self.PCA9685_ADDRESS, self.MODE1, old_mode | 0x80)
 
-        self.bus.write_byte_data(self.PCA9685_ADDRESS, self.MODE1, 0x00)
+        # 打开寄存器自动递增，块写入依赖该位
+        self.bus.write_byte_data(self.PCA9685_ADDRESS, self.MODE1, MODE1_AI)
+        self.mirror.invalidate()
 
     def set_pwm(self, Duty_channel4, Duty_channel3, Duty_channel2, Duty_channel1):
         # 设置 PWM 通道的占空比
@@ -153,60 +213,38 @@ class PCA9685Motor(traitlets.HasTraits):
         Duty_channel3 = max(0, min(Duty_channel3, 4095))  # 限制 off_time 在 0-4095 之间
         Duty_channel4 = max(0, min(Duty_channel4, 4095))  # 限制 off_time 在 0-4095 之间
 
-        # 简化后的 PWM 设置函数
-        def set_channel_pwm(channel, duty):
-            self.bus.write_byte_data(
-                self.PCA9685_ADDRESS, self.LED0_ON_L + 4 * channel, 0 & 0xFF
-            )
-            self.bus.write_byte_data(
-                self.PCA9685_ADDRESS, self.LED0_ON_L + 4 * channel + 1, 0 >> 8
-            )
-            self.bus.write_byte_data(
-                self.PCA9685_ADDRESS, self.LED0_ON_L + 4 * channel + 2, duty & 0xFF
-            )
-            self.bus.write_byte_data(
-                self.PCA9685_ADDRESS, self.LED0_ON_L + 4 * channel + 3, duty >> 8
-            )
-
-        set_channel_pwm(0, Duty_channel1)
-        set_channel_pwm(5, Duty_channel2)
-        set_channel_pwm(6, Duty_channel3)
-        set_channel_pwm(11, Duty_channel4)
+        self.mirror.write(
+            {
+                0: (0, Duty_channel1),
+                5: (0, Duty_channel2),
+                6: (0, Duty_channel3),
+                11: (0, Duty_channel4),
+            }
+        )
 
     def Status_control(self, m4, m3, m2, m1):
-        # 简化后的电机控制函数
-        def set_motor_pwm(channel_pair, direction):
-            channel1, channel2 = channel_pair
-
-            if direction == -1:  # 反向
-                set_channel_pwm(channel1, 4095)
-                set_channel_pwm(channel2, 0)
-            elif direction == 0:  # 停止
-                set_channel_pwm(channel1, 0)
-                set_channel_pwm(channel2, 0)
-            elif direction == 1:  # 正向
-                set_channel_pwm(channel1, 0)
-                set_channel_pwm(channel2, 4095)
-
-        def set_channel_pwm(channel, duty):
-            self.bus.write_byte_data(
-                self.PCA9685_ADDRESS, self.LED0_ON_L + 4 * channel, 0 & 0xFF
-            )
-            self.bus.write_byte_data(
-                self.PCA9685_ADDRESS, self.LED0_ON_L + 4 * channel + 1, 0 >> 8
-            )
-            self.bus.write_byte_data(
-                self.PCA9685_ADDRESS, self.LED0_ON_L + 4 * channel + 2, duty & 0xFF
-            )
-            self.bus.write_byte_data(
-                self.PCA9685_ADDRESS, self.LED0_ON_L + 4 * channel + 3, duty >> 8
-            )
-
-        # 控制四个电机
-        set_motor_pwm((1, 2), m1)
-        set_motor_pwm((3, 4), m2)
-        set_motor_pwm((7, 8), m3)
-        set_motor_pwm((9, 10), m4)
+        if not self.dedup.should_send((m4, m3, m2, m1)):
+            return
+        # 每个电机由一对通道控制，正反转通过占空比组合实现
+        duties = {
+            -1: (4095, 0),  # 反向
+            0: (0, 0),  # 停止
+            1: (0, 4095),  # 正向
+        }
+        channels = {}
+        for (channel1, channel2), direction in (
+            ((1, 2), m1),
+            ((3, 4), m2),
+            ((7, 8), m3),
+            ((9, 10), m4),
+        ):
+            if direction in duties:
+                duty1, duty2 = duties[direction]
+                channels[channel1] = (0, duty1)
+                channels[channel2] = (0, duty2)
+
+        # 控制四个电机，只写发生变化的通道
+        self.mirror.write(channels)
 
     def set_servo_angle(self, angle):
         min_pulse = 150
@@ -220,24 +258,10 @@ class PCA9685Motor(traitlets.HasTraits):
         # 设置 PWM 通道的占空比
         Duty_channel1 = self.set_servo_angle(angle1)
 
-        def set_channel_pwm(channel, on_value, off_value):
-            self.bus.write_byte_data(
-                self.PCA9685_ADDRESS, self.LED0_ON_L + 4 * channel, on_value & 0xFF
-            )
-            self.bus.write_byte_data(
-                self.PCA9685_ADDRESS, self.LED0_ON_L + 4 * channel + 1, on_value >> 8
-            )
-            self.bus.write_byte_data(
-                self.PCA9685_ADDRESS, self.LED0_ON_L + 4 * channel + 2, off_value & 0xFF
-            )
-            self.bus.write_byte_data(
-                self.PCA9685_ADDRESS, self.LED0_ON_L + 4 * channel + 3, off_value >> 8
-            )
-
-        set_channel_pwm(channel, 0, Duty_channel1)
+        self.mirror.write({channel: (0, Duty_channel1)})
 
     def release(self):
-        self.bus.write_byte_data(self.PCA9685_ADDRESS, self.MODE1, 0x00)
+        self.bus.write_byte_data(self.PCA9685_ADDRESS, self.MODE1, MODE1_AI)
 
     def traffic_light_change(self):
         self.set_servo(12, 120)
@@ -267,16 +291,37 @@ class PCA9685Motor(traitlets.HasTraits):
 
 
 class ModbusMotor(MotorBase):
-    def __init__(self, port):
+    def __init__(
+        self, port, queue_size=8, frame_cache_size=256, read_back=0, keepalive=0.5
+    ):
+        """
+        参数:
+            port: 串口名称
+            queue_size: 发送队列长度
+            frame_cache_size: 指令帧缓存大小
+            read_back: 大于 0 时每发送一帧读回该长度的应答，统计往返时间
+                （transport.stats 中的 avg_rtt/max_rtt/timeouts），驱动器不应答时保持 0
+            keepalive: 相同运动指令帧的重发间隔（秒），见 CommandDedup
+        """
         super().__init__()
         self.port = port
+        # 串口只打开一次，Control 只负责把指令放入发送队列
+        self.transport = SerialTransport(
+            port,
+            baudrate=57600,
+            queue_size=queue_size,
+            response_size=read_back,
+            validate=valid_crc,
+        )
         self.running = True
-        self.last_time = time.time()
-        self.interval = 0.05
         # 添加速度相关的属性初始化
         self.left_speed = 0
         self.right_speed = 0
         self.max_speed = 255  # 最大速度限制
+        self.frames = FrameCache(maxsize=frame_cache_size)
+        # 运动指令帧与上一帧相同时不再发送
+        self.dedup = CommandDedup(keepalive)
+        self._failures = 0
         self.enable_motor()
 
     def set_motor_speed(self, left_speed, right_speed):
@@ -291,32 +336,40 @@ class ModbusMotor(MotorBase):
         self.right_speed = max(-self.max_speed, min(self.max_speed, right_speed))
 
     def Control(self, data: MoveData):
-        # TODO 目前只前进后悔控制速度，左转右转时速度影响转弯半径
+        # 方向码 1/2/5/6 只能原地转或直行；DRIVE 指令在一帧中给出左右轮速度，
+        # 可以边前进边转向，转弯半径由两轮速度比决定
         actions = {
             0: self.Stop,
             1: self.Advance,
             2: self.Back,
             5: self.Trun_Left,
             6: self.Trun_Right,
+            DRIVE: self.Drive,
         }
 
-        self.left_speed = data.speed
-        self.right_speed = data.speed
-        if data.direction == 0:
-            actions[data.direction]()
-        current_time = time.time()
-        if current_time - self.last_time > self.interval:
-            print("Car_run_Task called with value:", data.direction)  # 调试打印
-            self.last_time = current_time
-            actions[data.direction]()
-
-    def send_modbus_command(self, command):
-        try:
-            with serial.Serial(self.port, baudrate=57600, timeout=0.1) as ser:
-                request = bytes.fromhex(command)
-                ser.write(request)
-        except (serial.SerialException, OSError) as e:
-            print(f"Unable to open serial port {self.port}: {e}")
+        # 指令频率由上游的固定频率控制循环决定，这里每条指令都执行
+        self.left_speed = data.left_speed
+        self.right_speed = data.right_speed
+        actions[data.direction]()
+
+    def send_modbus_command(self, command, blocking=False):
+        """发送 Modbus 指令
+
+        Args:
+            command: 完整的指令帧 (bytes)，也兼容十六进制字符串
+            blocking: 为 True 时同步写出，否则放入发送队列立即返回
+        """
+        request = bytes.fromhex(command) if isinstance(command, str) else command
+        if not request:
+            return
+        if blocking:
+            self.transport.write(request)
+        else:
+            self.transport.send(request)
+
+    def close(self):
+        """写完队列中剩余的指令后关闭串口"""
+        self.transport.close()
 
     # 添加一个装饰器函数来检查电机状态
     def check_motor_state(func):
@@ -329,41 +382,54 @@ class ModbusMotor(MotorBase):
 
     # 计算 CRC 函数
     def calculate_crc(self, data):
-        crc = 0xFFFF
-        for byte in data:
-            crc ^= byte
-            for _ in range(8):
-                if crc & 0x0001:
-                    crc = (crc >> 1) ^ 0xA001
-                else:
-                    crc = crc >> 1
-        return crc
+        return crc16(data)
 
     def enable_motor(self):
         self.running = True
-        self.send_modbus_command(self.get_modbus_command("enable"))
+        self.send_modbus_command(self.get_modbus_frame("enable"), blocking=True)
+        # 使能后驱动器状态未知，下一条运动指令一定发送
+        self.dedup.reset()
 
     def disable_motor(self):
         self.running = False
-        self.send_modbus_command(self.get_modbus_command("disable"))
+        self.send_modbus_command(self.get_modbus_frame("disable"), blocking=True)
+        self.dedup.reset()
+
+    def send_motion(self, action):
+        """发送运动指令帧，与上一帧相同且未到重发间隔时跳过"""
+        stats = self.transport.stats
+        failures = stats.errors + stats.timeouts + stats.bad_responses
+        if failures != self._failures:
+            # 写入失败或应答异常，上一帧可能没有生效
+            self._failures = failures
+            self.dedup.reset()
+        frame = self.get_modbus_frame(action)
+        if self.dedup.should_send(frame):
+            self.send_modbus_command(frame)
 
     def Stop(self):
-        self.send_modbus_command(self.get_modbus_command("stop"))
+        self.send_motion("stop")
 
     def Advance(self):
-        self.send_modbus_command(self.get_modbus_command("advance"))
+        self.send_motion("advance")
 
     def Back(self):
 
-        self.send_modbus_command(self.get_modbus_command("back"))
+        self.send_motion("back")
 
     def Trun_Left(self):
         self.right_speed=-self.left_speed
-        self.send_modbus_command(self.get_modbus_command("turn_left"))
+        self.send_motion("turn_left")
 
     def Trun_Right(self):
         self.left_speed=-self.right_speed
-        self.send_modbus_command(self.get_modbus_command("turn_right"))
+        self.send_motion("turn_right")
+
+    def Drive(self):
+        """按 left_speed/right_speed 差速行驶，速度限制在 ±max_speed 内"""
+        self.left_speed = max(-self.max_speed, min(self.max_speed, self.left_speed))
+        self.right_speed = max(-self.max_speed, min(self.max_speed, self.right_speed))
+        self.send_motion("drive")
 
     # 获取 Modbus 命令映射
     def set_motor_speed(self, left_speed, right_speed):
@@ -377,48 +443,13 @@ class ModbusMotor(MotorBase):
         self.left_speed = left_speed
         self.right_speed = right_speed
 
-    def get_modbus_command(self, action):
-        """获取 Modbus 命令"""
-
-        # 转换速度为十六进制格式
-        def speed_to_hex(speed):
-            if speed < 0:
-                data = (0xFFFF - abs(speed) + 1) & 0xFFFF
-            else:
-                data = speed
-        
-            # 转换为大端序字节
-            return f"{(data >> 8) & 0xFF:02X} {data & 0xFF:02X}"
-
-
+    def get_modbus_frame(self, action) -> bytes:
+        """获取带 CRC 的二进制 Modbus 指令帧（按动作和左右轮速度缓存）"""
+        return self.frames.get(action, self.left_speed, self.right_speed)
 
-        # 基础命令模板
-        base_commands = {
-            "enable": "05 44 21 00 31 00 00 01 00 01",
-            "disable": "05 44 21 00 31 00 00 00 00 00",
-            "stop": "05 44 23 18 33 18 00 00 00 00 00",
-        }
-
-        # 运动命令需要动态生成
-        movement_commands = {
-            "advance": f"05 44 23 18 33 18 {speed_to_hex(self.right_speed)} {speed_to_hex(self.left_speed)}",
-            "back": f"05 44 23 18 33 18 {speed_to_hex(-self.right_speed)} {speed_to_hex(-self.left_speed)}",
-            "turn_left": f"05 44 23 18 33 18 {speed_to_hex(self.right_speed)} {speed_to_hex(self.left_speed)}",
-            "turn_right": f"05 44 23 18 33 18 {speed_to_hex(self.right_speed)} {speed_to_hex(self.left_speed)}",
-        }
-
-        # 合并命令字典
-        commands = {**base_commands, **movement_commands}
-        command = commands.get(action, "")
-       
-        # 如果命令非空，计算并添加 CRC
-        if command:
-            data = bytes.fromhex(command)
-            crc = self.calculate_crc(data)
-            crc_bytes = struct.pack("<H", crc)
-            command = f"{command} {crc_bytes[0]:02X} {crc_bytes[1]:02X}"
-        print(command)
-        return command
+    def get_modbus_command(self, action):
+        """获取十六进制字符串形式的 Modbus 命令"""
+        return self.get_modbus_frame(action).hex(" ").upper()
 
 
 # 统一的电机控制类，可以选择使用哪种驱动方式
@@ -428,24 +459,54 @@ class Motor:
         初始化电机控制器
 
         参数:
-            driver_type: 驱动类型，可选 "pca9685" 或 "modbus"
+            driver_type: 驱动类型，可选 "pca9685"、"modbus" 或 "sim"（不依赖硬件的模拟驱动）
             **kwargs: 根据驱动类型传递不同的参数
-                对于 pca9685: d1, d2, d3, d4
-                对于 modbus: port
+                对于 pca9685: d1, d2, d3, d4, keepalive
+                对于 modbus: port, read_back, keepalive
+                对于 sim: SimMotor 的参数，例如 bus、realtime、record_path
         """
         if driver_type == "pca9685":
             d1 = kwargs.get("d1", 1500)
             d2 = kwargs.get("d2", 1500)
             d3 = kwargs.get("d3", 1500)
             d4 = kwargs.get("d4", 1500)
-            self.driver = PCA9685Motor(d1, d2, d3, d4)
+            self.driver = PCA9685Motor(
+                d1, d2, d3, d4, keepalive=kwargs.get("keepalive", 0.5)
+            )
         elif driver_type == "modbus":
             port = kwargs.get("port", "COM1")
-            self.driver = ModbusMotor(port)
+            self.driver = ModbusMotor(
+                port,
+                read_back=kwargs.get("read_back", 0),
+                keepalive=kwargs.get("keepalive", 0.5),
+            )
+        elif driver_type == "sim":
+            self.driver = SimMotor(**kwargs)
         else:
             raise ValueError(f"不支持的驱动类型：{driver_type}")
 
         self.driver_type = driver_type
+        # 定时动作与驱动共用一个调度器，Control 可以中止驱动自己发起的动作
+        self.maneuvers = getattr(self.driver, "maneuvers", None) or ManeuverScheduler()
+
+    def Control(self, data: MoveData):
+        """执行运动指令，正在执行的定时动作被中止"""
+        self.maneuvers.cancel()
+        self.driver.Control(data)
+
+    def maneuver(self, steps, stop=True):
+        """在后台依次执行定时的运动指令，立即返回
+
+        Args:
+            steps: [(MoveData, 持续秒数), ...]
+            stop: 全部执行完后是否发送停止指令；被中止时不发送
+        """
+        steps = [
+            (partial(self.driver.Control, data), duration) for data, duration in steps
+        ]
+        if stop:
+            steps.append((partial(self.driver.Control, MoveData(0, 0)), 0))
+        self.maneuvers.run(steps)
 
     def __getattr__(self, name):
         """转发方法调用到具体的驱动实现"""
@@ -453,15 +514,7 @@ class Motor:
 
 
 def calculate_crc(data):
-    crc = 0xFFFF
-    for byte in data:
-        crc ^= byte
-        for _ in range(8):
-            if crc & 0x0001:
-                crc = (crc >> 1) ^ 0xA001
-            else:
-                crc = crc >> 1
-    return crc
+    return crc16(data)
 
 
 def send_modbus_command(command):
@@ -0,0 +1,96 @@
+import time
+
+
+class CommandFilter:
+    """丢弃过期和乱序的运动指令，并统计指令延迟
+
+    只检查带序号和时间戳的指令（MoveData.stamp()），旧格式的指令总是通过。
+    序号回退但时间戳更新，或序号大幅回退，视为发送端重启，重新开始计数。
+    停止指令（方向 0）总是执行：丢弃过期的停止指令会让小车继续按上一条运动指令行驶。
+    """
+
+    def __init__(self, max_age=0.2, restart_gap=1000):
+        """
+        参数:
+            max_age: 指令最大允许延迟（秒），超过即丢弃；None 表示不检查
+            restart_gap: 序号回退超过该值时认为发送端已重启
+        """
+        self.max_age_ns = None if max_age is None else int(max_age * 1e9)
+        self.restart_gap = restart_gap
+        self.last_seq = None
+        self.last_timestamp_ns = 0
+        self.accepted = 0
+        self.stale = 0
+        self.out_of_order = 0
+        self.restarts = 0
+        # 过期或乱序、但因为是停止指令仍然执行的指令数
+        self.late_stops = 0
+        # 指令从产生到通过过滤的耗时（秒）
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+        self.measured = 0
+
+    def accept(self, data, now_ns=None) -> bool:
+        """判断指令是否应该执行
+
+        Args:
+            data: MoveData
+            now_ns: 当前 time.monotonic_ns()，测试时可以传入
+        """
+        stop = data.direction == 0
+        late = False
+        if data.seq:
+            if self.last_seq is not None and data.seq <= self.last_seq:
+                if self._restarted(data):
+                    self.restarts += 1
+                    self.last_seq = data.seq
+                elif stop:
+                    late = True
+                else:
+                    self.out_of_order += 1
+                    return False
+            else:
+                self.last_seq = data.seq
+        age = data.age_ns(time.monotonic_ns() if now_ns is None else now_ns)
+        if age is not None:
+            if self.max_age_ns is not None and age > self.max_age_ns:
+                if not stop:
+                    self.stale += 1
+                    return False
+                late = True
+            self._record(age / 1e9)
+            self.last_timestamp_ns = max(self.last_timestamp_ns, data.timestamp_ns)
+        if late:
+            self.late_stops += 1
+        self.accepted += 1
+        return True
+
+    def _restarted(self, data) -> bool:
+        """序号回退时判断发送端是否已重启"""
+        if self.last_seq - data.seq >= self.restart_gap:
+            return True
+        # 同一台机器上各进程共用单调时钟，重启后的指令时间戳比之前的都新
+        return bool(data.timestamp_ns) and data.timestamp_ns > self.last_timestamp_ns
+
+    def _record(self, latency):
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self.total_latency += latency
+        self.measured += 1
+
+    @property
+    def avg_latency(self):
+        return self.total_latency / self.measured if self.measured else 0.0
+
+    def as_dict(self):
+        return {
+            "accepted": self.accepted,
+            "stale": self.stale,
+            "out_of_order": self.out_of_order,
+            "restarts": self.restarts,
+            "late_stops": self.late_stops,
+            "last_latency": self.last_latency,
+            "avg_latency": self.avg_latency,
+            "max_latency": self.max_latency,
+        }
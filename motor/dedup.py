@@ -0,0 +1,59 @@
+import time
+
+_UNSET = object()
+
+
+class CommandDedup:
+    """连续相同的指令只发送一次，每隔 keepalive 秒重发一次
+
+    小车保持同一方向和速度行驶时，上游每个控制周期都会发来同样的指令，
+    驱动器状态不变，重复写总线只增加负载。重发用于防止驱动器复位或丢帧后
+    一直停在错误的状态。
+    """
+
+    def __init__(self, keepalive=0.5, clock=time.monotonic):
+        """
+        参数:
+            keepalive: 相同指令的重发间隔（秒）；None 表示从不重发，0 表示不去重
+            clock: 时钟，测试时可以传入假时钟
+        """
+        self.keepalive = keepalive
+        self.clock = clock
+        self.sent = 0
+        self.suppressed = 0
+        # sent 中因到达重发间隔而重发的次数
+        self.refreshed = 0
+        # 每次定时重发前调用 on_refresh()，用于让下层缓存（例如寄存器镜像）失效
+        self.on_refresh = None
+        self._last = _UNSET
+        self._last_sent = 0.0
+
+    def should_send(self, key) -> bool:
+        """判断指令是否需要发送
+
+        Args:
+            key: 指令内容，例如指令帧字节或电机方向组合
+        """
+        now = self.clock()
+        if key == self._last:
+            if self.keepalive is None or now - self._last_sent < self.keepalive:
+                self.suppressed += 1
+                return False
+            self.refreshed += 1
+            if self.on_refresh is not None:
+                self.on_refresh()
+        self._last = key
+        self._last_sent = now
+        self.sent += 1
+        return True
+
+    def reset(self):
+        """忘记上一条指令，下一条指令一定发送（驱动器状态未知时调用）"""
+        self._last = _UNSET
+
+    def as_dict(self):
+        return {
+            "sent": self.sent,
+            "suppressed": self.suppressed,
+            "refreshed": self.refreshed,
+        }
@@ -0,0 +1,154 @@
+import os
+import pty
+import select
+import struct
+import sys
+import threading
+import time
+import tty
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.logger import RateLimitedLogger
+from motor.modbus_frame import MOTION_HEADER, append_crc, valid_crc
+
+# 使能/失能指令头，后接两个 16 位寄存器值
+ENABLE_HEADER = bytes.fromhex("05 44 21 00 31 00")
+# 指令帧的长度：使能/失能、运动指令为 12 字节，停止指令为 13 字节
+FRAME_SIZES = (12, 13)
+# 应答帧：请求的前 6 字节 + CRC
+ACK_SIZE = 8
+
+
+def decode_frame(frame):
+    """解析指令帧，返回 (动作, 左轮速度, 右轮速度)"""
+    if frame.startswith(ENABLE_HEADER):
+        enabled = frame[7] == 1
+        return ("enable" if enabled else "disable"), 0, 0
+    if frame.startswith(MOTION_HEADER):
+        if len(frame) == 13:
+            return "stop", 0, 0
+        right, left = struct.unpack(">hh", frame[6:10])
+        return "motion", left, right
+    return "unknown", 0, 0
+
+
+class LoopbackSlave:
+    """伪终端上的 Modbus 从站，代替电机驱动器测试 ModbusMotor
+
+    ModbusMotor 打开 self.port（伪终端的从设备端）即可像真实串口一样收发。
+    按 CRC 切分背靠背的帧，总线空闲 idle 秒后仍无法校验的数据记为 CRC 错误；
+    ack 为 True 时对每一帧正确的指令应答 ACK_SIZE 字节。
+    """
+
+    def __init__(self, ack=False, idle=0.005):
+        """
+        参数:
+            ack: 是否应答
+            idle: 判定一帧结束的空闲时间（秒），相当于 Modbus RTU 的 3.5 字符间隔
+        """
+        self.ack = ack
+        self.idle = idle
+        self.frames = []
+        self.crc_errors = 0
+        self.discarded = 0
+        self.bytes_received = 0
+        self._resyncing = False
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._buffer = bytearray()
+        self._received = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def received(self):
+        return len(self.frames)
+
+    def wait_for(self, count, timeout=1.0) -> bool:
+        """等待收到 count 帧"""
+        with self._received:
+            return self._received.wait_for(lambda: len(self.frames) >= count, timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._master], [], [], self.idle)
+            if not ready:
+                if self._buffer:
+                    # 空闲时剩下的数据凑不成合法的帧
+                    self.crc_errors += 1
+                    self.discarded += len(self._buffer)
+                    self._buffer.clear()
+                self._resyncing = False
+                continue
+            try:
+                data = os.read(self._master, 4096)
+            except OSError:
+                break
+            self.bytes_received += len(data)
+            self._buffer += data
+            self._parse()
+
+    def _parse(self):
+        buffer = self._buffer
+        while len(buffer) >= FRAME_SIZES[0]:
+            for size in FRAME_SIZES:
+                if len(buffer) >= size and valid_crc(buffer[:size]):
+                    self._on_frame(bytes(buffer[:size]))
+                    del buffer[:size]
+                    self._resyncing = False
+                    break
+            else:
+                if len(buffer) < FRAME_SIZES[-1]:
+                    # 可能是还没收完的停止指令
+                    return
+                # 逐字节丢弃直到重新找到合法的帧，一次重新同步只记一次错误
+                if not self._resyncing:
+                    self.crc_errors += 1
+                    self._resyncing = True
+                self.discarded += 1
+                del buffer[0]
+
+    def _on_frame(self, frame):
+        if self.ack:
+            os.write(self._master, append_crc(frame[:6]))
+        with self._received:
+            self.frames.append((time.monotonic(), *decode_frame(frame)))
+            self._received.notify_all()
+
+    def as_dict(self):
+        return {
+            "frames": len(self.frames),
+            "crc_errors": self.crc_errors,
+            "discarded": self.discarded,
+            "bytes": self.bytes_received,
+        }
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        os.close(self._master)
+        os.close(self._slave)
+
+
+def main():
+    """单独运行一个从站，把打印出的端口设置为 motor 节点的 MOTOR_PORT
+
+    LOOPBACK_ACK=1 时应答，配合 MOTOR_READ_BACK=8 统计往返时间。
+    """
+    slave = LoopbackSlave(ack=os.getenv("LOOPBACK_ACK", "0") == "1")
+    print(f"loopback slave on {slave.port}", flush=True)
+    log = RateLimitedLogger("loopback")
+    try:
+        while True:
+            time.sleep(1.0)
+            log.info("slave", **slave.as_dict())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        slave.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,12 @@ import sys
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/../")
 from dora import Node
-from Motor import MotorBase, ModbusMotor
+from Motor import Motor, MotorBase
+from command_filter import CommandFilter
 from common.move_data import MoveData
+from common.events import CoalescingEvents
+from common.logger import RateLimitedLogger
+from common.tracing import Tracer
 
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -13,21 +17,70 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # 使用数值作为输入 dataw 为单纯的数值，具体参考 motor.py
 def main():
     node = Node()
-    # 初始化电机
-    car_controller: MotorBase = ModbusMotor(port="/dev/ttyUSB0")
+    log = RateLimitedLogger("motor")
+    # 初始化电机；MOTOR_DRIVER=sim 时使用不依赖硬件的模拟驱动，
+    # SIM_BUS 选择模拟的总线（modbus/i2c），SIM_RECORD 设置时退出前保存指令流
+    driver_type = os.getenv("MOTOR_DRIVER", "modbus")
+    # MOTOR_KEEPALIVE 相同指令的重发间隔（秒），期间重复的指令不写总线，0 表示每条都发送
+    keepalive = float(os.getenv("MOTOR_KEEPALIVE", "0.5"))
+    if driver_type == "sim":
+        car_controller: MotorBase = Motor(
+            "sim",
+            bus=os.getenv("SIM_BUS", "modbus"),
+            realtime=os.getenv("SIM_REALTIME", "0") == "1",
+            record_path=os.getenv("SIM_RECORD"),
+            keepalive=keepalive,
+        )
+    else:
+        # MOTOR_READ_BACK=8 时每帧读回应答并统计往返时间（配合 motor/loopback.py）
+        car_controller: MotorBase = Motor(
+            "modbus",
+            port=os.getenv("MOTOR_PORT", "/dev/ttyUSB0"),
+            read_back=int(os.getenv("MOTOR_READ_BACK", "0")),
+            keepalive=keepalive,
+        )
+    # MAX_COMMAND_AGE 指令最大允许延迟（秒），超过即丢弃
+    command_filter = CommandFilter(max_age=float(os.getenv("MAX_COMMAND_AGE", "0.2")))
+    # TRACE_DIR 设置时把各阶段耗时写到 TRACE_DIR/motor.json
+    tracer = Tracer.from_env("motor")
+    # 最近一条执行的指令的采集时间；队列通常只有一帧，写出的就是这条指令
+    last_capture = [None]
 
-    for event in node:
-        # 控制车的循环，也许需要加入睡眠机制防止短时间大量指令
+    def on_write(latency):
+        tracer.record("serial", latency)
+        tracer.record_since("end_to_end", last_capture[0])
+
+    car_controller.transport.on_write = on_write
+
+    # 指令积压时只执行最新的一条
+    events = CoalescingEvents(node, ("move",))
+    for event in events:
         if event["type"] == "INPUT":
             event_id = event["id"]
             if event_id == "move":
                 # 将 pyarrow Array 转换为 MoveData 对象
                 data = event["value"]
-                move_data = MoveData.from_arrow_array(data)
-                car_controller.Control(move_data)
+                with tracer.stage("decode"):
+                    move_data = MoveData.from_arrow_array(data)
+                if command_filter.accept(move_data):
+                    last_capture[0] = move_data.capture_ns or None
+                    tracer.record_since("capture_to_motor", last_capture[0])
+                    with tracer.stage("motor"):
+                        car_controller.Control(move_data)
+                tracer.maybe_dump()
         elif event["type"] == "STOP":
+            # 退出前的停止指令一定发送
+            car_controller.dedup.reset()
             move_data = MoveData(0, 0)
             car_controller.Control(move_data)
+    car_controller.close()
+    tracer.dump()
+    log.info("exit_events", **events.as_dict())
+    log.info("exit_command", **command_filter.as_dict())
+    log.info("exit_serial", **car_controller.transport.stats.as_dict())
+    log.info("exit_dedup", **car_controller.dedup.as_dict())
+    if driver_type == "sim":
+        log.info("exit_sim", **car_controller.as_dict())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,82 @@
+import threading
+
+
+class ManeuverScheduler:
+    """在后台线程上执行定时动作，调用方不阻塞，可以随时取消
+
+    一个动作由若干步组成，每步是 (函数, 持续秒数)：执行函数后等待持续时间再进入下一步。
+    同一时间只执行一个动作，开始新动作或调用 cancel() 会中止当前动作；
+    cancel() 返回后被取消的动作不会再执行任何一步，调用方可以立即发出新的指令。
+    步骤函数中不能再开始新的动作。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancel = None
+        self._thread = None
+        self.started = 0
+        self.completed = 0
+        self.cancelled = 0
+
+    @property
+    def busy(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def run(self, steps):
+        """取消正在执行的动作并开始新动作
+
+        Args:
+            steps: [(函数, 持续秒数), ...]
+        """
+        self.cancel()
+        cancel = threading.Event()
+        thread = threading.Thread(
+            target=self._run, args=(list(steps), cancel), daemon=True
+        )
+        with self._lock:
+            self._cancel = cancel
+            self._thread = thread
+            self.started += 1
+        thread.start()
+
+    def _run(self, steps, cancel):
+        for action, duration in steps:
+            with self._lock:
+                if cancel.is_set():
+                    return
+                action()
+            if duration > 0 and cancel.wait(duration):
+                return
+        with self._lock:
+            if not cancel.is_set():
+                self.completed += 1
+                self._cancel = None
+
+    def cancel(self) -> bool:
+        """中止正在执行的动作，返回是否有动作被中止"""
+        if threading.current_thread() is self._thread:
+            # 动作的某一步自己发出的指令不中止该动作
+            return False
+        with self._lock:
+            cancel, self._cancel = self._cancel, None
+            if cancel is None or cancel.is_set():
+                return False
+            cancel.set()
+            self.cancelled += 1
+            return True
+
+    def wait(self, timeout=None) -> bool:
+        """等待当前动作结束（完成或被取消），返回是否已结束"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return not self.busy
+
+    def as_dict(self):
+        return {
+            "started": self.started,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "busy": self.busy,
+        }
@@ -0,0 +1,108 @@
+import struct
+from collections import OrderedDict
+
+
+def _build_crc_table():
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            if crc & 0x0001:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc = crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+
+# Modbus CRC16 (多项式 0xA001) 查表
+CRC16_TABLE = _build_crc_table()
+
+
+def crc16(data) -> int:
+    """查表计算 Modbus CRC16"""
+    crc = 0xFFFF
+    table = CRC16_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def append_crc(payload: bytes) -> bytes:
+    """在帧尾追加小端序 CRC16"""
+    return payload + struct.pack("<H", crc16(payload))
+
+
+def valid_crc(frame) -> bool:
+    """校验帧尾的 CRC16"""
+    return len(frame) > 2 and crc16(frame[:-2]) == struct.unpack("<H", frame[-2:])[0]
+
+
+# 固定指令
+STATIC_FRAMES = {
+    "enable": append_crc(bytes.fromhex("05 44 21 00 31 00 00 01 00 01")),
+    "disable": append_crc(bytes.fromhex("05 44 21 00 31 00 00 00 00 00")),
+    "stop": append_crc(bytes.fromhex("05 44 23 18 33 18 00 00 00 00 00")),
+}
+
+# 运动指令头，后接右轮、左轮速度（大端序 16 位补码）
+MOTION_HEADER = bytes.fromhex("05 44 23 18 33 18")
+
+# 运动指令对速度的符号
+MOTION_SIGNS = {
+    "advance": 1,
+    "back": -1,
+    "turn_left": 1,
+    "turn_right": 1,
+    # 差速指令，左右轮速度已带符号
+    "drive": 1,
+}
+
+
+def build_frame(action, left_speed=0, right_speed=0) -> bytes:
+    """生成带 CRC 的完整指令帧，未知指令返回空字节串"""
+    frame = STATIC_FRAMES.get(action)
+    if frame is not None:
+        return frame
+    sign = MOTION_SIGNS.get(action)
+    if sign is None:
+        return b""
+    payload = MOTION_HEADER + struct.pack(
+        ">HH", (sign * int(right_speed)) & 0xFFFF, (sign * int(left_speed)) & 0xFFFF
+    )
+    return append_crc(payload)
+
+
+class FrameCache:
+    """以 (action, left_speed, right_speed) 为键的 LRU 指令帧缓存"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._frames = OrderedDict()
+
+    def get(self, action, left_speed=0, right_speed=0) -> bytes:
+        frame = STATIC_FRAMES.get(action)
+        if frame is not None:
+            return frame
+        key = (action, int(left_speed), int(right_speed))
+        frame = self._frames.get(key)
+        if frame is not None:
+            self.hits += 1
+            self._frames.move_to_end(key)
+            return frame
+        self.misses += 1
+        frame = build_frame(*key)
+        self._frames[key] = frame
+        if len(self._frames) > self.maxsize:
+            self._frames.popitem(last=False)
+            self.evictions += 1
+        return frame
+
+    def clear(self):
+        self._frames.clear()
+
+    def __len__(self):
+        return len(self._frames)
@@ -0,0 +1,139 @@
+import time
+
+# PCA9685 寄存器
+MODE1 = 0x00
+MODE1_AI = 0x20  # 自动递增位，块写入依赖它
+LED0_ON_L = 0x06
+CHANNELS = 16
+# SMBus 块写入最多 32 字节，即 8 个通道
+MAX_BLOCK_CHANNELS = 8
+
+
+class RegisterMirror:
+    """PCA9685 LED 通道寄存器镜像
+
+    记录每个通道最后写入的 (on, off) 值，写入时只发送发生变化的通道，
+    并把相邻的通道合并成一次自动递增的 write_i2c_block_data。
+    """
+
+    def __init__(self, bus, address, max_gap=1):
+        """
+        参数:
+            bus: smbus.SMBus 或 FakeSMBus
+            address: PCA9685 I2C 地址
+            max_gap: 两段变化通道之间最多隔几个未变化通道时合并为一次写入
+        """
+        self.bus = bus
+        self.address = address
+        self.max_gap = max_gap
+        self.transactions = 0
+        self._state = [None] * CHANNELS
+
+    def invalidate(self):
+        """丢弃镜像，下一次写入全部通道"""
+        self._state = [None] * CHANNELS
+
+    def write(self, channels):
+        """写入通道状态
+
+        Args:
+            channels: {channel: (on, off)} 字典
+        """
+        desired = list(self._state)
+        for channel, value in channels.items():
+            desired[channel] = (value[0] & 0x1FFF, value[1] & 0x1FFF)
+        changed = [
+            channel
+            for channel in sorted(channels)
+            if desired[channel] != self._state[channel]
+        ]
+        for start, end in self._runs(changed, desired):
+            data = []
+            for channel in range(start, end + 1):
+                on, off = desired[channel]
+                data += [on & 0xFF, on >> 8, off & 0xFF, off >> 8]
+            self.bus.write_i2c_block_data(self.address, LED0_ON_L + 4 * start, data)
+            self.transactions += 1
+            self._state[start : end + 1] = desired[start : end + 1]
+
+    def _runs(self, changed, desired):
+        """把变化的通道划分为连续区间，区间内的空隙必须是已知状态"""
+        runs = []
+        for channel in changed:
+            if runs:
+                start, end = runs[-1]
+                gap = range(end + 1, channel)
+                if (
+                    len(gap) <= self.max_gap
+                    and channel - start < MAX_BLOCK_CHANNELS
+                    and all(desired[c] is not None for c in gap)
+                ):
+                    runs[-1] = (start, channel)
+                    continue
+            runs.append((channel, channel))
+        return runs
+
+
+class FakeSMBus:
+    """不依赖硬件的 smbus 替身
+
+    模拟 PCA9685 的寄存器文件（包括 MODE1 自动递增位），统计事务数和字节数，
+    并按 I2C 时钟估算总线耗时，可选择真实 sleep 以便测量端到端延迟。
+    """
+
+    def __init__(self, bus_hz=100000, transaction_overhead=50e-6, realtime=False):
+        """
+        参数:
+            bus_hz: I2C 时钟频率
+            transaction_overhead: 每次事务的固定开销（驱动 ioctl 等，秒）
+            realtime: 为 True 时每次事务按估算耗时 sleep
+        """
+        self.bus_hz = bus_hz
+        self.transaction_overhead = transaction_overhead
+        self.realtime = realtime
+        self.registers = bytearray(256)
+        self.transactions = 0
+        self.bytes_written = 0
+        self.bus_time = 0.0
+
+    def _transfer(self, nbytes):
+        # 地址字节 + 寄存器字节 + 数据，每字节 9 个时钟（含 ACK）
+        cost = self.transaction_overhead + (2 + nbytes) * 9 / self.bus_hz
+        self.transactions += 1
+        self.bytes_written += nbytes
+        self.bus_time += cost
+        if self.realtime:
+            time.sleep(cost)
+
+    def read_byte_data(self, addr, reg):
+        self._transfer(1)
+        return self.registers[reg]
+
+    def write_byte_data(self, addr, reg, value):
+        self._transfer(1)
+        self.registers[reg] = value & 0xFF
+
+    def write_i2c_block_data(self, addr, reg, data):
+        if len(data) > 32:
+            raise ValueError("SMBus block write is limited to 32 bytes")
+        self._transfer(len(data))
+        auto_increment = self.registers[MODE1] & MODE1_AI
+        for i, value in enumerate(data):
+            self.registers[reg + i if auto_increment else reg] = value & 0xFF
+
+    def channel(self, channel):
+        """读取通道当前的 (on, off) 值"""
+        base = LED0_ON_L + 4 * channel
+        regs = self.registers
+        return (
+            regs[base] | (regs[base + 1] << 8),
+            regs[base + 2] | (regs[base + 3] << 8),
+        )
+
+    def reset_stats(self):
+        self.transactions = 0
+        self.bytes_written = 0
+        self.bus_time = 0.0
+
+    def close(self):
+        pass
@@ -0,0 +1,218 @@
+import math
+import time
+
+import numpy as np
+
+from common.move_data import DRIVE, MoveData
+from motor.dedup import CommandDedup
+from motor.modbus_frame import FrameCache
+from motor.pca9685_bus import FakeSMBus
+from motor.transport import TransportStats
+
+# 记录的指令流：时间（秒，相对第一条指令）、指令内容、左右轮速度、总线耗时与延迟
+RECORD_DTYPE = np.dtype(
+    [
+        ("t", "<f8"),
+        ("direction", "<i4"),
+        ("left_speed", "<i4"),
+        ("right_speed", "<i4"),
+        ("seq", "<u4"),
+        ("wheel_left", "<i4"),
+        ("wheel_right", "<i4"),
+        ("bus_time", "<f8"),
+        ("latency", "<f8"),
+    ]
+)
+
+# 运动方向到 Modbus 指令帧的动作名，其他方向按停止处理
+ACTIONS = {1: "advance", 2: "back", 5: "turn_left", 6: "turn_right", DRIVE: "drive"}
+
+
+class SimTransport:
+    """与 SerialTransport 相同的统计接口，供 motor/main.py 记录串口耗时"""
+
+    def __init__(self):
+        self.stats = TransportStats()
+        # 每写出一帧调用一次 on_write(latency)
+        self.on_write = None
+
+    def record(self, latency):
+        self.stats.record(latency)
+        if self.on_write is not None:
+            self.on_write(latency)
+
+
+class SimMotor:
+    """不依赖硬件的电机驱动，用于离线压测和回归测试
+
+    bus="modbus" 时按 ModbusMotor 生成同样的指令帧，按波特率计算每帧占用串口的时间，
+    串口忙时后到的帧排队，延迟为排队加传输时间，Control 本身不阻塞（与发送队列一致），
+    与上一帧相同的帧按 keepalive 去重，不占用串口；
+    bus="i2c" 时用 FakeSMBus 驱动真实的 PCA9685Motor，按 I2C 时钟计算每次事务的耗时，
+    realtime 为 True 时 Control 按该耗时阻塞（与真实 I2C 写入一致）。
+    同时按差速模型积分小车位姿，并记录全部指令。
+    """
+
+    def __init__(
+        self,
+        bus="modbus",
+        baudrate=57600,
+        write_overhead=100e-6,
+        bus_hz=100000,
+        realtime=False,
+        wheel_base=0.2,
+        speed_scale=0.005,
+        record_path=None,
+        clock=time.monotonic,
+        keepalive=0.5,
+    ):
+        """
+        参数:
+            bus: "modbus"（串口）或 "i2c"（PCA9685）
+            baudrate: 串口波特率，按 8N1 每字节 10 位计算
+            write_overhead: 每次串口写入的固定开销（秒）
+            bus_hz: I2C 时钟频率
+            realtime: i2c 时是否按估算耗时真实阻塞
+            wheel_base: 轮距（米）
+            speed_scale: 速度单位到米/秒的换算系数
+            record_path: close() 时把指令流保存到该 .npy 文件
+            clock: 时钟，测试时可以传入假时钟
+            keepalive: 相同指令的重发间隔（秒），见 CommandDedup
+        """
+        if bus not in ("modbus", "i2c"):
+            raise ValueError(f"不支持的总线类型：{bus}")
+        self.bus = bus
+        self.baudrate = baudrate
+        self.write_overhead = write_overhead
+        self.wheel_base = wheel_base
+        self.speed_scale = speed_scale
+        self.record_path = record_path
+        self.clock = clock
+        self.transport = SimTransport()
+        self.frames = FrameCache()
+        self.dedup = CommandDedup(keepalive, clock)
+        self.left_speed = 0
+        self.right_speed = 0
+        # 位姿 (x, y, 朝向)，朝向为弧度，逆时针为正
+        self.x = 0.0
+        self.y = 0.0
+        self.theta = 0.0
+        self.wheels = (0, 0)
+        self.bus_time = 0.0
+        self._records = []
+        self._start = None
+        self._last_update = None
+        self._busy_until = 0.0
+        if bus == "i2c":
+            from motor.Motor import PCA9685Motor
+
+            self.smbus = FakeSMBus(bus_hz=bus_hz, realtime=realtime)
+            self.pca9685 = PCA9685Motor(
+                1500, 1500, 1500, 1500, bus=self.smbus, keepalive=keepalive, clock=clock
+            )
+            self.dedup = self.pca9685.dedup
+            self.smbus.reset_stats()
+
+    def Control(self, data: MoveData):
+        now = self.clock()
+        if self._start is None:
+            self._start = now
+        self._integrate(now)
+        wheels = self._wheels(data)
+        if self.bus == "modbus":
+            frame = self._frame(data)
+            if self.dedup.should_send(frame):
+                cost = self.write_overhead + len(frame) * 10 / self.baudrate
+                # 串口忙时排队，延迟包括等待前面的帧写完
+                start = max(now, self._busy_until)
+                self._busy_until = start + cost
+                latency = self._busy_until - now
+                self.transport.record(latency)
+            else:
+                cost = latency = 0.0
+        else:
+            before = self.smbus.bus_time
+            transactions = self.smbus.transactions
+            self.pca9685.Control(data)
+            cost = self.smbus.bus_time - before
+            latency = cost
+            if self.smbus.transactions != transactions:
+                self.transport.record(latency)
+        self.bus_time += cost
+        self.wheels = wheels
+        self.left_speed, self.right_speed = data.left_speed, data.right_speed
+        self._records.append(
+            (
+                now - self._start,
+                data.direction,
+                data.left_speed,
+                data.right_speed,
+                data.seq,
+                wheels[0],
+                wheels[1],
+                cost,
+                latency,
+            )
+        )
+
+    def _wheels(self, data):
+        """指令对应的左右轮速度，与 ModbusMotor 写入指令帧的速度一致"""
+        left, right = data.left_speed, data.right_speed
+        match data.direction:
+            case 1:
+                return left, right
+            case 2:
+                return -left, -right
+            case 5:
+                return left, -left
+            case 6:
+                return -right, right
+        if data.direction == DRIVE:
+            return left, right
+        return 0, 0
+
+    def _frame(self, data):
+        """ModbusMotor 对应的指令帧"""
+        action = ACTIONS.get(data.direction, "stop")
+        left, right = data.left_speed, data.right_speed
+        if action == "turn_left":
+            right = -left
+        elif action == "turn_right":
+            left = -right
+        return self.frames.get(action, left, right)
+
+    def _integrate(self, now):
+        """按上一条指令的轮速积分到 now"""
+        if self._last_update is not None:
+            dt = now - self._last_update
+            left, right = (w * self.speed_scale for w in self.wheels)
+            v = (left + right) / 2
+            omega = (right - left) / self.wheel_base
+            self.x += v * math.cos(self.theta) * dt
+            self.y += v * math.sin(self.theta) * dt
+            self.theta = (self.theta + omega * dt + math.pi) % (2 * math.pi) - math.pi
+        self._last_update = now
+
+    def pose(self, now=None):
+        """当前位姿 (x, y, theta)"""
+        self._integrate(self.clock() if now is None else now)
+        return self.x, self.y, self.theta
+
+    def records(self) -> np.ndarray:
+        """记录的指令流，RECORD_DTYPE 结构化数组"""
+        return np.array(self._records, RECORD_DTYPE)
+
+    def as_dict(self):
+        return {
+            "commands": len(self._records),
+            "bus_time": self.bus_time,
+            **self.transport.stats.as_dict(),
+            **{f"dedup_{k}": v for k, v in self.dedup.as_dict().items()},
+            "x": self.x,
+            "y": self.y,
+            "theta": self.theta,
+        }
+
+    def close(self):
+        if self.record_path:
+            np.save(self.record_path, self.records())
@@ -0,0 +1,69 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.move_data import MoveData
+from motor.command_filter import CommandFilter
+
+
+class TestCommandFilter(unittest.TestCase):
+    def setUp(self):
+        self.filter = CommandFilter(max_age=0.1)
+
+    def command(self, seq, timestamp_ns):
+        return MoveData(1, 10, seq=seq, timestamp_ns=timestamp_ns)
+
+    def test_latency(self):
+        self.assertTrue(self.filter.accept(self.command(1, 1_000_000), 21_000_000))
+        self.assertAlmostEqual(self.filter.last_latency, 0.02)
+        self.assertEqual(self.filter.measured, 1)
+
+    def test_stale(self):
+        self.assertFalse(self.filter.accept(self.command(1, 1), 200_000_001))
+        self.assertEqual(self.filter.stale, 1)
+
+    def test_out_of_order(self):
+        self.assertTrue(self.filter.accept(self.command(5, 1), 1))
+        self.assertFalse(self.filter.accept(self.command(4, 1), 1))
+        self.assertFalse(self.filter.accept(self.command(5, 1), 1))
+        self.assertTrue(self.filter.accept(self.command(6, 1), 1))
+        self.assertEqual(self.filter.out_of_order, 2)
+
+    def test_sender_restart(self):
+        self.assertTrue(self.filter.accept(self.command(5000, 1), 1))
+        self.assertTrue(self.filter.accept(self.command(1, 1), 1))
+        self.assertEqual(self.filter.restarts, 1)
+
+    def test_stale_stop(self):
+        """过期的停止指令仍然执行"""
+        stop = MoveData(0, 0, seq=1, timestamp_ns=1)
+        self.assertTrue(self.filter.accept(stop, 500_000_001))
+        self.assertEqual(self.filter.stale, 0)
+        self.assertEqual(self.filter.late_stops, 1)
+
+    def test_restarted_sender_stop(self):
+        """重启后的发送端序号从 1 开始，时间戳更新，停止和之后的运动指令都执行"""
+        self.assertTrue(self.filter.accept(self.command(500, 1_000_000), 1_000_000))
+        stop = MoveData(0, 0, seq=1, timestamp_ns=2_000_000)
+        self.assertTrue(self.filter.accept(stop, 2_000_000))
+        self.assertTrue(self.filter.accept(self.command(2, 3_000_000), 3_000_000))
+        self.assertEqual(self.filter.restarts, 1)
+        self.assertEqual(self.filter.out_of_order, 0)
+
+    def test_out_of_order_stop(self):
+        """乱序到达的停止指令执行，但不回退序号"""
+        self.assertTrue(self.filter.accept(self.command(5, 2), 2))
+        self.assertTrue(self.filter.accept(MoveData(0, 0, seq=4, timestamp_ns=1), 2))
+        self.assertEqual(self.filter.last_seq, 5)
+        self.assertFalse(self.filter.accept(self.command(4, 1), 2))
+
+    def test_legacy_command(self):
+        """旧格式没有序号和时间戳，总是通过"""
+        self.assertTrue(self.filter.accept(MoveData(0, 0)))
+        self.assertTrue(self.filter.accept(MoveData(0, 0)))
+        self.assertEqual(self.filter.measured, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
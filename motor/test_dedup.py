@@ -0,0 +1,87 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.move_data import MoveData
+from motor.dedup import CommandDedup
+from motor.loopback import LoopbackSlave
+from motor.Motor import ModbusMotor, PCA9685Motor
+from motor.pca9685_bus import FakeSMBus
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCommandDedup(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_keepalive(self):
+        dedup = CommandDedup(keepalive=0.5, clock=self.clock)
+        refreshes = []
+        dedup.on_refresh = lambda: refreshes.append(self.clock.now)
+        self.assertTrue(dedup.should_send("advance"))
+        self.clock.now = 0.4
+        self.assertFalse(dedup.should_send("advance"))
+        self.clock.now = 0.5
+        self.assertTrue(dedup.should_send("advance"))
+        # 只有定时重发调用 on_refresh，新指令不调用
+        self.assertEqual(refreshes, [0.5])
+        self.assertTrue(dedup.should_send("stop"))
+        self.assertEqual(dedup.as_dict(), {"sent": 3, "suppressed": 1, "refreshed": 1})
+
+    def test_no_keepalive(self):
+        dedup = CommandDedup(keepalive=None, clock=self.clock)
+        dedup.should_send(1)
+        self.clock.now = 100.0
+        self.assertFalse(dedup.should_send(1))
+        dedup.reset()
+        self.assertTrue(dedup.should_send(1))
+
+    def test_disabled(self):
+        dedup = CommandDedup(keepalive=0, clock=self.clock)
+        self.assertTrue(dedup.should_send(1))
+        self.assertTrue(dedup.should_send(1))
+        self.assertEqual(dedup.suppressed, 0)
+
+
+class TestMotorDedup(unittest.TestCase):
+    def test_modbus(self):
+        slave = LoopbackSlave()
+        self.addCleanup(slave.close)
+        motor = ModbusMotor(slave.port, keepalive=None)
+        for _ in range(10):
+            motor.Control(MoveData(1, 20))
+        motor.Control(MoveData(0, 0))
+        motor.close()
+        self.assertTrue(slave.wait_for(3))
+        # 使能、前进、停止各一帧
+        self.assertEqual(
+            [frame[1] for frame in slave.frames], ["enable", "motion", "stop"]
+        )
+        self.assertEqual(motor.dedup.suppressed, 9)
+
+    def test_pca9685_keepalive(self):
+        clock = FakeClock()
+        bus = FakeSMBus()
+        motor = PCA9685Motor(1500, 1500, 1500, 1500, bus=bus, clock=clock)
+        motor.Car_run = 1
+        transactions = bus.transactions
+        motor.Car_run = 1
+        self.assertEqual(bus.transactions, transactions)
+        self.assertEqual(motor.dedup.suppressed, 1)
+        # 到达重发间隔时即使镜像中的通道没有变化也重新写入
+        clock.now = 1.0
+        motor.Car_run = 1
+        self.assertGreater(bus.transactions, transactions)
+        self.assertEqual(bus.channel(2), (0, 4095))
+
+
+if __name__ == "__main__":
+    unittest.main()
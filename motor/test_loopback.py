@@ -0,0 +1,70 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.move_data import MoveData
+from motor.loopback import ACK_SIZE, LoopbackSlave
+from motor.Motor import ModbusMotor
+from motor.modbus_frame import build_frame
+
+
+class TestLoopbackSlave(unittest.TestCase):
+    def setUp(self):
+        self.slave = LoopbackSlave(ack=True)
+        self.addCleanup(self.slave.close)
+
+    def test_frames_decoded(self):
+        motor = ModbusMotor(self.slave.port)
+        commands = (
+            MoveData(1, 20),
+            MoveData(2, 20),
+            MoveData(5, 20),
+            MoveData.drive(15, -5),
+            MoveData(0, 0),
+        )
+        for i, data in enumerate(commands):
+            motor.Control(data)
+            # 等待从站收到这一帧（第一帧是使能），避免队列丢弃旧帧
+            self.assertTrue(self.slave.wait_for(i + 2))
+        motor.close()
+        actions = [frame[1:] for frame in self.slave.frames]
+        self.assertEqual(
+            actions,
+            [
+                ("enable", 0, 0),
+                ("motion", 20, 20),
+                ("motion", -20, -20),
+                ("motion", 20, -20),
+                ("motion", 20, 10),
+                ("stop", 0, 0),
+            ],
+        )
+        self.assertEqual(self.slave.crc_errors, 0)
+
+    def test_corrupted_frame(self):
+        motor = ModbusMotor(self.slave.port)
+        frame = bytearray(build_frame("advance", 10, 10))
+        frame[7] ^= 0xFF
+        # 损坏的帧后面紧跟正确的帧，从站应能重新同步
+        motor.send_modbus_command(bytes(frame) + build_frame("stop"), blocking=True)
+        self.assertTrue(self.slave.wait_for(2))
+        motor.close()
+        self.assertEqual(self.slave.frames[-1][1], "stop")
+        self.assertEqual(self.slave.crc_errors, 1)
+
+    def test_read_back(self):
+        motor = ModbusMotor(self.slave.port, read_back=ACK_SIZE)
+        for _ in range(5):
+            motor.send_modbus_command(build_frame("advance", 10, 10), blocking=True)
+        motor.close()
+        stats = motor.transport.stats
+        # 使能指令也会读回应答
+        self.assertEqual(stats.responses, 6)
+        self.assertEqual(stats.timeouts, 0)
+        self.assertEqual(stats.bad_responses, 0)
+        self.assertGreater(stats.max_rtt, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.move_data import MoveData
+from motor.maneuver import ManeuverScheduler
+from motor.Motor import Motor, PCA9685Motor
+from motor.pca9685_bus import FakeSMBus
+
+
+class TestManeuverScheduler(unittest.TestCase):
+    def test_steps(self):
+        scheduler = ManeuverScheduler()
+        calls = []
+        scheduler.run(
+            [(lambda: calls.append("a"), 0.01), (lambda: calls.append("b"), 0)]
+        )
+        self.assertTrue(scheduler.wait(1.0))
+        self.assertEqual(calls, ["a", "b"])
+        self.assertEqual(scheduler.completed, 1)
+
+    def test_cancel(self):
+        scheduler = ManeuverScheduler()
+        calls = []
+        scheduler.run([(lambda: calls.append("a"), 10), (lambda: calls.append("b"), 0)])
+        start = time.monotonic()
+        while not calls:
+            time.sleep(0.001)
+        self.assertTrue(scheduler.cancel())
+        self.assertTrue(scheduler.wait(1.0))
+        self.assertLess(time.monotonic() - start, 1.0)
+        # 被取消的动作不再执行后续步骤
+        self.assertEqual(calls, ["a"])
+        self.assertEqual(scheduler.as_dict()["cancelled"], 1)
+        self.assertFalse(scheduler.cancel())
+
+
+class TestPCA9685Maneuver(unittest.TestCase):
+    def setUp(self):
+        self.bus = FakeSMBus()
+        self.motor = PCA9685Motor(1500, 1500, 1500, 1500, bus=self.bus)
+
+    def test_non_blocking(self):
+        start = time.monotonic()
+        self.motor.LX_90D(50)
+        self.assertLess(time.monotonic() - start, 0.04)
+        self.assertTrue(self.motor.maneuvers.wait(1.0))
+        # 旋转结束后停止
+        self.assertEqual(self.bus.channel(2), (0, 0))
+        self.assertEqual(self.motor.maneuvers.completed, 1)
+
+    def test_control_preempts(self):
+        self.motor.RX_90D(10000)
+        self.motor.Control(MoveData(1, 0))
+        self.assertTrue(self.motor.maneuvers.wait(1.0))
+        self.assertEqual(self.motor.maneuvers.cancelled, 1)
+        # 保持新指令（前进），不会被定时动作的停止覆盖
+        self.assertEqual(self.bus.channel(2), (0, 4095))
+
+
+class TestMotorFacade(unittest.TestCase):
+    def test_sim_maneuver(self):
+        motor = Motor("sim")
+        motor.maneuver([(MoveData(5, 10), 10.0)])
+        while not motor.records().size:
+            time.sleep(0.001)
+        motor.Control(MoveData(1, 10))
+        self.assertTrue(motor.maneuvers.wait(1.0))
+        self.assertEqual(motor.records()["direction"].tolist(), [5, 1])
+
+    def test_sim_maneuver_stops(self):
+        motor = Motor("sim")
+        motor.maneuver([(MoveData(5, 10), 0.01)])
+        self.assertTrue(motor.maneuvers.wait(1.0))
+        self.assertEqual(motor.records()["direction"].tolist(), [5, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from motor.modbus_frame import CRC16_TABLE, FrameCache, build_frame, crc16
+
+
+def bitwise_crc(data):
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            if crc & 0x0001:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc = crc >> 1
+    return crc
+
+
+class TestModbusFrame(unittest.TestCase):
+    def test_crc_table(self):
+        """查表 CRC 与逐位计算一致"""
+        self.assertEqual(len(CRC16_TABLE), 256)
+        for data in (b"", b"\x05", bytes(range(256)), bytes.fromhex("05 44 23 18")):
+            self.assertEqual(crc16(data), bitwise_crc(data))
+
+    def test_static_frames(self):
+        """固定指令与原字符串指令一致"""
+        self.assertEqual(
+            build_frame("enable"), bytes.fromhex("05 44 21 00 31 00 00 01 00 01 34 E1")
+        )
+        self.assertEqual(
+            build_frame("stop"), bytes.fromhex("05 44 23 18 33 18 00 00 00 00 00 D9 69")
+        )
+
+    def test_motion_frames(self):
+        """速度按大端序补码编码，先右轮后左轮"""
+        frame = build_frame("advance", left_speed=-156, right_speed=20)
+        self.assertEqual(frame[:10], bytes.fromhex("05 44 23 18 33 18 00 14 FF 64"))
+        self.assertEqual(frame[10:], crc16(frame[:10]).to_bytes(2, "little"))
+        back = build_frame("back", left_speed=156, right_speed=-20)
+        self.assertEqual(back, frame)
+        self.assertEqual(build_frame("unknown"), b"")
+
+    def test_cache_eviction(self):
+        """LRU 缓存命中与淘汰"""
+        cache = FrameCache(maxsize=2)
+        cache.get("advance", 10, 10)
+        cache.get("advance", 10, 10)
+        cache.get("back", 10, 10)
+        cache.get("advance", 10, 10)
+        cache.get("advance", 20, 20)
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (2, 3, 1))
+        self.assertEqual(len(cache), 2)
+        cache.get("back", 10, 10)
+        self.assertEqual(cache.misses, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from motor.pca9685_bus import MODE1, MODE1_AI, FakeSMBus, RegisterMirror
+
+
+class TestRegisterMirror(unittest.TestCase):
+    def setUp(self):
+        self.bus = FakeSMBus()
+        self.bus.write_byte_data(0x60, MODE1, MODE1_AI)
+        self.bus.reset_stats()
+        self.mirror = RegisterMirror(self.bus, 0x60)
+
+    def test_block_write(self):
+        """相邻通道合并为一次块写入，寄存器内容正确"""
+        self.mirror.write({1: (0, 4095), 2: (0, 0), 3: (4095, 0), 4: (0, 4095)})
+        self.assertEqual(self.bus.transactions, 1)
+        self.assertEqual(self.bus.channel(1), (0, 4095))
+        self.assertEqual(self.bus.channel(3), (4095, 0))
+
+    def test_only_changed_channels(self):
+        """未变化的通道不再写入"""
+        channels = {1: (0, 4095), 2: (0, 0), 7: (0, 4095), 8: (0, 0)}
+        self.mirror.write(channels)
+        self.assertEqual(self.bus.transactions, 2)
+        self.mirror.write(channels)
+        self.assertEqual(self.bus.transactions, 2)
+        self.mirror.write({**channels, 8: (0, 4095)})
+        self.assertEqual(self.bus.transactions, 3)
+        self.assertEqual(self.bus.bytes_written, 4 * 4 + 4)
+
+    def test_block_limit(self):
+        """单次块写入不超过 32 字节"""
+        self.mirror.write({c: (0, c) for c in range(16)})
+        self.assertEqual(self.bus.transactions, 2)
+        self.assertEqual([self.bus.channel(c)[1] for c in range(16)], list(range(16)))
+
+    def test_invalidate(self):
+        self.mirror.write({5: (0, 100)})
+        self.mirror.invalidate()
+        self.mirror.write({5: (0, 100)})
+        self.assertEqual(self.bus.transactions, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
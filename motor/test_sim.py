@@ -0,0 +1,142 @@
+import math
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.move_data import DRIVE, MoveData
+from motor.Motor import Motor, PCA9685Motor
+from motor.modbus_frame import build_frame
+from motor.pca9685_bus import FakeSMBus
+from motor.sim import SimMotor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSimMotor(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_serial_queueing(self):
+        motor = SimMotor(baudrate=57600, write_overhead=0, clock=self.clock)
+        latencies = []
+        motor.transport.on_write = latencies.append
+        # 12 字节的运动帧在 57600 波特率下约 2.08 ms，同一时刻的第二帧要排队
+        motor.Control(MoveData(1, 10))
+        motor.Control(MoveData(1, 20))
+        frame_time = len(build_frame("advance", 10, 10)) * 10 / 57600
+        self.assertAlmostEqual(latencies[0], frame_time)
+        self.assertAlmostEqual(latencies[1], 2 * frame_time)
+        self.clock.now = 1.0
+        motor.Control(MoveData(0, 0))
+        self.assertAlmostEqual(latencies[2], len(build_frame("stop")) * 10 / 57600)
+        self.assertEqual(motor.transport.stats.sent, 3)
+
+    def test_kinematics(self):
+        motor = SimMotor(wheel_base=0.2, speed_scale=0.01, clock=self.clock)
+        motor.Control(MoveData(1, 10))  # 两轮 0.1 m/s
+        self.clock.now = 2.0
+        x, y, theta = motor.pose()
+        self.assertAlmostEqual(x, 0.2)
+        self.assertAlmostEqual(y, 0.0)
+        # 原地旋转：左轮 +0.1，右轮 -0.1，角速度 -1 rad/s
+        motor.Control(MoveData(5, 10))
+        self.clock.now = 2.0 + math.pi / 2
+        x, y, theta = motor.pose()
+        self.assertAlmostEqual(x, 0.2)
+        self.assertAlmostEqual(theta, -math.pi / 2)
+
+    def test_drive_arc(self):
+        motor = SimMotor(wheel_base=0.2, speed_scale=0.01, clock=self.clock)
+        # 左轮 0.05 m/s，右轮 0.15 m/s：线速度 0.1 m/s，角速度 0.5 rad/s，半径 0.2 m
+        motor.Control(MoveData.drive(10, 5))
+        # 按小步长积分，π 秒后转过 90°，到达圆弧的终点 (0.2, 0.2)
+        for i in range(1, 1001):
+            x, y, theta = motor.pose(math.pi * i / 1000)
+        self.assertAlmostEqual(theta, math.pi / 2)
+        self.assertAlmostEqual(x, 0.2, places=3)
+        self.assertAlmostEqual(y, 0.2, places=3)
+
+    def test_dedup(self):
+        motor = SimMotor(keepalive=0.5, clock=self.clock)
+        # 50 Hz 下 2 秒内保持同一指令，只在开始和每 0.5 秒重发时占用串口
+        for i in range(100):
+            self.clock.now = i * 0.02
+            motor.Control(MoveData(1, 10))
+        self.assertEqual(motor.transport.stats.sent, 4)
+        self.assertEqual(motor.dedup.suppressed, 96)
+        # 指令变化时立即发送
+        motor.Control(MoveData(0, 0))
+        self.assertEqual(motor.transport.stats.sent, 5)
+
+    def test_records(self):
+        motor = SimMotor(clock=self.clock)
+        for i, direction in enumerate((1, 5, 6, 2, 0)):
+            self.clock.now = i * 0.02
+            motor.Control(MoveData(direction, 8).stamp())
+        records = motor.records()
+        self.assertEqual(records["direction"].tolist(), [1, 5, 6, 2, 0])
+        self.assertEqual(records["wheel_left"].tolist(), [8, 8, -8, -8, 0])
+        self.assertEqual(records["wheel_right"].tolist(), [8, -8, 8, -8, 0])
+        self.assertAlmostEqual(records["t"][-1], 0.08)
+        self.assertTrue((records["seq"] > 0).all())
+
+    def test_i2c(self):
+        motor = Motor("sim", bus="i2c", clock=self.clock)
+        motor.Control(MoveData(1, 10))
+        # 前进需要写 8 个通道：两次块写入
+        self.assertEqual(motor.smbus.transactions, 2)
+        self.assertGreater(motor.bus_time, 0)
+        motor.Control(MoveData(1, 10))
+        self.assertEqual(motor.smbus.transactions, 2)
+        motor.Control(MoveData(0, 0))
+        self.assertEqual(motor.smbus.channel(2), (0, 0))
+
+    def test_i2c_drive(self):
+        motor = Motor("sim", bus="i2c", clock=self.clock)
+        motor.Control(MoveData(DRIVE, 15, 10, 20))
+        # 差速指令写到 PCA9685：右侧电机正转，左右占空比按轮速缩放
+        self.assertEqual(motor.smbus.channel(2), (0, 4095))
+        self.assertEqual(motor.smbus.channel(0), (0, 1200))
+        self.assertEqual(motor.smbus.channel(11), (0, 600))
+        self.assertEqual(motor.records()["wheel_left"].tolist(), [10])
+
+
+class TestPCA9685Drive(unittest.TestCase):
+    def setUp(self):
+        self.bus = FakeSMBus()
+        self.motor = PCA9685Motor(1500, 1500, 1500, 1500, bus=self.bus)
+
+    def test_drive(self):
+        self.motor.Control(MoveData(DRIVE, 5, -10, 20))
+        # 左侧电机（m4、m2）反转，右侧电机（m3、m1）正转
+        self.assertEqual(self.bus.channel(9), (0, 4095))
+        self.assertEqual(self.bus.channel(10), (0, 0))
+        self.assertEqual(self.bus.channel(7), (0, 0))
+        self.assertEqual(self.bus.channel(8), (0, 4095))
+        # 占空比为轮速大小乘以 drive_scale
+        self.assertEqual(self.bus.channel(11), (0, 600))
+        self.assertEqual(self.bus.channel(0), (0, 1200))
+
+    def test_discrete_restores_duty(self):
+        self.motor.Control(MoveData(DRIVE, 5, 5, 5))
+        self.assertEqual(self.bus.channel(0), (0, 300))
+        self.motor.Control(MoveData(1, 0))
+        self.assertEqual(self.bus.channel(0), (0, 1500))
+        self.assertEqual(self.bus.channel(2), (0, 4095))
+
+    def test_drive_stop(self):
+        self.motor.Control(MoveData(DRIVE, 10, 10, 10))
+        self.motor.Control(MoveData(DRIVE, 0, 0, 0))
+        for channel in (1, 2, 3, 4, 7, 8, 9, 10):
+            self.assertEqual(self.bus.channel(channel), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+import serial
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from motor import transport
+from motor.transport import SerialTransport, TransportStats
+
+
+class FakeSerial:
+    """serial.Serial 的替身，记录写入的帧，可以阻塞写入或模拟写失败"""
+
+    instances = []
+
+    def __init__(self, port, baudrate=9600, timeout=None):
+        if port == "/dev/missing":
+            raise serial.SerialException("no such device")
+        self.port = port
+        self.written = []
+        self.closed = False
+        # 清除后 write 阻塞，用于让发送队列积压
+        self.gate = threading.Event()
+        self.gate.set()
+        self.writing = threading.Event()
+        self.fail_next = False
+        FakeSerial.instances.append(self)
+
+    def write(self, frame):
+        self.writing.set()
+        self.gate.wait(1.0)
+        if self.fail_next:
+            self.fail_next = False
+            raise serial.SerialException("device disconnected")
+        self.written.append(bytes(frame))
+        return len(frame)
+
+    def close(self):
+        self.closed = True
+
+
+class TestSerialTransport(unittest.TestCase):
+    def setUp(self):
+        FakeSerial.instances = []
+        patcher = mock.patch.object(transport.serial, "Serial", FakeSerial)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def written(self):
+        return [frame for ser in FakeSerial.instances for frame in ser.written]
+
+    def test_drop_oldest_when_full(self):
+        link = SerialTransport("/dev/fake", queue_size=2)
+        link.write(b"open")
+        ser = FakeSerial.instances[0]
+        ser.gate.clear()
+        ser.writing.clear()
+        link.send(b"0")
+        # 后台线程卡在写第一帧，后面的帧在队列中积压
+        self.assertTrue(ser.writing.wait(1.0))
+        for i in range(1, 5):
+            link.send(str(i).encode())
+        self.assertEqual(link.stats.dropped, 2)
+        ser.gate.set()
+        link.close()
+        # 只保留最新的两帧
+        self.assertEqual(self.written(), [b"open", b"0", b"3", b"4"])
+
+    def test_reconnect_rate_limited(self):
+        link = SerialTransport("/dev/fake", reconnect_interval=0.05)
+        self.assertTrue(link.write(b"a"))
+        FakeSerial.instances[0].fail_next = True
+        self.assertFalse(link.write(b"b"))
+        self.assertTrue(FakeSerial.instances[0].closed)
+        # 重连间隔内不重新打开串口
+        self.assertFalse(link.write(b"c"))
+        self.assertEqual(len(FakeSerial.instances), 1)
+        time.sleep(0.06)
+        self.assertTrue(link.write(b"d"))
+        self.assertEqual(len(FakeSerial.instances), 2)
+        self.assertEqual(link.stats.errors, 2)
+        self.assertEqual(link.stats.reconnects, 1)
+        self.assertEqual(self.written(), [b"a", b"d"])
+        link.close()
+
+    def test_on_write(self):
+        link = SerialTransport("/dev/fake")
+        latencies = []
+        done = threading.Event()
+        link.on_write = lambda latency: (latencies.append(latency), done.set())
+        link.send(b"a")
+        self.assertTrue(done.wait(1.0))
+        link.close()
+        self.assertEqual(len(latencies), 1)
+        self.assertGreaterEqual(latencies[0], 0)
+        self.assertEqual(link.stats.sent, 1)
+
+    def test_close_drains_queue(self):
+        link = SerialTransport("/dev/fake")
+        for frame in (b"a", b"b", b"c"):
+            link.send(frame)
+        link.close()
+        self.assertEqual(self.written(), [b"a", b"b", b"c"])
+        self.assertFalse(link._thread.is_alive())
+        self.assertTrue(FakeSerial.instances[0].closed)
+
+    def test_open_failure_logged_once(self):
+        """串口一直打不开时，重连失败的日志每秒最多一条"""
+        link = SerialTransport("/dev/missing", reconnect_interval=0)
+        with self.assertLogs("transport", level="WARNING") as captured:
+            for _ in range(5):
+                self.assertFalse(link.write(b"a"))
+        self.assertEqual(len(captured.records), 1)
+        self.assertIn("open_failed", captured.output[0])
+        self.assertEqual(link.stats.errors, 5)
+        link.close()
+
+
+class TestTransportStats(unittest.TestCase):
+    def test_concurrent_updates(self):
+        """调用方线程计数丢帧、写线程记录耗时，计数不丢失"""
+        stats = TransportStats()
+
+        def drop():
+            for _ in range(10000):
+                stats.count("dropped")
+
+        def write():
+            for _ in range(10000):
+                stats.record(0.001)
+
+        threads = [threading.Thread(target=f) for f in (drop, drop, write, write)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        result = stats.as_dict()
+        self.assertEqual(result["dropped"], 20000)
+        self.assertEqual(result["sent"], 20000)
+        self.assertAlmostEqual(result["avg_latency"], 0.001)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,233 @@
+import queue
+import threading
+import time
+
+import serial
+
+from common.logger import RateLimitedLogger
+
+
+class TransportStats:
+    """串口发送统计
+
+    属性:
+        sent (int): 成功写出的帧数
+        dropped (int): 因队列已满被丢弃的旧帧数
+        errors (int): 写串口失败的次数
+        reconnects (int): 断开后重新打开串口的次数
+        last_latency (float): 最近一帧从入队到写完的耗时（秒）
+        max_latency (float): 最大耗时（秒）
+        total_latency (float): 累计耗时（秒），用于计算平均值
+        responses (int): 读回模式下收到的完整应答数
+        timeouts (int): 读回模式下超时未收到完整应答的次数
+        bad_responses (int): 应答校验失败的次数
+        last_rtt, max_rtt, total_rtt (float): 开始写到收到应答的往返时间（秒）
+    """
+
+    def __init__(self):
+        # 计数在调用方线程（dropped）和后台写线程中更新，读取在主循环中，统一加锁
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.dropped = 0
+        self.errors = 0
+        self.reconnects = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+        self.responses = 0
+        self.timeouts = 0
+        self.bad_responses = 0
+        self.last_rtt = 0.0
+        self.max_rtt = 0.0
+        self.total_rtt = 0.0
+
+    @property
+    def avg_latency(self):
+        return self.total_latency / self.sent if self.sent else 0.0
+
+    @property
+    def avg_rtt(self):
+        return self.total_rtt / self.responses if self.responses else 0.0
+
+    def count(self, name, n=1):
+        """计数器加 n，例如 count("dropped")"""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def record(self, latency):
+        with self._lock:
+            self.sent += 1
+            self.last_latency = latency
+            self.total_latency += latency
+            if latency > self.max_latency:
+                self.max_latency = latency
+
+    def record_rtt(self, rtt):
+        with self._lock:
+            self.responses += 1
+            self.last_rtt = rtt
+            self.total_rtt += rtt
+            if rtt > self.max_rtt:
+                self.max_rtt = rtt
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "sent": self.sent,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "reconnects": self.reconnects,
+                "last_latency": self.last_latency,
+                "avg_latency": self.avg_latency,
+                "max_latency": self.max_latency,
+                "responses": self.responses,
+                "timeouts": self.timeouts,
+                "bad_responses": self.bad_responses,
+                "avg_rtt": self.avg_rtt,
+                "max_rtt": self.max_rtt,
+            }
+
+
+class SerialTransport:
+    """长连接串口发送器
+
+    串口只打开一次，由后台线程从有界队列中取帧写出；写失败时关闭串口，
+    在下一帧到来时按 reconnect_interval 重新打开。队列满时丢弃最旧的帧，
+    保证电机始终执行最新的指令。
+    """
+
+    def __init__(
+        self,
+        port,
+        baudrate=57600,
+        timeout=0.1,
+        queue_size=8,
+        reconnect_interval=0.5,
+        response_size=0,
+        validate=None,
+    ):
+        """
+        参数:
+            port: 串口名称，例如 /dev/ttyUSB0
+            baudrate: 波特率
+            timeout: 串口读写超时（秒）
+            queue_size: 发送队列长度
+            reconnect_interval: 两次重连之间的最小间隔（秒）
+            response_size: 大于 0 时为读回模式，每写一帧等待读回该长度的应答并统计往返时间
+            validate: 校验应答的函数，返回 False 时计入 bad_responses
+        """
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.reconnect_interval = reconnect_interval
+        self.response_size = response_size
+        self.validate = validate
+        self.stats = TransportStats()
+        # 串口断开时每次重连都会失败，同一事件每秒最多输出一次
+        self.log = RateLimitedLogger("transport")
+        # 每写出一帧调用一次 on_write(latency)，在后台线程中执行
+        self.on_write = None
+
+        self._serial = None
+        self._opened_once = False
+        self._last_open_attempt = 0.0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def send(self, frame: bytes) -> bool:
+        """非阻塞地把一帧放入发送队列
+
+        Returns:
+            bool: 是否有旧帧因队列已满被丢弃
+        """
+        item = (frame, time.perf_counter())
+        dropped = False
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return dropped
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.stats.count("dropped")
+                    dropped = True
+                except queue.Empty:
+                    pass
+
+    def write(self, frame: bytes) -> bool:
+        """同步写出一帧（绕过队列），用于使能/失能等必须送达的指令"""
+        return self._write(frame, time.perf_counter())
+
+    def close(self):
+        """写完队列中已有的帧后停止后台线程并关闭串口"""
+        self._queue.put(None)
+        self._thread.join(timeout=1.0)
+        with self._lock:
+            self._close()
+
+    def _open(self):
+        now = time.monotonic()
+        if now - self._last_open_attempt < self.reconnect_interval:
+            return None
+        self._last_open_attempt = now
+        try:
+            self._serial = serial.Serial(
+                self.port, baudrate=self.baudrate, timeout=self.timeout
+            )
+            if self._opened_once:
+                self.stats.count("reconnects")
+            self._opened_once = True
+        except (serial.SerialException, OSError) as e:
+            self.log.warning("open_failed", port=self.port, error=e)
+            self._serial = None
+        return self._serial
+
+    def _close(self):
+        if self._serial is not None:
+            try:
+                self._serial.close()
+            except (serial.SerialException, OSError):
+                pass
+            self._serial = None
+
+    def _write(self, frame, enqueued_at):
+        with self._lock:
+            ser = self._serial or self._open()
+            if ser is None:
+                self.stats.count("errors")
+                return False
+            try:
+                written_at = time.perf_counter()
+                ser.write(frame)
+                if self.response_size:
+                    self._read_response(ser, written_at)
+            except (serial.SerialException, OSError) as e:
+                self.log.warning("write_failed", port=self.port, error=e)
+                self.stats.count("errors")
+                self._close()
+                return False
+            latency = time.perf_counter() - enqueued_at
+            self.stats.record(latency)
+        if self.on_write is not None:
+            self.on_write(latency)
+        return True
+
+    def _read_response(self, ser, written_at):
+        """读回模式：读取一帧应答，超时由串口的 timeout 决定"""
+        response = ser.read(self.response_size)
+        if len(response) < self.response_size:
+            self.stats.count("timeouts")
+            ser.reset_input_buffer()
+            return
+        self.stats.record_rtt(time.perf_counter() - written_at)
+        if self.validate is not None and not self.validate(response):
+            self.stats.count("bad_responses")
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            self._write(*item)
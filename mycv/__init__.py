@@ -1,3 +1,5 @@
 from .color import ColorDetector
+from .pipeline import VisionPipeline
+from .tracker import BallTracker
 
-__all__ = ["ColorDetector"]
+__all__ = ["ColorDetector", "BallTracker", "VisionPipeline"]
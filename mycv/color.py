@@ -1,42 +1,81 @@
 import cv2
 import numpy as np
 from dora import Node
-import pyarrow as pa
 import sys
 import os
+import time
 
 # 添加项目根目录到 Python 路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # 现在可以正常导入
 from untils.untils import Calculate
+from untils.codec import decode_image, encode_image
+from common import tracing
+from common.tracing import Tracer
+from mycv.replay import open_capture
+from mycv.tracker import BallTracker
 
 
 def process_image(data, metadata):
-    """处理图像数据，支持不同编码格式"""
-    # 转换为 NumPy 数组
-    np_array = data.to_numpy()
-
-    # 根据编码处理数据
-    encoding = metadata["encoding"]
-    if encoding in ["bgr8", "rgb8"]:
-        # 原始像素格式
-        height = metadata["height"]
-        width = metadata["width"]
-        image = np_array.reshape((height, width, 3))
-        if encoding == "rgb8":
-            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-    elif encoding in ["jpeg", "png"]:
-        # 压缩格式，需要解码
-        byte_data = np_array.tobytes()
-        image = cv2.imdecode(np.frombuffer(byte_data, np.uint8), cv2.IMREAD_COLOR)
-    else:
-        return None
-
-    return image
+    """处理图像数据，支持不同编码格式（原始像素格式不复制，结果只读）"""
+    return decode_image(data, metadata)
+
+
+# 候选区域：外接矩形、面积和圆形度
+CANDIDATE_DTYPE = np.dtype(
+    [
+        ("x", np.int32),
+        ("y", np.int32),
+        ("w", np.int32),
+        ("h", np.int32),
+        ("area", np.float32),
+        ("circularity", np.float32),
+    ]
+)
+
+# 各区域查找方式的默认最小圆形度。components 的圆形度由填充率和外接矩形长宽比估计，
+# 与轮廓按周长算出的圆形度含义不同，阈值单独标定：默认滤波链下合成图像中
+# 95% 的网球连通域在 0.79 以上（bench/bench_color.py 的 clean/cluttered 场景）
+MIN_CIRCULARITY = {"contours": 0.8, "components": 0.75}
+
+
+def _merge_boxes(boxes):
+    """合并重叠的矩形 [x0, y0, x1, y1]
+
+    合并后的矩形变大，可能又与之前已经比较过的矩形重叠（A 与 B 相交、B 与 C 相交，
+    A 与 C 不相交），因此重复合并，直到一遍下来没有矩形发生变化。
+    """
+    merged = [list(box) for box in boxes]
+    changed = True
+    while changed:
+        changed = False
+        result = []
+        for box in sorted(merged):
+            for other in result:
+                if (
+                    box[0] < other[2]
+                    and other[0] < box[2]
+                    and box[1] < other[3]
+                    and other[1] < box[3]
+                ):
+                    other[:] = [
+                        min(box[0], other[0]),
+                        min(box[1], other[1]),
+                        max(box[2], other[2]),
+                        max(box[3], other[3]),
+                    ]
+                    changed = True
+                    break
+            else:
+                result.append(box)
+        merged = result
+    return merged
 
 
 class ColorDetector:
+    BLUR_CHAINS = ("gaussian+median", "median", "gaussian", "none")
+
     def __init__(
         self,
         lower_hsv,
@@ -44,18 +83,72 @@ class ColorDetector:
         ratio_value=0.0322265625,
         min_area=300,
         max_area=10000,
+        blur="median",
+        mask_blur=False,
+        reuse_buffers=True,
+        profile=False,
+        scale=1,
+        max_candidates=8,
+        refine_padding=16,
+        method="contours",
+        min_circularity=None,
+        draw=True,
+        flip_y=False,
     ):
         """
         颜色识别器构造函数
         :param lower_hsv: HSV 颜色空间下限阈值 (list/tuple)
         :param upper_hsv: HSV 颜色空间上限阈值 (list/tuple)
         :param min_area: 最小识别区域面积（过滤噪声）
+        :param blur: 预处理滤波链，可选 "gaussian+median"、"median"、"gaussian"、"none"；
+            默认只做中值滤波：比 "gaussian+median" 快约 30%，杂乱场景下漏检也少得多
+            （见 bench/bench_color.py），保留中值滤波用于抑制真实摄像头的椒盐噪声
+        :param mask_blur: 形态学处理后是否再对掩膜做一次高斯模糊
+        :param reuse_buffers: 是否在帧之间复用中间结果的内存
+        :param profile: 是否记录每个阶段的耗时到 self.timings（毫秒）
+        :param scale: 全图搜索时先缩小 scale 倍（1、2 或 4）找候选区域，再在全分辨率下细化
+        :param max_candidates: 候选区域超过该数量时直接处理整幅图像
+        :param refine_padding: 候选区域向外扩展的最小像素数
+        :param method: 区域查找方式，"contours"（轮廓）或 "components"（连通域，向量化）；
+            components 的圆形度只看外接矩形，无法区分粘连成团的同色杂物和网球，
+            只适合背景干净的场景，杂乱场景使用默认的 contours
+        :param min_circularity: 最小圆形度，None 时按 method 取 MIN_CIRCULARITY 中的值
+        :param draw: 是否在图像副本上绘制识别结果，为 False 时直接返回原图
+        :param flip_y: 摄像头上下颠倒安装时为 True：直接在原始图像上识别，roi 和识别结果
+            都使用上下翻转后的坐标，省去每帧翻转整幅图像；只有绘制时才翻转
         """
+        if blur not in self.BLUR_CHAINS:
+            raise ValueError(f"不支持的滤波链：{blur}")
+        if method not in ("contours", "components"):
+            raise ValueError(f"不支持的区域查找方式：{method}")
         self.lower = np.array(lower_hsv)
         self.upper = np.array(upper_hsv)
         self.min_area = min_area
         self.max_area = max_area
         self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+        # 形态学操作使用的 5x5 矩形核，只创建一次
+        self.rect_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+        self.small_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+        self.scale = scale
+        self.max_candidates = max_candidates
+        self.refine_padding = refine_padding
+        self.method = method
+        self.min_circularity = (
+            MIN_CIRCULARITY[method] if min_circularity is None else min_circularity
+        )
+        self.draw = draw
+        self.flip_y = flip_y
+        # 最近一帧通过筛选的区域
+        self.candidates = np.empty(0, CANDIDATE_DTYPE)
+        # 最近一帧的识别结果，Calculate.DTYPE 结构化数组
+        self.detections = np.empty(0, Calculate.DTYPE)
+        self.blur = blur
+        self.mask_blur = mask_blur
+        self.reuse_buffers = reuse_buffers
+        self.profile = profile
+        self.timings = {}
+        self._last_mark = 0.0
+        self._buffers = {}
         # 锁眼位置
         self.recet_pos = (210, 354, 100, 100)
         self.center = (278, 298)
@@ -69,6 +162,30 @@ class ColorDetector:
         self.lower = np.array(lower_hsv)
         self.upper = np.array(upper_hsv)
 
+    def _buffer(self, name, shape, dtype=np.uint8):
+        """获取可复用的中间结果缓冲区，未开启复用时返回 None 让 OpenCV 自行分配
+
+        缓冲区按最大尺寸保留一段连续内存，不同大小的 ROI 取其前缀，避免反复分配。
+        """
+        if not self.reuse_buffers:
+            return None
+        size = int(np.prod(shape))
+        buf = self._buffers.get(name)
+        if buf is None or buf.size < size or buf.dtype != dtype:
+            buf = np.empty(size, dtype)
+            self._buffers[name] = buf
+        return buf[:size].reshape(shape)
+
+    def _mark(self, stage):
+        """累计从上一次标记到现在的耗时到 stage"""
+        if not self.profile:
+            return
+        now = time.perf_counter()
+        self.timings[stage] = (
+            self.timings.get(stage, 0.0) + (now - self._last_mark) * 1000
+        )
+        self._last_mark = now
+
     def ratio(self, h, w):
         """
         计算轮廓的长宽比
@@ -78,7 +195,7 @@ class ColorDetector:
         """
         return (h / self.h) * w / self.w
 
-    def process(self, frame):
+    def process(self, frame, roi=None):
         """处理图像帧以识别单个网球。
 
         该方法对输入图像进行预处理、颜色阈值分割和轮廓检测，以识别单个网球。
@@ -86,114 +203,355 @@ class ColorDetector:
 
         Args:
             frame: 输入的图像帧，BGR 格式的 numpy 数组。
+            roi: 只处理的区域 (x, y, w, h)，通常来自 BallTracker.window()；
+                为 None 时处理整幅图像（scale > 1 时先在缩小的图像上找候选区域）。
+                识别结果始终是整幅图像的坐标。
+                flip_y 为 True 时 roi 和识别结果都是上下翻转后的坐标，
+                返回的图像和掩膜只有在 draw 为 True 时才会翻转。
 
         Returns:
             tuple: 包含三个元素:
                 - processed_frame: 处理后的图像，带有标记的网球位置。
-                - centers: 网球中心点坐标列表，格式为 [(x, y)]。
-                - mask: 二值化掩膜图像。
+                - mask: 二值化掩膜图像。开启 reuse_buffers 时该数组会在下一帧被覆盖，
+                  需要保留时请自行 copy。
+                - data: 识别结果，Calculate 列表。
 
         Raises:
             None
         """
+        if self.profile:
+            self.timings = {}
+            self._last_mark = time.perf_counter()
+        height = frame.shape[0]
+        if roi is not None:
+            rois = [self._flip_roi(roi, height) if self.flip_y else roi]
+        elif self.scale > 1:
+            rois = self._coarse_rois(frame)
+            self._mark("coarse")
+        else:
+            rois = [None]
+
+        if rois == [None]:
+            ma, mask = self._preprocess(frame)
+            balls = self.find_candidates(mask)
+            self._mark("contours")
+        else:
+            # 掩膜还原到整幅图像大小，ROI 以外为 0
+            full_mask = self._buffer("roi_mask", frame.shape[:2])
+            if full_mask is None:
+                full_mask = np.zeros(frame.shape[:2], np.uint8)
+            else:
+                full_mask.fill(0)
+            found = []
+            for x, y, w, h in rois:
+                ma, mask = self._preprocess(frame[y : y + h, x : x + w])
+                # 多个 ROI 共用缓冲区，处理下一个之前先取出结果
+                full_mask[y : y + h, x : x + w] = ma
+                found.append(self.find_candidates(mask, x, y))
+                self._mark("contours")
+            balls = np.concatenate(found) if found else np.empty(0, CANDIDATE_DTYPE)
+            ma = full_mask
+
+        if self.flip_y:
+            # 在原始图像上找到的区域换算到翻转后的坐标
+            balls["y"] = height - balls["y"] - balls["h"]
+            rois = [r if r is None else self._flip_roi(r, height) for r in rois]
+        self.candidates = balls
+        processed_frame = frame
+        if self.draw:
+            processed_frame = self._annotate(frame, balls, rois)
+            if self.flip_y:
+                ma = cv2.flip(ma, 0, dst=self._buffer("flip_mask", ma.shape))
+        detections = np.empty(len(balls), Calculate.DTYPE)
+        detections["x"] = balls["x"] + balls["w"] // 2
+        detections["y"] = balls["y"] + balls["h"] // 2
+        detections["ratio"] = balls["h"] / self.h * balls["w"] / self.w
+        self.detections = detections
+        data = Calculate.from_numpy(detections)
+        self._mark("annotate")
+        return processed_frame, ma, data
+
+    @staticmethod
+    def _flip_roi(roi, height):
+        """上下翻转 ROI (x, y, w, h)"""
+        x, y, w, h = roi
+        return x, height - y - h, w, h
+
+    def _preprocess(self, frame):
+        """滤波、颜色阈值和形态学处理
+
+        Returns:
+            tuple: (开运算后的掩膜, 用于查找轮廓的掩膜)，均为复用的缓冲区
+        """
+        frame_shape = frame.shape
+        mask_shape = frame_shape[:2]
+        image = frame
+
         # 预处理 - 高斯模糊减少噪声
-        blurred_img = cv2.GaussianBlur(frame, (5, 5), 0)
+        if "gaussian" in self.blur:
+            image = cv2.GaussianBlur(
+                image, (5, 5), 0, dst=self._buffer("gaussian", frame_shape)
+            )
 
         # 中值滤波进一步减少噪声
-        median_blur = cv2.medianBlur(blurred_img, 5)
+        if "median" in self.blur:
+            image = cv2.medianBlur(image, 5, dst=self._buffer("median", frame_shape))
+        self._mark("blur")
 
         # 转换为 HSV 颜色空间
-        hsv = cv2.cvtColor(median_blur, cv2.COLOR_BGR2HSV)
+        hsv = cv2.cvtColor(
+            image, cv2.COLOR_BGR2HSV, dst=self._buffer("hsv", frame_shape)
+        )
+        self._mark("hsv")
 
         # 创建颜色掩膜
-        mask = cv2.inRange(hsv, self.lower, self.upper)
-        # 形态学操作（消除噪声）
-        # 定义结构元素（核），例如 5x5 的矩形
-        
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+        mask = cv2.inRange(
+            hsv, self.lower, self.upper, dst=self._buffer("mask", mask_shape)
+        )
+        self._mark("threshold")
+
+        # 形态学操作（消除噪声），使用缓存的 5x5 矩形核
+        kernel = self.rect_kernel
         # 开运算，先腐蚀再膨胀，用于去除小的噪点
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=1)
-        ma=mask
+        ma = cv2.morphologyEx(
+            mask,
+            cv2.MORPH_OPEN,
+            kernel,
+            iterations=1,
+            dst=self._buffer("open", mask_shape),
+        )
         # 闭运算，先膨胀再腐蚀，用于填充孔洞
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=3)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=2)
-        mask = cv2.GaussianBlur(mask, (5, 5), 0)
-
-        # 查找轮廓
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        data = []
-        processed_frame = frame.copy()
-        # 轮询处理每个轮廓
-        for cnt in contours:
-            x, y, w, h = cv2.boundingRect(cnt)
-            area = cv2.contourArea(cnt)
-            # 计算轮廓的圆形度
-            perimeter = cv2.arcLength(cnt, True)
-            if perimeter == 0:
-                continue
-            circularity = 4 * np.pi * area / (perimeter * perimeter)
-
-            # 只处理面积小于某个值且轮廓接近圆形的轮廓
-            if (
-                area > self.min_area and area < self.max_area and circularity > 0.8
-            ):  # 圆形度阈值可以调整
-                center_x = x + w // 2
-                center_y = y + h // 2
-
-                cv2.rectangle(processed_frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-                cv2.circle(processed_frame, (center_x, center_y), 5, (0, 0, 255), -1)
-
-                cv2.putText(
-                    processed_frame,
-                    f"Ball:({center_x}, {center_y})",
-                    (center_x - 60, center_y - 20),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.5,
-                    (255, 255, 255),
-                    2,
-                )
-
-                cv2.putText(
-                    processed_frame,
-                    f"Square :{int(area)}",
-                    (center_x - 60, center_y + 20),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.5,
-                    (255, 255, 255),
-                    2,
-                )
-                data.append(Calculate(center_x, center_y, self.ratio(h, w)))
-        return processed_frame, ma, data
+        mask = cv2.morphologyEx(
+            ma,
+            cv2.MORPH_CLOSE,
+            kernel,
+            iterations=3,
+            dst=self._buffer("close", mask_shape),
+        )
+        mask = cv2.morphologyEx(
+            mask,
+            cv2.MORPH_OPEN,
+            kernel,
+            iterations=2,
+            dst=self._buffer("mask", mask_shape),
+        )
+        self._mark("morphology")
+        if self.mask_blur:
+            mask = cv2.GaussianBlur(
+                mask, (5, 5), 0, dst=self._buffer("close", mask_shape)
+            )
+            self._mark("mask_blur")
+        return ma, mask
+
+    def find_candidates(self, mask, offset_x=0, offset_y=0):
+        """查找面积和圆形度符合要求的区域
+
+        method="contours" 时按轮廓计算面积和周长圆形度；method="components" 时用
+        connectedComponentsWithStats 一次得到所有连通域，圆形度由填充率和长宽比估计，
+        全部计算都是向量化的，适合杂乱场景。
 
-
-# 接受传入的图像，发送处理后的图像，轮廓，中心点，掩膜
+        Returns:
+            np.ndarray: CANDIDATE_DTYPE 结构化数组，坐标为整幅图像坐标
+        """
+        if self.method == "components":
+            # Grana (BBDT) 算法在 8 连通下比默认算法快约 3 倍
+            _, _, stats, _ = cv2.connectedComponentsWithStatsWithAlgorithm(
+                mask, 8, cv2.CV_32S, cv2.CCL_GRANA
+            )
+            stats = stats[1:]
+            candidates = np.empty(len(stats), CANDIDATE_DTYPE)
+            candidates["x"] = stats[:, cv2.CC_STAT_LEFT]
+            candidates["y"] = stats[:, cv2.CC_STAT_TOP]
+            candidates["w"] = stats[:, cv2.CC_STAT_WIDTH]
+            candidates["h"] = stats[:, cv2.CC_STAT_HEIGHT]
+            candidates["area"] = stats[:, cv2.CC_STAT_AREA]
+            w = candidates["w"].astype(np.float32)
+            h = candidates["h"].astype(np.float32)
+            # 圆的面积占外接矩形的 pi/4，偏离越多、长宽比越悬殊越不像圆
+            fill = candidates["area"] / (np.pi / 4 * w * h)
+            aspect = np.minimum(w, h) / np.maximum(w, h)
+            candidates["circularity"] = aspect * np.minimum(fill, 1 / fill)
+        else:
+            contours, _ = cv2.findContours(
+                mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+            )
+            candidates = np.empty(len(contours), CANDIDATE_DTYPE)
+            perimeter = np.empty(len(contours), np.float32)
+            for i, cnt in enumerate(contours):
+                x, y, w, h = cv2.boundingRect(cnt)
+                candidates[i] = (x, y, w, h, cv2.contourArea(cnt), 0.0)
+                perimeter[i] = cv2.arcLength(cnt, True)
+            # 计算轮廓的圆形度，周长为 0 的轮廓圆形度记为 0
+            with np.errstate(divide="ignore", invalid="ignore"):
+                circularity = 4 * np.pi * candidates["area"] / (perimeter * perimeter)
+            candidates["circularity"] = np.where(perimeter > 0, circularity, 0.0)
+
+        # 只保留面积在范围内且接近圆形的区域，圆形度阈值可以调整
+        keep = (
+            (candidates["area"] > self.min_area)
+            & (candidates["area"] < self.max_area)
+            & (candidates["circularity"] > self.min_circularity)
+        )
+        candidates = candidates[keep]
+        candidates["x"] += offset_x
+        candidates["y"] += offset_y
+        return candidates
+
+    def _coarse_rois(self, frame):
+        """在缩小 scale 倍的图像上做颜色阈值，返回候选区域（整幅图像坐标）
+
+        候选区域数量超过 max_candidates 时返回 [None]，即退回整幅图像处理。
+        """
+        s = self.scale
+        height, width = frame.shape[:2]
+        small_shape = (height // s, width // s)
+        small = cv2.resize(
+            frame,
+            (small_shape[1], small_shape[0]),
+            dst=self._buffer("small", small_shape + frame.shape[2:]),
+            interpolation=cv2.INTER_AREA,
+        )
+        hsv = cv2.cvtColor(
+            small, cv2.COLOR_BGR2HSV, dst=self._buffer("small_hsv", small.shape)
+        )
+        mask = cv2.inRange(
+            hsv, self.lower, self.upper, dst=self._buffer("small_mask", small_shape)
+        )
+        mask = cv2.morphologyEx(
+            mask,
+            cv2.MORPH_OPEN,
+            self.small_kernel,
+            dst=self._buffer("small_open", small_shape),
+        )
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        stats = stats[1:]
+        # 面积按缩放比例换算，并放宽一倍，最终由全分辨率检测判断
+        area = stats[:, cv2.CC_STAT_AREA] * (s * s)
+        stats = stats[(area > self.min_area / 2) & (area < self.max_area * 2)]
+        if len(stats) > self.max_candidates:
+            return [None]
+
+        boxes = []
+        for x, y, w, h in stats[:, :4] * s:
+            pad = max(self.refine_padding, max(w, h) // 2)
+            x0, y0 = max(0, x - pad), max(0, y - pad)
+            x1, y1 = min(width, x + w + pad), min(height, y + h + pad)
+            boxes.append([x0, y0, x1, y1])
+
+        # 合并重叠的候选区域，避免同一个网球被识别两次
+        return [
+            (int(x0), int(y0), int(x1 - x0), int(y1 - y0))
+            for x0, y0, x1, y1 in _merge_boxes(boxes)
+        ]
+
+    def _annotate(self, frame, balls, rois):
+        """在图像副本上绘制 ROI 和识别到的网球，flip_y 时翻转本身就生成了副本"""
+        processed_frame = cv2.flip(frame, 0) if self.flip_y else frame.copy()
+        for roi in rois:
+            if roi is not None:
+                x, y, w, h = roi
+                cv2.rectangle(processed_frame, (x, y), (x + w, y + h), (255, 0, 0), 1)
+        for x, y, w, h, area, _ in balls.tolist():
+            center_x = x + w // 2
+            center_y = y + h // 2
+
+            cv2.rectangle(processed_frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+            cv2.circle(processed_frame, (center_x, center_y), 5, (0, 0, 255), -1)
+
+            cv2.putText(
+                processed_frame,
+                f"Ball:({center_x}, {center_y})",
+                (center_x - 60, center_y - 20),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.5,
+                (255, 255, 255),
+                2,
+            )
+
+            cv2.putText(
+                processed_frame,
+                f"Square :{int(area)}",
+                (center_x - 60, center_y + 20),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.5,
+                (255, 255, 255),
+                2,
+            )
+        return processed_frame
+
+
+def send_debug_images(node, processed_frame, mask, scale=1.0, metadata=None):
+    """发送标注后的图像和掩膜，scale < 1 时先缩小以减少传输量"""
+    if scale != 1.0:
+        size = (int(mask.shape[1] * scale), int(mask.shape[0] * scale))
+        processed_frame = cv2.resize(
+            processed_frame, size, interpolation=cv2.INTER_AREA
+        )
+        mask = cv2.resize(mask, size, interpolation=cv2.INTER_NEAREST)
+    node.send_output("image", *encode_image(processed_frame, "bgr8", metadata))
+    node.send_output("mask", *encode_image(mask, "uint8", metadata))
+
+
+# 接受传入的图像，发送识别结果；调试用的标注图像和掩膜按需发送
 def main():
     node = Node()
-    dector = ColorDetector([30, 70, 80], [50, 255, 255], min_area=50)
+    # SCALE=2/4 时先在缩小的图像上找候选区域，再在全分辨率下细化
+    # 摄像头图像上下颠倒，flip_y 直接在原图上识别并换算坐标，省去每帧翻转
+    dector = ColorDetector(
+        [30, 70, 80],
+        [50, 255, 255],
+        min_area=50,
+        scale=int(os.getenv("SCALE", "1")),
+        flip_y=True,
+    )
+    # TRACKING=1 时只处理上一帧网球附近的区域
+    tracker = BallTracker() if os.getenv("TRACKING", "0") == "1" else None
+    # DEBUG_IMAGE=0 时只发送 data（无界面运行）；N 表示每 N 帧发送一次 image 和 mask
+    debug_every = int(os.getenv("DEBUG_IMAGE", "1"))
+    # DEBUG_SCALE 调试图像的缩放比例，例如 0.5
+    debug_scale = float(os.getenv("DEBUG_SCALE", "1"))
+    # TRACE_DIR 设置时把各阶段耗时写到 TRACE_DIR/color.json
+    tracer = Tracer.from_env("color")
+    frame_count = 0
     for event in node:
         if event["type"] == "INPUT":
             event_id = event["id"]
             # 处理普通图像或 mask 图像
             if event_id == "image":
-                image = process_image(event["value"], event["metadata"])
+                # 采集时间随识别结果传给下游，用于统计端到端延迟
+                capture = tracing.capture_ns(event["metadata"])
+                with tracer.stage("decode"):
+                    image = process_image(event["value"], event["metadata"])
                 if image is not None:
-                    image = cv2.flip(image, 0)
-                    processed_frame, mask, data = dector.process(image)
+                    send_debug = debug_every > 0 and frame_count % debug_every == 0
+                    frame_count += 1
+                    # 不发送调试图像的帧跳过复制和绘制
+                    dector.draw = send_debug
+                    roi = tracker.window() if tracker is not None else None
+                    with tracer.stage("detect"):
+                        processed_frame, mask, data = dector.process(image, roi)
+                    if tracker is not None:
+                        tracker.update(data)
+                    metadata = {tracing.CAPTURE_KEY: capture}
                     node.send_output(
-                        "image", pa.array(processed_frame.ravel()), event["metadata"]
+                        "data", Calculate.to_pa_array(dector.detections), metadata
                     )
-                    event["metadata"]["encoding"] = "uint8"
-                    node.send_output("mask", pa.array(mask.ravel()), event["metadata"])
-                    node.send_output("data", Calculate.to_pa_array(data))
+                    if send_debug:
+                        send_debug_images(
+                            node, processed_frame, mask, debug_scale, metadata
+                        )
+                    tracer.record_since("capture_to_data", capture)
+                    tracer.maybe_dump()
         # elif  event["type"] == "STOP":
         #     cv2.VideoCapture.release()
+    tracer.dump()
 
 
 def test():
     dector = ColorDetector([30, 70, 80], [50, 255, 255], min_area=300)
 
-    # 打开默认摄像头（通常是设备上的第一个摄像头）
-    cap = cv2.VideoCapture(0)
+    # 打开默认摄像头（通常是设备上的第一个摄像头），设置 REPLAY_PATH 时回放录制的图像
+    cap = open_capture(0)
     # 图片形状 640*480
     if not cap.isOpened():
         print("无法打开摄像头")
@@ -0,0 +1,76 @@
+from common.tracing import RateMeter
+from mycv.color import ColorDetector
+
+# 黄色网球的 HSV 范围
+TENNIS_LOWER = [30, 70, 80]
+TENNIS_UPPER = [50, 255, 255]
+
+
+class VisionPipeline:
+    """摄像头图像 -> 网球识别的可复用流水线
+
+    检测器只在构造时创建一次，阈值、形态学核和中间缓冲区在帧之间复用。
+    摄像头上下颠倒安装时（flip=True）不再每帧翻转整幅图像，而是在原始图像上识别，
+    由检测器把识别结果换算到翻转后的坐标，只有需要绘制标注图像时才翻转。
+    """
+
+    def __init__(
+        self,
+        lower_hsv=TENNIS_LOWER,
+        upper_hsv=TENNIS_UPPER,
+        min_area=50,
+        flip=True,
+        tracker=None,
+        **detector_kwargs,
+    ):
+        """
+        参数:
+            lower_hsv, upper_hsv: HSV 阈值
+            min_area: 最小识别面积
+            flip: 摄像头图像是否上下颠倒
+            tracker: BallTracker，提供时只处理它给出的窗口；跟踪状态由使用方更新
+            detector_kwargs: 传给 ColorDetector 的其他参数
+        """
+        self.detector = ColorDetector(
+            lower_hsv, upper_hsv, min_area=min_area, flip_y=flip, **detector_kwargs
+        )
+        self.tracker = tracker
+        self.frames = 0
+        self.meter = RateMeter()
+        self._frame = None
+
+    @property
+    def draw(self):
+        return self.detector.draw
+
+    @draw.setter
+    def draw(self, value):
+        self.detector.draw = value
+
+    def read(self, cap):
+        """从 VideoCapture 读取一帧到复用的缓冲区
+
+        返回的图像在下一次 read 时被覆盖，只适合在同一线程内读取后立即处理的场景；
+        把图像交给其他线程时应使用 cap.read() 每帧分配新内存。
+        """
+        ret, frame = cap.read(self._frame)
+        if not ret:
+            return None
+        self._frame = frame
+        return frame
+
+    def process(self, frame):
+        """识别一帧，返回 (标注图像, 掩膜, Calculate 列表)，坐标为翻转后的坐标"""
+        roi = self.tracker.window() if self.tracker is not None else None
+        result = self.detector.process(frame, roi)
+        self.frames += 1
+        self.meter.tick()
+        return result
+
+    @property
+    def detections(self):
+        """最近一帧的识别结果，Calculate.DTYPE 结构化数组"""
+        return self.detector.detections
+
+    def as_dict(self):
+        return {"frames": self.frames, **self.meter.as_dict()}
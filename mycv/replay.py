@@ -0,0 +1,153 @@
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from dora import Node
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import tracing
+from untils.codec import encode_image
+
+# 原始帧文件的扩展名，其余按视频文件用 OpenCV 读取
+RAW_EXTENSIONS = (".npy",)
+
+
+def save_frames(path, frames):
+    """把帧序列保存为可内存映射的 .npy 文件 (N, H, W, C)，回放时不需要解码"""
+    frames = list(frames)
+    out = np.lib.format.open_memmap(
+        path, mode="w+", dtype=np.uint8, shape=(len(frames),) + frames[0].shape
+    )
+    for i, frame in enumerate(frames):
+        out[i] = frame
+    out.flush()
+    del out
+
+
+class ReplaySource:
+    """回放录制的图像，接口与 cv2.VideoCapture 相同，可以直接替换摄像头
+
+    支持视频文件（OpenCV 解码）和 save_frames 保存的 .npy 原始帧文件（内存映射，
+    返回的帧是只读视图，不复制、不解码）。rate 为回放帧率，0 表示不限速，
+    None 表示按视频自身的帧率；loop 为 True 时播放结束后从头开始。
+    """
+
+    def __init__(self, path, rate=0, loop=False):
+        self.path = path
+        self.loop = loop
+        self.index = 0
+        self._frames = None
+        self._cap = None
+        if path.lower().endswith(RAW_EXTENSIONS):
+            self._frames = np.load(path, mmap_mode="r")
+            native = 0
+        else:
+            self._cap = cv2.VideoCapture(path)
+            native = self._cap.get(cv2.CAP_PROP_FPS) if self._cap.isOpened() else 0
+        rate = native if rate is None else rate
+        self.interval = 1.0 / rate if rate else 0.0
+        self._deadline = None
+
+    def isOpened(self):
+        if self._frames is not None:
+            return len(self._frames) > 0
+        return self._cap is not None and self._cap.isOpened()
+
+    def __len__(self):
+        if self._frames is not None:
+            return len(self._frames)
+        return int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    def read(self, image=None):
+        """读取下一帧，返回 (是否成功, 图像)；限速时等到下一帧的时间点"""
+        frame = self._next(image)
+        if frame is None and self.loop and self.index > 0:
+            self.rewind()
+            frame = self._next(image)
+        if frame is None:
+            return False, None
+        self.index += 1
+        self._pace()
+        return True, frame
+
+    def _next(self, image):
+        if self._frames is not None:
+            if self.index >= len(self._frames):
+                return None
+            return self._frames[self.index]
+        ret, frame = self._cap.read(image)
+        return frame if ret else None
+
+    def _pace(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if self._deadline is None:
+            self._deadline = now
+        self._deadline += self.interval
+        delay = self._deadline - now
+        if delay > 0:
+            time.sleep(delay)
+        elif -delay > self.interval:
+            # 落后超过一帧时不追赶，从当前时间重新计时
+            self._deadline = now
+
+    def rewind(self):
+        self.index = 0
+        if self._cap is not None:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def set(self, prop, value):
+        """与 VideoCapture 兼容，回放时忽略分辨率等设置"""
+        return False
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+        self._frames = None
+
+    def __iter__(self):
+        while True:
+            ret, frame = self.read()
+            if not ret:
+                return
+            yield frame
+
+
+def open_capture(device=0):
+    """环境变量 REPLAY_PATH 设置时回放录制的图像，否则打开摄像头
+
+    REPLAY_RATE 为回放帧率，默认按视频自身的帧率，0 表示不限速；回放结束后从头开始。
+    """
+    path = os.getenv("REPLAY_PATH")
+    if not path:
+        return cv2.VideoCapture(device)
+    rate = os.getenv("REPLAY_RATE")
+    return ReplaySource(path, rate=float(rate) if rate else None, loop=True)
+
+
+def main():
+    """回放节点：每收到一个 tick 发送一帧 image，代替 opencv-video-capture
+
+    REPLAY_PATH: 视频或 .npy 文件；REPLAY_LOOP=0 时播放结束后停止发送。
+    帧率由数据流中的 tick 定时器决定。
+    """
+    node = Node()
+    source = ReplaySource(
+        os.environ["REPLAY_PATH"], loop=os.getenv("REPLAY_LOOP", "1") == "1"
+    )
+    for event in node:
+        if event["type"] == "INPUT" and event["id"] == "tick":
+            ret, frame = source.read()
+            if not ret:
+                continue
+            # 以读出的时间作为采集时间，下游据此统计端到端延迟
+            metadata = {tracing.CAPTURE_KEY: time.monotonic_ns()}
+            node.send_output("image", *encode_image(frame, "bgr8", metadata))
+    source.release()
+
+
+if __name__ == "__main__":
+    main()
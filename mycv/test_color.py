@@ -0,0 +1,28 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mycv.color import _merge_boxes
+
+
+class TestMergeBoxes(unittest.TestCase):
+    def test_chained_boxes(self):
+        """A 与 B 相交、B 与 C 相交，A 与 C 不相交，最终合并成一个区域"""
+        a = [0, 0, 10, 10]
+        c = [5, 20, 15, 30]
+        b = [8, 8, 20, 22]
+        # 按 x0 排序后 C 在 B 之前，一遍合并会留下两个重叠的区域
+        self.assertEqual(_merge_boxes([a, b, c]), [[0, 0, 20, 30]])
+
+    def test_separate_boxes(self):
+        boxes = [[0, 0, 10, 10], [20, 20, 30, 30]]
+        self.assertEqual(_merge_boxes(boxes), boxes)
+
+    def test_touching_edges_not_merged(self):
+        boxes = [[0, 0, 10, 10], [10, 0, 20, 10]]
+        self.assertEqual(_merge_boxes(boxes), boxes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import sys
+import unittest
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench.synthetic import make_frames
+from mycv.color import ColorDetector
+from mycv.pipeline import TENNIS_LOWER, TENNIS_UPPER, VisionPipeline
+
+
+class FixedWindow:
+    def __init__(self, roi):
+        self.roi = roi
+
+    def window(self):
+        return self.roi
+
+
+class TestVisionPipeline(unittest.TestCase):
+    def setUp(self):
+        # 摄像头画面是上下颠倒的
+        self.frames = [cv2.flip(frame, 0) for frame, _ in make_frames(20)]
+        self.reference = ColorDetector(TENNIS_LOWER, TENNIS_UPPER, min_area=50)
+
+    def test_flip_folded_into_coordinates(self):
+        pipeline = VisionPipeline()
+        found = 0
+        for frame in self.frames:
+            expected_frame, expected_mask, expected = self.reference.process(
+                cv2.flip(frame, 0)
+            )
+            processed, mask, data = pipeline.process(frame)
+            self.assertEqual(data, expected)
+            np.testing.assert_array_equal(processed, expected_frame)
+            np.testing.assert_array_equal(mask, expected_mask)
+            found += len(data)
+        self.assertGreater(found, 0)
+        self.assertEqual(pipeline.frames, len(self.frames))
+
+    def test_roi_in_flipped_coordinates(self):
+        roi = (100, 120, 300, 250)
+        pipeline = VisionPipeline(tracker=FixedWindow(roi))
+        pipeline.draw = False
+        found = 0
+        for frame in self.frames:
+            _, _, expected = self.reference.process(cv2.flip(frame, 0), roi)
+            _, _, data = pipeline.process(frame)
+            self.assertEqual(data, expected)
+            found += len(data)
+        self.assertGreater(found, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mycv.replay import ReplaySource, save_frames
+
+
+def make_frames(count=5):
+    return [np.full((48, 64, 3), i * 10, np.uint8) for i in range(count)]
+
+
+class TestReplaySource(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_raw_frames_are_mapped(self):
+        path = os.path.join(self.tmp.name, "clip.npy")
+        frames = make_frames()
+        save_frames(path, frames)
+        source = ReplaySource(path)
+        self.assertTrue(source.isOpened())
+        self.assertEqual(len(source), 5)
+        replayed = list(source)
+        self.assertEqual(len(replayed), 5)
+        for expected, frame in zip(frames, replayed):
+            np.testing.assert_array_equal(frame, expected)
+        # 内存映射的视图，不复制
+        self.assertFalse(replayed[0].flags.writeable)
+        self.assertEqual(source.read(), (False, None))
+        source.release()
+
+    def test_video_loop(self):
+        path = os.path.join(self.tmp.name, "clip.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+        for frame in make_frames(3):
+            writer.write(frame)
+        writer.release()
+        source = ReplaySource(path, loop=True)
+        self.assertTrue(source.isOpened())
+        for _ in range(7):
+            ret, frame = source.read()
+            self.assertTrue(ret)
+            self.assertEqual(frame.shape, (48, 64, 3))
+        source.release()
+
+    def test_rate(self):
+        path = os.path.join(self.tmp.name, "clip.npy")
+        save_frames(path, make_frames(6))
+        source = ReplaySource(path, rate=100)
+        start = time.monotonic()
+        self.assertEqual(len(list(source)), 6)
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench.synthetic import make_frames
+from mycv.color import ColorDetector
+from mycv.tracker import BallTracker
+from untils import Calculate
+
+# 直径约 20 像素的网球占 640x480 图像的比例
+RATIO = 20 * 20 / (640 * 480)
+
+
+class TestBallTracker(unittest.TestCase):
+    def setUp(self):
+        self.tracker = BallTracker(max_misses=3, min_window=96, grow=1.5)
+
+    def test_window_grows_on_miss(self):
+        self.tracker.on_found(320, 240, RATIO)
+        self.assertEqual(self.tracker.window(), (272, 192, 96, 96))
+        self.tracker.on_lost()
+        x, y, w, h = self.tracker.window()
+        self.assertEqual((w, h), (144, 144))
+        # 窗口仍以预测位置为中心
+        self.assertEqual((x + w // 2, y + h // 2), (320, 240))
+
+    def test_full_frame_after_max_misses(self):
+        self.tracker.on_found(320, 240, RATIO)
+        for _ in range(2):
+            self.tracker.on_lost()
+            self.assertIsNotNone(self.tracker.window())
+        self.tracker.on_lost()
+        self.assertFalse(self.tracker.tracking)
+        self.assertIsNone(self.tracker.window())
+        self.assertIsNone(self.tracker.position)
+
+    def test_reset(self):
+        self.tracker.on_found(100, 100, RATIO)
+        self.tracker.on_found(110, 105, RATIO)
+        self.tracker.reset()
+        self.assertIsNone(self.tracker.window())
+        self.assertEqual(self.tracker.velocity, (0.0, 0.0))
+        # 重新找到时从新位置开始，不沿用旧的速度
+        self.tracker.on_found(500, 400, RATIO)
+        self.assertEqual(self.tracker.predict(), (500.0, 400.0))
+
+    def test_nearest_candidate(self):
+        """ROI 内的杂物不会抢走跟踪目标"""
+        self.tracker.on_found(100, 100, RATIO)
+        clutter = Calculate(140, 130, RATIO * 4)
+        ball = Calculate(104, 102, RATIO)
+        self.tracker.update([clutter, ball])
+        x, y = self.tracker.position
+        self.assertLess(abs(x - 104) + abs(y - 102), 5)
+
+    def test_first_candidate_when_not_tracking(self):
+        first = Calculate(300, 200, RATIO)
+        self.assertIs(self.tracker.select([first, Calculate(10, 10, RATIO)]), first)
+        self.assertIsNone(self.tracker.select([]))
+
+
+class TestRoiCoordinates(unittest.TestCase):
+    def test_roi_detection_in_frame_coordinates(self):
+        """ROI 内的检测结果换算回整幅图像的坐标"""
+        detector = ColorDetector([30, 70, 80], [50, 255, 255], min_area=50)
+        tracker = BallTracker()
+        checked = 0
+        for frame, (cx, cy, r) in make_frames(10):
+            if not r:
+                continue
+            full = detector.process(frame)[2]
+            tracker.update(full)
+            roi = tracker.window()
+            if roi is None or not full:
+                continue
+            cropped = detector.process(frame, roi)[2]
+            self.assertEqual(len(cropped), 1)
+            self.assertAlmostEqual(cropped[0].x, full[0].x, delta=1)
+            self.assertAlmostEqual(cropped[0].y, full[0].y, delta=1)
+            checked += 1
+        self.assertGreater(checked, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import math
+
+
+class BallTracker:
+    """网球跟踪器
+
+    用 alpha-beta（恒速）模型预测下一帧网球的位置，给出下一帧只需要处理的
+    感兴趣区域 (ROI)。连续丢失时窗口逐帧扩大，丢失 max_misses 帧后回到全图搜索。
+    """
+
+    def __init__(
+        self,
+        width=640,
+        height=480,
+        max_misses=5,
+        min_window=96,
+        size_scale=3.0,
+        grow=1.5,
+        alpha=0.7,
+        beta=0.3,
+    ):
+        """
+        参数:
+            width, height: 图像尺寸
+            max_misses: 连续丢失多少帧后回到全图搜索
+            min_window: ROI 的最小边长（像素）
+            size_scale: ROI 边长相对网球直径的倍数
+            grow: 每丢失一帧 ROI 边长的放大倍数
+            alpha, beta: 位置、速度的修正系数
+        """
+        self.width = width
+        self.height = height
+        self.max_misses = max_misses
+        self.min_window = min_window
+        self.size_scale = size_scale
+        self.grow = grow
+        self.alpha = alpha
+        self.beta = beta
+        self.reset()
+
+    def reset(self):
+        """清除跟踪状态，下一帧全图搜索"""
+        self.position = None
+        self.velocity = (0.0, 0.0)
+        self.size = 0.0
+        self.misses = 0
+
+    @property
+    def tracking(self):
+        return self.position is not None and self.misses < self.max_misses
+
+    def predict(self):
+        """预测下一帧网球中心"""
+        x, y = self.position
+        vx, vy = self.velocity
+        steps = self.misses + 1
+        return x + vx * steps, y + vy * steps
+
+    def window(self):
+        """下一帧需要处理的区域
+
+        Returns:
+            tuple | None: (x, y, w, h)，None 表示处理整幅图像
+        """
+        if not self.tracking:
+            return None
+        cx, cy = self.predict()
+        side = max(self.min_window, self.size * self.size_scale)
+        side *= self.grow**self.misses
+        if side >= min(self.width, self.height):
+            return None
+        half = side / 2
+        x0 = int(max(0, min(self.width - side, cx - half)))
+        y0 = int(max(0, min(self.height - side, cy - half)))
+        return x0, y0, int(side), int(side)
+
+    def on_found(self, x, y, ratio):
+        """用新的检测结果修正位置和速度
+
+        Args:
+            x, y: 网球中心
+            ratio: Calculate.ratio，网球外接矩形占整幅图像的比例
+        """
+        self.size = math.sqrt(max(ratio, 0.0) * self.width * self.height)
+        if self.position is None or not self.tracking:
+            self.position = (float(x), float(y))
+            self.velocity = (0.0, 0.0)
+            self.misses = 0
+            return
+        steps = self.misses + 1
+        px, py = self.predict()
+        rx, ry = x - px, y - py
+        vx, vy = self.velocity
+        self.position = (px + self.alpha * rx, py + self.alpha * ry)
+        self.velocity = (vx + self.beta * rx / steps, vy + self.beta * ry / steps)
+        self.misses = 0
+
+    def on_lost(self):
+        """本帧没有检测到网球"""
+        if self.position is None:
+            return
+        self.misses += 1
+        if self.misses >= self.max_misses:
+            self.reset()
+
+    def select(self, data):
+        """从一帧的候选中选出网球
+
+        跟踪中选离预测位置最近的候选，ROI 内的同色杂物不会抢走跟踪目标；
+        未跟踪时取第一个候选。
+
+        Returns:
+            Calculate | None: 没有候选时返回 None
+        """
+        if not data:
+            return None
+        if not self.tracking:
+            return data[0]
+        px, py = self.predict()
+        return min(data, key=lambda d: (d.x - px) ** 2 + (d.y - py) ** 2)
+
+    def update(self, data):
+        """用一帧的 Calculate 列表更新跟踪状态"""
+        target = self.select(data)
+        if target is not None:
+            self.on_found(target.x, target.y, target.ratio)
+        else:
+            self.on_lost()
@@ -1,10 +1,17 @@
 import os
+import sys
 
 import cv2
 import numpy as np
-import pyarrow as pa
 from dora import Node
 
+# 添加项目根目录到 Python 路径
+sys.path.append(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+from untils.codec import encode_image
+
 #  尝试导入相关的库
 try:
     from pyorbbecsdk import (
@@ -183,7 +190,7 @@ def main():
             # Send Color Image
             ret, frame = cv2.imencode("." + "jpeg", color_image)
             if ret:
-                node.send_output("image", pa.array(frame), {"encoding": "jpeg"})
+                node.send_output("image", *encode_image(frame, "jpeg"))
 
             # Get Depth data
             depth_frame = frames.get_depth_frame()
@@ -202,8 +209,7 @@ def main():
             )
             depth_data = temporal_filter.process(depth_data)
             # Send Depth data
-            storage = pa.array(depth_data.ravel())
-            node.send_output("depth", storage)
+            node.send_output("depth", *encode_image(depth_data, "32FC1"))
             # Convert to Image
             depth_image = cv2.normalize(
                 depth_data,
@@ -217,7 +223,7 @@ def main():
             depth_image = cv2.applyColorMap(depth_image, cv2.COLORMAP_JET)
             ret, frame = cv2.imencode("." + "jpeg", depth_image)
             if ret:
-                node.send_output("image_depth", pa.array(frame), {"encoding": "jpeg"})
+                node.send_output("image_depth", *encode_image(frame, "jpeg"))
 
         except KeyboardInterrupt:
             break
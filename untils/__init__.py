@@ -1,3 +1,10 @@
 from .untils import translate_image, Calculate, translate_direction
+from .codec import encode_image, decode_image
 
-__all__ = ["Calculate", "translate_direction", "translate_image"]
+__all__ = [
+    "Calculate",
+    "decode_image",
+    "encode_image",
+    "translate_direction",
+    "translate_image",
+]
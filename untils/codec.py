@@ -0,0 +1,114 @@
+import cv2
+import numpy as np
+import pyarrow as pa
+
+# 原始像素格式：编码 -> (数据类型, 通道数)
+RAW_ENCODINGS = {
+    "bgr8": (np.uint8, 3),
+    "rgb8": (np.uint8, 3),
+    "uint8": (np.uint8, 1),
+    "mono8": (np.uint8, 1),
+    "mono16": (np.uint16, 1),
+    "32FC1": (np.float32, 1),
+}
+
+# 压缩格式，按字节传输
+COMPRESSED_ENCODINGS = ("jpeg", "png")
+
+
+class CopyStats:
+    """统计编解码过程中不得不复制的字节数"""
+
+    def __init__(self):
+        self.frames = 0
+        self.bytes_copied = 0
+
+    def copied(self, nbytes):
+        self.bytes_copied += int(nbytes)
+
+    def reset(self):
+        self.frames = 0
+        self.bytes_copied = 0
+
+
+stats = CopyStats()
+
+
+def encode_image(image, encoding="bgr8", metadata=None):
+    """把 numpy 图像包装成 Arrow 数组，不复制像素数据
+
+    Args:
+        image: numpy 数组；压缩格式时为 cv2.imencode 的输出
+        encoding: RAW_ENCODINGS 或 COMPRESSED_ENCODINGS 中的编码
+        metadata: 额外的元数据，会与图像的尺寸信息合并
+
+    Returns:
+        tuple: (pa.Array, metadata)
+    """
+    stats.frames += 1
+    if not image.flags.c_contiguous:
+        stats.copied(image.nbytes)
+        image = np.ascontiguousarray(image)
+    array = pa.Array.from_buffers(
+        pa.from_numpy_dtype(image.dtype), image.size, [None, pa.py_buffer(image)]
+    )
+    metadata = dict(metadata or {})
+    metadata["encoding"] = encoding
+    if encoding not in COMPRESSED_ENCODINGS:
+        if encoding not in RAW_ENCODINGS:
+            raise ValueError(f"不支持的图像编码：{encoding}")
+        dtype, channels = RAW_ENCODINGS[encoding]
+        if image.dtype != dtype or image.size % channels:
+            raise ValueError(f"图像 {image.dtype}{image.shape} 与编码 {encoding} 不符")
+        metadata["height"] = int(image.shape[0])
+        metadata["width"] = int(image.shape[1]) if image.ndim > 1 else 1
+    return array, metadata
+
+
+def _frombuffer(array, dtype):
+    """把 Arrow 数组的数据缓冲区直接视为 numpy 数组"""
+    if array.null_count:
+        raise ValueError("图像数据不能包含空值")
+    dtype = np.dtype(dtype)
+    buffer = array.buffers()[1]
+    offset = array.offset * array.type.bit_width // 8
+    data = np.frombuffer(buffer, dtype=dtype, count=-1, offset=offset)
+    if (buffer.address + offset) % dtype.alignment:
+        # 未对齐的数据 OpenCV 无法直接使用，只能复制
+        stats.copied(data.nbytes)
+        data = data.copy()
+    return data
+
+
+def decode_image(data, metadata):
+    """把 Arrow 数组还原为 BGR（或单通道）numpy 图像
+
+    原始像素格式直接复用 Arrow 的缓冲区（只读），不复制；rgb8 需要转换颜色，
+    压缩格式需要解码，这两种情况会产生新的数组。
+
+    Returns:
+        np.ndarray | None: 不支持的编码返回 None
+    """
+    encoding = metadata["encoding"]
+    if encoding in COMPRESSED_ENCODINGS:
+        image = cv2.imdecode(_frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if image is not None:
+            stats.copied(image.nbytes)
+        return image
+    if encoding not in RAW_ENCODINGS:
+        return None
+    dtype, channels = RAW_ENCODINGS[encoding]
+    height = metadata["height"]
+    width = metadata["width"]
+    expected = height * width * channels * np.dtype(dtype).itemsize
+    if len(data) * data.type.bit_width // 8 != expected:
+        raise ValueError(
+            f"图像数据长度 {len(data)} 与 {width}x{height} {encoding} 不符"
+        )
+    image = _frombuffer(data, dtype)
+    shape = (height, width, channels) if channels > 1 else (height, width)
+    image = image.reshape(shape)
+    if encoding == "rgb8":
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        stats.copied(image.nbytes)
+    return image
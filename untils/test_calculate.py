@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import numpy as np
+import pyarrow as pa
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from common.calculate import Calculate
+from untils import Calculate as UntilsCalculate
+
+
+class TestCalculate(unittest.TestCase):
+    def setUp(self):
+        self.data = [Calculate(320, 240, 0.25), Calculate(10, 20, 0.01)]
+
+    def test_reexported(self):
+        self.assertIs(UntilsCalculate, Calculate)
+
+    def test_common_without_cv2(self):
+        """电机节点导入 common 时不加载 OpenCV"""
+        code = "import sys, common.move_data; sys.exit('cv2' in sys.modules)"
+        self.assertEqual(
+            subprocess.run([sys.executable, "-c", code], cwd=ROOT).returncode, 0
+        )
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            self.data[0].z = 1
+
+    def test_numpy_roundtrip(self):
+        records = Calculate.to_numpy(self.data)
+        self.assertEqual(records.dtype, Calculate.DTYPE)
+        np.testing.assert_array_equal(records["x"], [320, 10])
+        self.assertEqual(Calculate.from_numpy(records), self.data)
+
+    def test_pa_array_roundtrip(self):
+        array = Calculate.to_pa_array(self.data)
+        self.assertEqual(
+            array.to_pylist(),
+            [{"x": 320, "y": 240, "ratio": 0.25}, {"x": 10, "y": 20, "ratio": 0.01}],
+        )
+        self.assertEqual(Calculate.from_pa_array(array), self.data)
+        self.assertEqual(Calculate.from_pa_array(array.slice(1)), self.data[1:])
+        self.assertEqual(Calculate.from_pa_array(Calculate.to_pa_array([])), [])
+
+    def test_legacy_struct_array(self):
+        """兼容逐行构造的 struct 数组"""
+        array = pa.array([(1, 2, 0.5)], type=pa.struct(list(Calculate.SCHEMA)))
+        self.assertEqual(Calculate.from_pa_array(array), [Calculate(1, 2, 0.5)])
+
+    def test_record_batch(self):
+        batch = Calculate.to_record_batch(self.data)
+        self.assertEqual(batch.schema, Calculate.SCHEMA)
+        records = Calculate.from_record_batch(batch)
+        np.testing.assert_array_equal(records, Calculate.to_numpy(self.data))
+
+
+if __name__ == "__main__":
+    unittest.main()
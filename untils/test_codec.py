@@ -0,0 +1,72 @@
+import os
+import sys
+import unittest
+
+import cv2
+import numpy as np
+import pyarrow as pa
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from untils.codec import decode_image, encode_image, stats
+
+
+class TestCodec(unittest.TestCase):
+    def setUp(self):
+        stats.reset()
+        self.image = np.random.default_rng(0).integers(
+            0, 255, (48, 64, 3), dtype=np.uint8
+        )
+
+    def test_bgr8_zero_copy(self):
+        """原始像素格式编解码都不复制"""
+        array, metadata = encode_image(self.image, "bgr8")
+        self.assertEqual(metadata["width"], 64)
+        self.assertEqual(metadata["height"], 48)
+        image = decode_image(array, metadata)
+        np.testing.assert_array_equal(image, self.image)
+        self.assertTrue(np.shares_memory(image, self.image))
+        self.assertEqual(stats.bytes_copied, 0)
+
+    def test_sliced_array(self):
+        """带偏移量的 Arrow 数组按偏移量读取"""
+        array, metadata = encode_image(self.image, "bgr8")
+        padded = pa.concat_arrays([pa.array(np.zeros(3, np.uint8)), array])
+        image = decode_image(padded.slice(3), metadata)
+        np.testing.assert_array_equal(image, self.image)
+
+    def test_non_contiguous_is_counted(self):
+        view = self.image[:, ::2]
+        array, metadata = encode_image(view, "bgr8")
+        self.assertEqual(stats.bytes_copied, view.nbytes)
+        np.testing.assert_array_equal(decode_image(array, metadata), view)
+
+    def test_mono16_and_float(self):
+        depth = np.arange(12, dtype=np.float32).reshape(3, 4)
+        array, metadata = encode_image(depth, "32FC1")
+        np.testing.assert_array_equal(decode_image(array, metadata), depth)
+        mono = np.arange(12, dtype=np.uint16).reshape(3, 4)
+        array, metadata = encode_image(mono, "mono16")
+        np.testing.assert_array_equal(decode_image(array, metadata), mono)
+
+    def test_rgb8(self):
+        array, metadata = encode_image(self.image[..., ::-1].copy(), "rgb8")
+        np.testing.assert_array_equal(decode_image(array, metadata), self.image)
+
+    def test_png(self):
+        ret, png = cv2.imencode(".png", self.image)
+        self.assertTrue(ret)
+        array, metadata = encode_image(png, "png")
+        np.testing.assert_array_equal(decode_image(array, metadata), self.image)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            encode_image(self.image, "mono16")
+        array, metadata = encode_image(self.image, "bgr8")
+        metadata["width"] = 10
+        with self.assertRaises(ValueError):
+            decode_image(array, metadata)
+        self.assertIsNone(decode_image(array, {**metadata, "encoding": "yuv"}))
+
+
+if __name__ == "__main__":
+    unittest.main()